@@ -0,0 +1,219 @@
+"""
+Generation throughput benchmarks.
+
+Generates shaders at several `shader_target_size` tiers and times each stage
+of the pipeline separately: building, reconditioning, normalising ids,
+emitting assembly and parsing it back. Every shader is generated from a
+fixed seed so that two runs of the same tree measure the same work.
+
+Timings come from a plain run. Memory figures come from a second run of the
+same seeds under tracemalloc, which would otherwise distort the timings:
+the peak of traced memory and the number of memory blocks a stage still
+holds when it returns (not the number of allocations it made). Each tier
+runs in a fresh process, so that its peak RSS is its own.
+
+    python -m benchmarks.bench_generation --save benchmarks/baseline.json
+    python -m benchmarks.bench_generation --baseline benchmarks/baseline.json
+
+Against a baseline, the exit code is 1 when a stage got slower (or the
+throughput lower) by more than the tolerance.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+from typing import Optional
+
+from omegaconf import OmegaConf
+
+from run import SPIRVSmithConfig
+from src.fuzzing_client import ShaderGenerator
+from src.shader_parser import parse_spirv_assembly_lines
+from src.shader_utils import SPIRVShader
+from src.utils import get_spirvsmith_version
+
+STAGES: tuple[str, ...] = (
+    "build_shader",
+    "recondition",
+    "normalise_ids",
+    "generate_assembly_lines",
+    "parse_spirv_assembly_lines",
+)
+
+
+def create_config(shader_target_size: int) -> SPIRVSmithConfig:
+    config: SPIRVSmithConfig = OmegaConf.structured(SPIRVSmithConfig())
+    config.misc.broadcast_generated_shaders = False
+    config.misc.upload_logs = False
+    config.strategy.shader_target_size = shader_target_size
+    return config
+
+
+def run_stages(
+    generator: ShaderGenerator, seed: int, measure: Callable[[str, Callable], object]
+) -> None:
+    shader: SPIRVShader = measure("build_shader", lambda: generator.build_shader(seed))
+    measure("recondition", shader.recondition)
+    measure("normalise_ids", shader.normalise_ids)
+    lines: list[str] = measure(
+        "generate_assembly_lines", shader.generate_assembly_lines
+    )
+    measure("parse_spirv_assembly_lines", lambda: parse_spirv_assembly_lines(lines))
+
+
+def time_tier(generator: ShaderGenerator, seeds: list[int]) -> dict[str, list[float]]:
+    timings: dict[str, list[float]] = {stage: [] for stage in STAGES}
+
+    def measure(stage: str, fn: Callable) -> object:
+        start: float = time.perf_counter()
+        result: object = fn()
+        timings[stage].append(time.perf_counter() - start)
+        return result
+
+    for seed in seeds:
+        run_stages(generator, seed, measure)
+    return timings
+
+
+def trace_tier(generator: ShaderGenerator, seeds: list[int]) -> dict[str, dict]:
+    memory: dict[str, dict] = {
+        stage: {"peak_traced_bytes": 0, "retained_blocks": 0} for stage in STAGES
+    }
+
+    def measure(stage: str, fn: Callable) -> object:
+        tracemalloc.reset_peak()
+        blocks_before: int = sys.getallocatedblocks()
+        result: object = fn()
+        memory[stage]["peak_traced_bytes"] = max(
+            memory[stage]["peak_traced_bytes"], tracemalloc.get_traced_memory()[1]
+        )
+        memory[stage]["retained_blocks"] = max(
+            memory[stage]["retained_blocks"],
+            sys.getallocatedblocks() - blocks_before,
+        )
+        return result
+
+    tracemalloc.start()
+    try:
+        for seed in seeds:
+            run_stages(generator, seed, measure)
+    finally:
+        tracemalloc.stop()
+    return memory
+
+
+def bench_tier(shader_target_size: int, seeds: list[int]) -> dict:
+    generator: ShaderGenerator = ShaderGenerator(create_config(shader_target_size))
+    # Warm up the caches filled on first use (delegation tree, opcode members...)
+    time_tier(generator, seeds[:1])
+    timings: dict[str, list[float]] = time_tier(generator, seeds)
+    memory: dict[str, dict] = trace_tier(generator, seeds)
+    generation_time: float = sum(timings["build_shader"]) + sum(timings["recondition"])
+    return {
+        "shaders_per_sec": len(seeds) / generation_time,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "stages": {
+            stage: {
+                "median_s": statistics.median(timings[stage]),
+                "mean_s": statistics.mean(timings[stage]),
+                **memory[stage],
+            }
+            for stage in STAGES
+        },
+    }
+
+
+def bench_tier_in_subprocess(shader_target_size: int, seeds: list[int]) -> dict:
+    # ru_maxrss is the peak of the whole process, tiers run in the same
+    # process would all report the largest of them
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return executor.submit(bench_tier, shader_target_size, seeds).result()
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Human-readable regressions of `results` with respect to `baseline`.
+    """
+    regressions: list[str] = []
+    for tier, tier_results in results["tiers"].items():
+        tier_baseline: Optional[dict] = baseline["tiers"].get(tier)
+        if tier_baseline is None:
+            continue
+        ratio: float = (
+            tier_results["shaders_per_sec"] / tier_baseline["shaders_per_sec"]
+        )
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"[{tier}] shaders/sec: {tier_baseline['shaders_per_sec']:.2f} -> "
+                f"{tier_results['shaders_per_sec']:.2f}"
+            )
+        for stage, stage_results in tier_results["stages"].items():
+            stage_baseline: Optional[dict] = tier_baseline["stages"].get(stage)
+            if stage_baseline is None:
+                continue
+            ratio = stage_results["median_s"] / stage_baseline["median_s"]
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"[{tier}] {stage}: {1000 * stage_baseline['median_s']:.2f}ms -> "
+                    f"{1000 * stage_results['median_s']:.2f}ms"
+                )
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    for tier, tier_results in results["tiers"].items():
+        print(
+            f"shader_target_size={tier}: {tier_results['shaders_per_sec']:.2f} shaders/sec, "
+            f"peak RSS {tier_results['peak_rss_kb'] / 1024:.1f}MiB"
+        )
+        for stage, stage_results in tier_results["stages"].items():
+            print(
+                f"  {stage:<28} median {1000 * stage_results['median_s']:8.2f}ms"
+                f"  peak traced {stage_results['peak_traced_bytes'] / 1024:10.1f}KiB"
+                f"  retained blocks {stage_results['retained_blocks']:8d}"
+            )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tiers", type=int, nargs="+", default=[500, 1500, 5000])
+    parser.add_argument("--shaders", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save", help="Where to write the results as JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    seeds: list[int] = [args.seed + k for k in range(args.shaders)]
+    results: dict = {
+        "version": get_spirvsmith_version(),
+        "python": platform.python_version(),
+        "seeds": seeds,
+        "tiers": {
+            str(tier): bench_tier_in_subprocess(tier, seeds) for tier in args.tiers
+        },
+    }
+    print_results(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions: list[str] = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
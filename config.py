@@ -1,13 +1,13 @@
-import random
 from dataclasses import dataclass
 from dataclasses import field
 from typing import Literal
 from typing import Optional
 
 from src.optimiser_fuzzer import fuzz_optimiser
+from src.rng import get_process_rng
 from src.utils import get_spirvsmith_version
 
-rng = random.SystemRandom()
+rng = get_process_rng()
 
 
 @dataclass
@@ -99,7 +99,52 @@ class FuzzingStrategyConfig:
 @dataclass
 class MiscConfig:
     out_folder: str = "out"
+    # Every generated shader is recorded in `<out_folder>/corpus/corpus.jsonl` as the
+    # seed it was generated from (see src/corpus.py). The full assembly is only
+    # written to `<out_folder>` for shaders that fail validation, unless this is True.
+    write_valid_assembly: bool = False
     fuzz_optimiser: bool = False
+
+    # How many worker processes should generate (and assemble) shaders in parallel.
+    # Validation does not run there, see `n_validation_threads` below.
+    # If None, SPIRVSmith will spawn one worker per CPU core.
+    n_workers: Optional[int] = None
+
+    # How many SPIRV-Tools processes (spirv-as, spirv-val, spirv-opt) may run
+    # concurrently within a single process: each generation worker assembles its
+    # own shaders, the main process validates and optimises them for all workers.
+    # If None, one per CPU core.
+    n_tool_workers: Optional[int] = None
+
+    # Validation and submission run on threads of the main process, fed through
+    # queues of at most `pipeline_queue_size` shaders. Once a queue is full,
+    # the stages in front of it wait instead of piling up shaders in memory.
+    n_validation_threads: int = 2
+    n_submission_threads: int = 2
+    pipeline_queue_size: int = 64
+    # Every failure of a stage is logged, generation stops once a stage has failed
+    # on that many shaders in a row. If None, it never stops.
+    max_consecutive_stage_errors: Optional[int] = 16
+
+    # Opcodes are created with their final result id, renumbering them
+    # contiguously before emission is only useful to get compact ids.
+    normalise_ids: bool = False
+
+    # Every shader is generated from its own 64-bit seed, derived from this root seed
+    # and the index of the shader in the run. If None, a root seed is drawn at startup.
+    # The seed of a shader is written in its header and is enough to generate it again
+    # with the same configuration.
+    seed: Optional[int] = None
+
+    # Source of the random numbers of each shader, one of "mt19937", "pcg64" or "system"
+    # (see src/rng.py). "system" is cryptographically secure but much slower, and the
+    # shaders it generates cannot be generated again from their seed.
+    rng: str = "mt19937"
+
+    # Failing to find an operand is common with restrictive predicates. Only the first
+    # miss of each opcode and then one every `no_operand_log_interval` gets logged,
+    # 0 disables the NO_OPERAND_FOUND event altogether.
+    no_operand_log_interval: int = 100
     version: str = get_spirvsmith_version()
 
     # The following parameters are only useful when running SPIRVSmith in
@@ -108,6 +153,19 @@ class MiscConfig:
     broadcast_generated_shaders: bool = False
     upload_logs: bool = True
 
+    # Logs are shipped from a background thread in batches of at most `log_batch_size`
+    # records, or whatever was logged within `log_flush_interval` seconds.
+    log_batch_size: int = 64
+    log_flush_interval: float = 1.0
+
+    # Valid shaders are submitted one at a time as soon as they are validated, each
+    # submission thread keeping its own connection. Shaders the server cannot be
+    # reached for are spooled to `<out_folder>/corpus/spool` and retried after the
+    # next successful submission. If `submission_url` is None, shaders go through the
+    # server API client, otherwise they are posted as JSON to that URL over a
+    # kept-alive connection.
+    submission_url: Optional[str] = None
+
 
 @dataclass
 class SPIRVSmithConfig:
@@ -1,7 +1,7 @@
 import argparse
-import os
 import random
 import subprocess
+from glob import glob
 from tempfile import NamedTemporaryFile
 
 from src.shader_utils import assemble_spasm_file
@@ -15,7 +15,7 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    shader_path = f"out/{random.SystemRandom().choice(os.listdir('out/'))}"
+    shader_path = random.SystemRandom().choice(glob("out/*.spasm"))
     with NamedTemporaryFile(suffix=".spv") as assembled_spirv_file:
         assemble_spasm_file(shader_path, assembled_spirv_file.name)
         if args.target == "msl":
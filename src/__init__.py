@@ -1,22 +1,29 @@
 import inspect
+import sys
 from abc import ABC
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import field
 from dataclasses import fields
 from enum import Enum
+from functools import lru_cache
+from itertools import accumulate
 from typing import Generic
+from typing import Iterator
+from typing import NamedTuple
 from typing import TYPE_CHECKING
 from typing import TypeVar
 
-import numpy as np
-from scipy.stats import beta
 from typing_extensions import Self
 
 if TYPE_CHECKING:
     from src.context import Context
 
 from spirv_enums import Capability
-from ulid import monotonic as ulid
 
+from src.distributions import get_beta_binomial_weights
+from src.distributions import get_discretised_gaussian_weights
 from src.patched_dataclass import dataclass
 
 OpCodeName = str
@@ -36,16 +43,69 @@ class AbortFuzzing(Exception):
     ...
 
 
+class IdAllocator:
+    """
+    Hands out the result ids of a shader as sequential integers.
+
+    Every shader gets its own allocator, which is active while the shader is
+    being generated, so that opcodes are created with their final SPIR-V id.
+    """
+
+    def __init__(self) -> None:
+        self.next_id: int = 1
+
+    def allocate(self) -> int:
+        allocated_id: int = self.next_id
+        self.next_id += 1
+        return allocated_id
+
+    def observe(self, used_id: int) -> None:
+        # Ids coming from elsewhere (e.g. a parsed shader) must never be handed out
+        self.next_id = max(self.next_id, used_id + 1)
+
+    @contextmanager
+    def activated(self) -> Iterator[Self]:
+        token = ID_ALLOCATOR.set(self)
+        try:
+            yield self
+        finally:
+            ID_ALLOCATOR.reset(token)
+
+
+ID_ALLOCATOR: ContextVar[IdAllocator] = ContextVar(
+    "ID_ALLOCATOR", default=IdAllocator()
+)
+
+
+def allocate_id() -> int:
+    return ID_ALLOCATOR.get().allocate()
+
+
+# Names of the members of each opcode class, see OpCode.members
+MEMBERS: dict[type["OpCode"], tuple[str, ...]] = {}
+
+
 @dataclass
 class OpCode(ABC):
-    id: str = field(default_factory=lambda: ulid.new().str, init=False)
+    id: int = field(default_factory=allocate_id, init=False)
 
     def members(self) -> tuple[str, ...]:
-        return tuple(
-            [x.name for x in fields(self.__class__) if x.name not in {"id", "context"}]
-        )
+        try:
+            return MEMBERS[self.__class__]
+        except KeyError:
+            members: tuple[str, ...] = tuple(
+                [
+                    x.name
+                    for x in fields(self.__class__)
+                    if x.name not in {"id", "context"}
+                ]
+            )
+            MEMBERS[self.__class__] = members
+            return members
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         return (other.__class__.__name__ == self.__class__.__name__) and (
             hash(self) == hash(other)
         )
@@ -90,21 +150,18 @@ class OpCode(ABC):
         return attr_spasm
 
     def to_spasm(self, context: "Context") -> str:
-        attrs = self.members()
-        if self.__class__.__name__ == "OpStore":
-            pass
         if isinstance(self, VoidOp):
-            spasm = f"{self.__class__.__name__}"
+            parts: list[str] = [self.__class__.__name__]
         else:
-            spasm = f"%{self.id} = {self.__class__.__name__}"
-        for attr_name in attrs:
+            parts = [f"%{self.id} = {self.__class__.__name__}"]
+        for attr_name in self.members():
             attr = getattr(self, attr_name)
             if isinstance(attr, (tuple, list)):
                 for _attr in attr:
-                    spasm += self.resolve_attribute_spasm(_attr, context)
+                    parts.append(self.resolve_attribute_spasm(_attr, context))
             else:
-                spasm += self.resolve_attribute_spasm(attr, context)
-        return spasm
+                parts.append(self.resolve_attribute_spasm(attr, context))
+        return "".join(parts)
 
 
 class VoidOp(OpCode):
@@ -121,35 +178,181 @@ class FuzzResult(Generic[T]):
     is_opcode_pre_side_effects: bool = field(default_factory=lambda: False)
 
 
-# A FuzzDelegator is a transient object, we need to commit
-# reparametrizations to this global object.
-PARAMETRIZATIONS: dict[str, dict[str, int]] = {}
-COUNT: int = 0
+@dataclass
+class GenerationState:
+    """
+    Fuzzing state of a single shader being generated.
+
+    A FuzzDelegator is a transient object, reparametrizations are
+    committed to the state of the shader they were made for so that
+    independent shaders can be generated concurrently.
+    """
+
+    parametrizations: dict[str, dict[str, float]] = field(default_factory=dict)
+    # Cumulative weights of each parametrization, in delegation tree order
+    cum_weights: dict[str, list[float]] = field(default_factory=dict)
+    count: int = 0
+    # Operand misses per requesting opcode, only a sample of them gets logged
+    no_operand_found_counts: Counter[str] = field(default_factory=Counter)
+
+
+class DelegationNode(NamedTuple):
+    # Direct subclasses of a delegator, sorted by name
+    subclasses: tuple[type["FuzzDelegator"], ...]
+    names: tuple[OpCodeName, ...]
+    # Subclasses that require the GLSL.std.450 extended instruction set
+    glsl_names: tuple[OpCodeName, ...]
+
+
+DELEGATION_TREE: dict[type["FuzzDelegator"], DelegationNode] = {}
+DELEGATION_TREE_LOADED: bool = False
+
+
+def get_delegation_node(cls: type["FuzzDelegator"]) -> DelegationNode:
+    try:
+        return DELEGATION_TREE[cls]
+    except KeyError:
+        pass
+    if not DELEGATION_TREE_LOADED:
+        load_delegation_tree()
+        return get_delegation_node(cls)
+    from src.operators import GLSLExtensionOperator
+
+    subclasses: dict[OpCodeName, type["FuzzDelegator"]] = {}
+    for subclass in cls.get_subclasses():
+        # Slotted dataclasses are recreated by the decorator, the original
+        # class lingers in __subclasses__ until it gets garbage collected
+        module = sys.modules.get(subclass.__module__)
+        if (
+            subclass.__name__ not in subclasses
+            or getattr(module, subclass.__name__, None) is subclass
+        ):
+            subclasses[subclass.__name__] = subclass
+    names: tuple[OpCodeName, ...] = tuple(sorted(subclasses))
+    node = DelegationNode(
+        subclasses=tuple(subclasses[name] for name in names),
+        names=names,
+        glsl_names=tuple(
+            name
+            for name in names
+            if issubclass(subclasses[name], GLSLExtensionOperator)
+        ),
+    )
+    DELEGATION_TREE[cls] = node
+    return node
+
+
+@lru_cache(maxsize=4096)
+def get_availability_mask(
+    cls: type["FuzzDelegator"], operand_shapes: frozenset[tuple]
+) -> tuple[bool, ...]:
+    """
+    Which subclasses of a delegator can be fuzzed when the operands in scope
+    have these shapes (see src.operand_index.get_shape).
+    """
+    return tuple(
+        subclass.is_available(operand_shapes)
+        for subclass in get_delegation_node(cls).subclasses
+    )
+
+
+def load_delegation_tree() -> None:
+    """
+    Imports every module defining fuzzable opcodes and builds the delegation
+    tree from FuzzDelegator down to the leaves.
+    """
+    global DELEGATION_TREE_LOADED
+    import src.operators.arithmetic.scalar_arithmetic
+    import src.operators.arithmetic.linear_algebra
+    import src.operators.arithmetic.glsl
+    import src.operators.bitwise
+    import src.operators.composite
+    import src.operators.conversions
+    import src.operators.logic
+    import src.operators.memory.memory_access
+    import src.operators.memory.variable
+    import src.types.abstract_types
+    import src.types.concrete_types
+
+    DELEGATION_TREE_LOADED = True
+    delegators: list[type[FuzzDelegator]] = [FuzzDelegator]
+    while delegators:
+        delegators += get_delegation_node(delegators.pop()).subclasses
 
 
 class FuzzDelegator(OpCode):
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # The delegation tree changed, nodes have to be rebuilt
+        DELEGATION_TREE.clear()
+        get_availability_mask.cache_clear()
+
     @classmethod
     def get_subclasses(cls) -> set["FuzzDelegator"]:
         return set(cls.__subclasses__())
 
     @classmethod
-    def is_parametrized(cls):
-        return cls.__name__ in PARAMETRIZATIONS
+    def is_parametrized(cls, context: "Context") -> bool:
+        return cls.__name__ in context.state.parametrizations
+
+    @classmethod
+    def get_parametrization(cls, context: "Context") -> dict[str, float]:
+        return context.state.parametrizations[cls.__name__]
 
     @classmethod
-    def get_parametrization(cls):
-        return PARAMETRIZATIONS[cls.__name__]
+    def get_cum_weights(cls, context: "Context") -> list[float]:
+        try:
+            return context.state.cum_weights[cls.__name__]
+        except KeyError:
+            parametrization: dict[str, float] = cls.get_parametrization(context)
+            cum_weights: list[float] = list(
+                accumulate(
+                    parametrization[name] for name in get_delegation_node(cls).names
+                )
+            )
+            context.state.cum_weights[cls.__name__] = cum_weights
+            return cum_weights
+
+    @classmethod
+    def is_available(cls, operand_shapes: frozenset[tuple]) -> bool:
+        """
+        Whether this opcode can find its operands among operands of these
+        shapes. Delegators are available when one of their subclasses is,
+        opcodes that do not declare what they need always are.
+        """
+        if not get_delegation_node(cls).subclasses:
+            return True
+        return any(get_availability_mask(cls, operand_shapes))
 
     @classmethod
-    def reset_parametrizations(cls):
-        global PARAMETRIZATIONS
-        global COUNT
-        COUNT = 0
-        PARAMETRIZATIONS = {}
+    def get_available_cum_weights(cls, context: "Context") -> list[float]:
+        """
+        Cumulative weights of the subclasses, where statements that cannot
+        find their operands in scope get a zero weight instead of being
+        picked and aborting.
+        """
+        cum_weights: list[float] = cls.get_cum_weights(context)
+        if not issubclass(cls, Statement):
+            return cum_weights
+        mask: tuple[bool, ...] = get_availability_mask(
+            cls, context.get_operand_shapes()
+        )
+        if all(mask):
+            return cum_weights
+        parametrization: dict[str, float] = cls.get_parametrization(context)
+        cum_weights = list(
+            accumulate(
+                parametrization[name] if available else 0
+                for name, available in zip(get_delegation_node(cls).names, mask)
+            )
+        )
+        if cum_weights[-1] == 0:
+            raise AbortFuzzing
+        return cum_weights
 
     @classmethod
     def set_zero_probability(cls, target_cls, context: "Context") -> None:
-        if not cls.is_parametrized():
+        if not cls.is_parametrized(context):
             cls.parametrize(context=context)
         # There is a tricky case here when an OpCode can be reached
         # from multiple delegators.
@@ -157,20 +360,22 @@ class FuzzDelegator(OpCode):
         # The delegation path then has a fork in it and when we try
         # to reparametrize it is possible that ot all delegators in
         # the path have been parametrized yet
-        PARAMETRIZATIONS[cls.__name__][target_cls.__name__] = 0
+        cls.get_parametrization(context)[target_cls.__name__] = 0
+        context.state.cum_weights.pop(cls.__name__, None)
 
     @classmethod
     def parametrize(cls, context: "Context") -> None:
-        subclasses_names: list[OpCodeName] = sorted(
-            set(map(lambda cls: cls.__name__, cls.get_subclasses()))
-        )
+        node: DelegationNode = get_delegation_node(cls)
+        subclasses_names: tuple[OpCodeName, ...] = node.names
         # Get parametrization from config for top-level delegators
-        PARAMETRIZATIONS[cls.__name__] = {}
-        for subclass_name in subclasses_names:
-            PARAMETRIZATIONS[cls.__name__][subclass_name] = 1
+        parametrization: dict[str, float] = dict.fromkeys(subclasses_names, 1)
+        context.state.parametrizations[cls.__name__] = parametrization
+        context.state.cum_weights.pop(cls.__name__, None)
         if cls.__name__ == "Statement":
-            PARAMETRIZATIONS[cls.__name__]["OpExtInst"] = 0
-            subclasses_names.remove("OpExtInst")
+            parametrization["OpExtInst"] = 0
+            subclasses_names = tuple(
+                name for name in subclasses_names if name != "OpExtInst"
+            )
             N = len(subclasses_names)
             match context.config.strategy.gp_policy:
                 case "uniform":
@@ -178,77 +383,79 @@ class FuzzDelegator(OpCode):
                 case "gaussian":
                     mu = context.rng.uniform(0, N)
                     sigma = context.rng.uniform(1.5, 3.5)
-                    sample = np.random.normal(loc=mu, scale=sigma, size=100000)
-                    sample = np.round(sample).astype(int)
-                    sample = [x for x in sample if 0 <= x < N]
-                    _, count = np.unique(sample, return_counts=True)
-                    probs = count / len(sample)
+                    probs = get_discretised_gaussian_weights(mu, sigma, N)
                 case "beta_binomial":
                     mu = context.rng.uniform(0.1, 0.9)
                     sigma = context.rng.uniform(0.1, 0.25)
-
-                    n = (mu * (1 - mu)) / sigma**2
-                    a = mu * n
-                    b = (1 - mu) * n
-
-                    x = np.linspace(beta.ppf(0.01, a, b), beta.ppf(0.99, a, b), N)
-                    pdf = beta.pdf(x, a, b)
-                    probs = pdf / pdf.sum()
+                    probs = get_beta_binomial_weights(mu, sigma, N)
             for prob, subclass_name in zip(probs, subclasses_names):
-                PARAMETRIZATIONS[cls.__name__][subclass_name] = prob
+                parametrization[subclass_name] = prob
+        if not context.config.strategy.enable_ext_glsl_std_450:
+            for subclass_name in node.glsl_names:
+                parametrization[subclass_name] = 0
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         """
         Sentinel
         """
-        global COUNT
-        if COUNT > context.config.strategy.shader_target_size:
+        if context.state.count > context.settings.shader_target_size:
             raise GeneratorExit
-        import src.operators.arithmetic.scalar_arithmetic
-        import src.operators.arithmetic.linear_algebra
-        import src.operators.bitwise
-        import src.operators.composite
-        import src.operators.conversions
-        import src.operators.logic
-        import src.operators.memory.memory_access
-        import src.operators.memory.variable
-        import src.types.abstract_types
-        import src.types.concrete_types
-
-        if context.config.strategy.enable_ext_glsl_std_450:
-            import src.operators.arithmetic.glsl
-        if not cls.is_parametrized():
+        node: DelegationNode = get_delegation_node(cls)
+        if not cls.is_parametrized(context):
             cls.parametrize(context=context)
-        if context.rng.random() < context.config.strategy.p_mutation:
+        if context.rng.random() < context.settings.p_mutation:
             Statement.parametrize(context=context)
-        subclasses: list[type["FuzzDelegator"]] = list(cls.get_subclasses())
-        if cls is Type or issubclass(cls, Type):
-            excluded_types = [
-                subclass
-                for subclass in subclasses
-                if subclass.__name__ in context.config.strategy.type_exclusion_set
-            ]
-            for excluded_type in excluded_types:
-                cls.set_zero_probability(excluded_type, context)
-        weights = [PARAMETRIZATIONS[cls.__name__][sub.__name__] for sub in subclasses]
-        if sum(weights) == 0 or len(weights) == 0:
-            print(cls, subclasses, weights)
+        if issubclass(cls, Type):
+            parametrization: dict[str, float] = cls.get_parametrization(context)
+            for subclass in node.subclasses:
+                if (
+                    subclass.__name__ in context.config.strategy.type_exclusion_set
+                    and parametrization[subclass.__name__] != 0
+                ):
+                    cls.set_zero_probability(subclass, context)
+        cum_weights: list[float] = cls.get_available_cum_weights(context)
+        if len(cum_weights) == 0 or cum_weights[-1] == 0:
+            print(cls, node.subclasses, cum_weights)
         try:
-            subclass = context.rng.choices(subclasses, weights=weights, k=1)[0]
+            subclass = context.rng.choices(
+                node.subclasses, cum_weights=cum_weights, k=1
+            )[0]
             fuzzed_subclass = subclass.fuzz(context)
         except ReparametrizationError:
-            subclass = context.rng.choices(subclasses, weights=weights, k=1)[0]
+            subclass = context.rng.choices(
+                node.subclasses, cum_weights=cls.get_available_cum_weights(context), k=1
+            )[0]
             fuzzed_subclass = subclass.fuzz(context)
         if cls.fuzz.__doc__ != subclass.fuzz.__doc__ and not issubclass(
             subclass, (Type, Constant)
         ):
-            COUNT += 1
+            context.state.count += 1
         return fuzzed_subclass
 
 
+class HashConsed:
+    """
+    Types and constants are interned in the global scope of a shader and used
+    as dictionary keys everywhere, so their (recursive) hash is computed once
+    and only recomputed after one of their members gets reassigned.
+    """
+
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        self.__dict__.pop("cached_hash", None)
+
+    def __hash__(self) -> int:
+        try:
+            return self.__dict__["cached_hash"]
+        except KeyError:
+            cached_hash: int = OpCode.__hash__(self)
+            self.__dict__["cached_hash"] = cached_hash
+            return cached_hash
+
+
 @dataclass
-class Type(FuzzDelegator):
+class Type(HashConsed, FuzzDelegator):
     @staticmethod
     def get_base_type() -> Self:
         ...
@@ -262,7 +469,7 @@ class FuzzLeafMixin:
 
 
 @dataclass
-class Constant(FuzzDelegator):
+class Constant(HashConsed, FuzzDelegator):
     type: Type
 
     def get_base_type(self) -> Type:
@@ -83,7 +83,9 @@ class OpConstantComposite(CompositeConstant):
     def fuzz_constituents(base_type: Type, n: int, context: "Context") -> list[OpCode]:
         constituents: list[OpCode] = []
         for _ in range(n):
-            constituent: Constant = context.get_random_operand(HasType(base_type))
+            constituent: Constant = context.get_random_operand(
+                HasType(base_type), requester=OpConstantComposite
+            )
             if constituent:
                 constituents.append(constituent)
             else:
@@ -1,16 +1,12 @@
-import inspect
 import random
+from collections import Counter
 from dataclasses import dataclass
 from dataclasses import field
 from types import NoneType
 from typing import Callable
-from typing import Iterable
 from typing import Optional
 from typing import TYPE_CHECKING
 
-import numpy as np
-import ulid
-from scipy.stats import beta
 from spirv_enums import Decoration
 from spirv_enums import ExecutionModel
 from spirv_enums import StorageClass
@@ -18,8 +14,9 @@ from typing_extensions import Self
 
 from src import AbortFuzzing
 from src import FuzzResult
+from src import GenerationState
+from src import IdAllocator
 from src import Statement
-from src import Untyped
 from src.annotations import Annotation
 from src.annotations import OpDecorate
 from src.annotations import OpMemberDecorate
@@ -28,10 +25,17 @@ from src.constants import Constant
 from src.constants import OpConstant
 from src.constants import OpConstantComposite
 from src.constants import ScalarConstant
+from src.distributions import get_recency_cum_weights
 from src.function import OpFunction
 from src.monitor import Event
 from src.monitor import Monitor
+from src.operand_index import OperandIndex
+from src.operand_index import OperandKind
+from src.operand_index import Shape
 from src.operators import Operand
+from src.rng import create_rng
+from src.rng import DEFAULT_RNG_SOURCE
+from src.rng import get_process_rng
 from src.types.abstract_types import Type
 from src.types.concrete_types import OpTypeFunction
 from src.types.concrete_types import OpTypePointer
@@ -46,26 +50,105 @@ if TYPE_CHECKING:
 from src.operators.memory.memory_access import OpVariable
 
 
+@dataclass(frozen=True, slots=True)
+class GenerationSettings:
+    """
+    The parts of the configuration read for every generated instruction.
+
+    Reading a DictConfig goes through OmegaConf's node resolution on every
+    access, so these are copied out once per shader. Parameters read once
+    per shader or per delegator stay in the DictConfig.
+    """
+
+    shader_target_size: int
+    max_depth: int
+    p_mutation: float
+    p_picking_statement_operand: float
+    rbp_policy: str
+    no_operand_log_interval: int
+
+    @classmethod
+    def from_config(cls, config: "SPIRVSmithConfig") -> Self:
+        return cls(
+            shader_target_size=config.strategy.shader_target_size,
+            max_depth=config.limits.max_depth,
+            p_mutation=config.strategy.p_mutation,
+            p_picking_statement_operand=config.strategy.p_picking_statement_operand,
+            rbp_policy=config.strategy.rbp_policy,
+            no_operand_log_interval=config.misc.no_operand_log_interval,
+        )
+
+
 @dataclass
 class Context:
-    id: str = field(default_factory=lambda: ulid.new().str, init=False)
     function: Optional["OpFunction"]
     parent_context: Optional[Self]
     execution_model: ExecutionModel
     config: "SPIRVSmithConfig"
-    rng: random.SystemRandom
+    rng: random.Random
     symbol_table: list["OpCode"] = field(default_factory=list)
-    globals: dict["OpCode", str] = field(default_factory=dict)
+    globals: dict["OpCode", int] = field(default_factory=dict)
+    interned: dict["OpCode", "OpCode"] = field(default_factory=dict)
     annotations: dict[Annotation, NoneType] = field(default_factory=dict)
     extension_sets: dict[str, "OpExtInstImport"] = field(default_factory=dict)
+    state: GenerationState = field(default_factory=GenerationState)
+    symbol_index: OperandIndex = field(default_factory=OperandIndex)
+    globals_index: OperandIndex = field(default_factory=OperandIndex)
+    id_allocator: IdAllocator = field(default_factory=IdAllocator)
+    # Seed of `rng`, the shader can be generated again from it
+    seed: Optional[int] = None
+    # Snapshot of `config` for the hot paths, taken when the shader starts.
+    # None for parsed shaders, which have no configuration
+    settings: Optional[GenerationSettings] = None
+    # Position in the scope tree, fixed at creation: the depth of the scope,
+    # the global context at its root and the symbol indices of the scopes
+    # visible from it, innermost first
+    depth: int = field(init=False)
+    root: Self = field(init=False, repr=False, compare=False)
+    scope_indices: tuple[OperandIndex, ...] = field(
+        init=False, repr=False, compare=False
+    )
+    # Shapes of the operands visible from this scope, with the number of
+    # shapes in each index they were collected from
+    operand_shapes: tuple[tuple[int, ...], frozenset[Shape]] = field(
+        default=((), frozenset()), init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.settings is None and self.config:
+            self.settings = GenerationSettings.from_config(self.config)
+        if self.parent_context is None:
+            self.depth = 1
+            self.root = self
+            self.scope_indices = (self.symbol_index,)
+        else:
+            self.depth = self.parent_context.depth + 1
+            self.root = self.parent_context.root
+            # The chain of the parent is shared, not walked again on lookups
+            self.scope_indices = (
+                self.symbol_index,
+                *self.parent_context.scope_indices,
+            )
 
     @classmethod
     def create_global_context(
         cls,
         execution_model: ExecutionModel,
         config: "SPIRVSmithConfig",
+        seed: Optional[int] = None,
     ) -> Self:
-        return cls(None, None, execution_model, config, random.SystemRandom())
+        if seed is None:
+            seed = get_process_rng().getrandbits(64)
+        context: Self = cls(
+            None,
+            None,
+            execution_model,
+            config,
+            # Parsed shaders have no configuration
+            create_rng(seed, config.misc.rng if config else DEFAULT_RNG_SOURCE),
+            seed=seed,
+        )
+        return context
 
     def make_child_context(self, function: Optional[OpFunction] = None) -> Self:
         return Context(
@@ -75,29 +158,77 @@ class Context:
             self.config,
             self.rng,
             globals=self.globals,
+            interned=self.interned,
+            globals_index=self.globals_index,
             annotations=self.annotations,
             extension_sets=self.extension_sets,
+            state=self.state,
+            id_allocator=self.id_allocator,
+            seed=self.seed,
+            settings=self.settings,
         )
 
-    def add_to_tvc(self, opcode: "OpCode") -> None:
-        if not opcode in self.globals:
-            self.globals[opcode] = opcode.id
+    def add_to_tvc(self, opcode: "OpCode") -> "OpCode":
+        """
+        Registers a type, constant or global variable and returns the
+        instance of it that is interned in the global scope.
+        """
+        try:
+            return self.interned[opcode]
+        except KeyError:
+            pass
+        self.intern_members(opcode)
+        self.globals[opcode] = opcode.id
+        self.interned[opcode] = opcode
+        self.globals_index.add(opcode)
+        return opcode
+
+    def intern_members(self, opcode: "OpCode") -> None:
+        # Share the already registered instances of nested types and constants
+        # so that structurally identical subtrees are only stored once
+        for attr_name in opcode.members():
+            attr = getattr(opcode, attr_name)
+            if isinstance(attr, (Type, Constant)):
+                canonical = self.interned.get(attr, attr)
+                if canonical is not attr:
+                    setattr(opcode, attr_name, canonical)
+            elif isinstance(attr, (tuple, list)):
+                canonicals = [
+                    self.interned.get(x, x) if isinstance(x, (Type, Constant)) else x
+                    for x in attr
+                ]
+                if any(canonical is not x for canonical, x in zip(canonicals, attr)):
+                    setattr(opcode, attr_name, attr.__class__(canonicals))
+
+    def add_to_symbol_table(self, opcode: "OpCode") -> None:
+        self.symbol_table.append(opcode)
+        self.symbol_index.add(opcode)
 
     def get_local_variables(self) -> list[OpVariable]:
-        variables: list[OpVariable] = list(
-            filter(lambda sym: isinstance(sym, OpVariable), self.symbol_table)
-        )
-        if self.parent_context:
-            return variables + self.parent_context.get_local_variables()
-        return variables
+        return [
+            variable
+            for index in self.scope_indices
+            for variable in index.instances(OpVariable)
+        ]
 
     def get_global_variables(self) -> list[OpVariable]:
-        return list(
-            filter(lambda tvc: isinstance(tvc, OpVariable), self.globals.keys())
-        )
+        return self.globals_index.instances(OpVariable)
+
+    def should_log_no_operand_found(self, requester: type["OpCode"]) -> bool:
+        """
+        Whether to log this miss: the first one for each opcode is, then one
+        every `no_operand_log_interval`. An interval of 0 disables the event.
+        """
+        counts: Counter[str] = self.state.no_operand_found_counts
+        counts[requester.__name__] += 1
+        interval: int = self.settings.no_operand_log_interval
+        return interval > 0 and counts[requester.__name__] % interval == 1 % interval
 
     def get_random_variable(
-        self, predicate: Callable[[OpVariable], bool]
+        self,
+        predicate: Callable[[OpVariable], bool],
+        *,
+        requester: type["OpCode"],
     ) -> Optional[OpVariable]:
         variables = list(
             filter(predicate, self.get_local_variables() + self.get_global_variables())
@@ -105,43 +236,64 @@ class Context:
         try:
             return self.rng.choice(variables)
         except IndexError:
-            Monitor(self.config).info(
-                event=Event.NO_OPERAND_FOUND,
-                extra={
-                    "opcode": inspect.stack()[1][0].f_locals["self"].__class__.__name__,
-                    "local_vars": self.get_local_variables(),
-                    "global_vars": self.get_global_variables(),
-                },
-            )
+            if self.should_log_no_operand_found(requester):
+                Monitor(self.config).info(
+                    event=Event.NO_OPERAND_FOUND,
+                    extra={
+                        "opcode": requester.__name__,
+                        "n_misses": self.state.no_operand_found_counts[
+                            requester.__name__
+                        ],
+                        "local_vars": self.get_local_variables(),
+                        "global_vars": self.get_global_variables(),
+                    },
+                )
             return None
 
     def get_statements(self, predicate: Callable[[Statement], bool]) -> list[Statement]:
-        statements: list[Statement] = list(
-            filter(lambda sym: isinstance(sym, Statement), self.symbol_table)
-        )
-        parent: Optional[Context] = self.parent_context
-        while parent:
-            statements += list(
-                filter(lambda sym: isinstance(sym, Statement), parent.symbol_table)
-            )
-            parent = parent.parent_context
-        return list(filter(predicate, statements))
+        return [
+            statement
+            for index in self.scope_indices
+            for statement in index.instances(Statement)
+            if predicate(statement)
+        ]
 
     def get_typed_statements(
         self, predicate: Optional[Callable[[Statement], bool]] = None
     ) -> list[Statement]:
-        statements = self.get_statements(lambda sym: not isinstance(sym, Untyped))
-        if not predicate:
-            return list(statements)
-        return list(filter(predicate, statements))
+        if len(self.scope_indices) == 1:
+            return self.symbol_index.find(OperandKind.STATEMENT, predicate)
+        return [
+            statement
+            for index in self.scope_indices
+            for statement in index.find(OperandKind.STATEMENT, predicate)
+        ]
+
+    def get_operand_shapes(self) -> frozenset[Shape]:
+        """
+        Shapes of the operands `get_random_operand` can pick from: the
+        statements of the visible scopes and the constants.
+        """
+        # Shapes are never removed from an index, so the number of shapes in
+        # each index tells whether new ones appeared since the last call
+        key: tuple[int, ...] = (
+            len(self.globals_index.operands_by_shape[OperandKind.CONSTANT]),
+            *(
+                len(index.operands_by_shape[OperandKind.STATEMENT])
+                for index in self.scope_indices
+            ),
+        )
+        if self.operand_shapes[0] != key:
+            shapes: set[Shape] = set(
+                self.globals_index.operands_by_shape[OperandKind.CONSTANT]
+            )
+            for index in self.scope_indices:
+                shapes.update(index.operands_by_shape[OperandKind.STATEMENT])
+            self.operand_shapes = (key, frozenset(shapes))
+        return self.operand_shapes[1]
 
     def get_depth(self) -> int:
-        depth = 1
-        parent: Optional[Context] = self.parent_context
-        while parent:
-            depth += 1
-            parent = parent.parent_context
-        return depth
+        return self.depth
 
     def gen_types(self):
         for _ in range(self.config.limits.n_types - 1):
@@ -238,93 +390,62 @@ class Context:
     def get_constants(
         self, predicate: Optional[Callable[[Constant], bool]] = None
     ) -> list[Constant]:
-        constants: Iterable[Constant] = filter(
-            lambda t: isinstance(t, Constant), self.globals.keys()
-        )
-        if not predicate:
-            return list(constants)
-        return list(filter(predicate, constants))
+        return self.globals_index.find(OperandKind.CONSTANT, predicate)
 
     def get_random_operand(
         self,
         predicate: Callable[[Statement], bool],
         constraint: Optional[Statement | Constant] = None,
+        *,
+        requester: type["OpCode"],
     ) -> Operand:
         statements: list[Statement] = self.get_typed_statements(predicate)
         constants: list[Constant] = self.get_constants(predicate)
         N, M = len(statements), len(constants)
         try:
             if (
-                self.rng.random()
-                < self.config["strategy"]["p_picking_statement_operand"]
-                and N > 0
+                self.rng.random() < self.settings.p_picking_statement_operand and N > 0
             ) or (M == 0 and N > 0):
-                match self.config.strategy.rbp_policy:
-                    case "uniform":
-                        probs = [1 / N] * N
-                    case "greedy":
-                        probs = [1] + [0] * (N - 1)
-                    case "linear":
-                        probs = [N - n + N // 2 for n in range(N)]
-                    case "beta_binomial":
-                        mu = 0.2
-                        sigma = 0.35
-
-                        n = (mu * (1 - mu)) / sigma**2
-                        a = mu * n
-                        b = (1 - mu) * n
-
-                        x = np.linspace(beta.ppf(0.01, a, b), beta.ppf(0.99, a, b), N)
-                        pdf = beta.pdf(x, a, b)
-                        probs = pdf / pdf.sum()
-                return self.rng.choices(statements, weights=probs[::-1], k=1)[0]
+                cum_weights: tuple[float, ...] = get_recency_cum_weights(
+                    self.settings.rbp_policy, N
+                )
+                return self.rng.choices(statements, cum_weights=cum_weights, k=1)[0]
             else:
                 return self.rng.choice(list(constants))
         except IndexError:
-            try:
-                opcode_name: str = inspect.stack()[1][0].f_locals["cls"].__name__
-            except KeyError:
-                try:
-                    opcode_name: str = (
-                        inspect.stack()[1][0].f_locals["self"].__class__.__name__
-                    )
-                except KeyError:
-                    opcode_name = "unknown"
-            Monitor(self.config).info(
-                event=Event.NO_OPERAND_FOUND,
-                extra={
-                    "opcode": opcode_name,
-                    "constraint": str(constraint),
-                    "constants": self.get_constants(),
-                    "statements": self.get_typed_statements(),
-                },
-            )
+            if self.should_log_no_operand_found(requester):
+                Monitor(self.config).info(
+                    event=Event.NO_OPERAND_FOUND,
+                    extra={
+                        "opcode": requester.__name__,
+                        "n_misses": self.state.no_operand_found_counts[
+                            requester.__name__
+                        ],
+                        "constraint": str(constraint),
+                        "constants": self.get_constants(),
+                        "statements": self.get_typed_statements(),
+                    },
+                )
             raise AbortFuzzing
 
     def get_function_types(self) -> list[OpTypeFunction]:
-        return list(
-            filter(lambda t: isinstance(t, OpTypeFunction), self.globals.keys())
-        )
+        return self.globals_index.instances(OpTypeFunction)
 
     def get_interfaces(self) -> tuple[OpVariable, ...]:
         return tuple(
             filter(
-                lambda s: isinstance(s, OpVariable)
-                and (
-                    s.storage_class == StorageClass.Input
-                    or s.storage_class == StorageClass.Output
-                    # or s.storage_class == StorageClass.StorageBuffer
-                ),
-                self.globals,
+                lambda s: s.storage_class == StorageClass.Input
+                or s.storage_class == StorageClass.Output,
+                # or s.storage_class == StorageClass.StorageBuffer
+                self.get_global_variables(),
             )
         )
 
     def get_storage_buffers(self) -> list[OpVariable]:
         return list(
             filter(
-                lambda s: isinstance(s, OpVariable)
-                and (s.storage_class == StorageClass.StorageBuffer),
-                self.globals,
+                lambda s: s.storage_class == StorageClass.StorageBuffer,
+                self.get_global_variables(),
             )
         )
 
@@ -345,10 +466,8 @@ class Context:
         constant_type.width = width
         if hasattr(constant_type, "signed"):
             constant_type.signed = signed
-        constant = OpConstant(type=constant_type, value=value)
-        self.add_to_tvc(constant_type)
-        self.add_to_tvc(constant)
-        return constant
+        constant_type = self.add_to_tvc(constant_type)
+        return self.add_to_tvc(OpConstant(type=constant_type, value=value))
 
     def create_on_demand_variable(
         self,
@@ -359,12 +478,7 @@ class Context:
             pointer_inner_type = type
         else:
             pointer_inner_type = self.rng.choice(
-                list(
-                    filter(
-                        lambda tvc: isinstance(tvc, OpTypeStruct),
-                        self.globals.keys(),
-                    )
-                )
+                self.globals_index.instances(OpTypeStruct)
             )
         pointer_type = OpTypePointer(
             storage_class=storage_class, type=pointer_inner_type
@@ -388,10 +502,7 @@ class Context:
         return vector_const
 
     def get_global_context(self) -> Self:
-        current_context = self
-        while current_context.parent_context:
-            current_context = self.parent_context
-        return current_context
+        return self.root
 
     def add_annotation(self, annotation: Annotation):
-        self.get_global_context().annotations[annotation] = None
+        self.root.annotations[annotation] = None
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Iterator
+from typing import TYPE_CHECKING
+
+from omegaconf import OmegaConf
+
+from src.utils import get_spirvsmith_version
+
+if TYPE_CHECKING:
+    from run import SPIRVSmithConfig
+    from src.shader_utils import SPIRVShader
+
+
+def get_generation_config(config: "SPIRVSmithConfig") -> dict:
+    """
+    The parts of the configuration that change what gets generated from a seed.
+    """
+    return {
+        "limits": OmegaConf.to_container(config.limits, resolve=True),
+        "strategy": OmegaConf.to_container(config.strategy, resolve=True),
+        "normalise_ids": config.misc.normalise_ids,
+        "rng": config.misc.rng,
+    }
+
+
+def hash_config(config: "SPIRVSmithConfig") -> str:
+    generation_config: str = json.dumps(get_generation_config(config), sort_keys=True)
+    return hashlib.sha256(generation_config.encode()).hexdigest()[:16]
+
+
+@dataclass
+class CorpusEntry:
+    version: str
+    config_hash: str
+    seed: int
+    shader_id: str
+    is_valid: bool
+
+
+class Corpus:
+    """
+    Shaders stored as the seed they were generated from.
+
+    Entries are appended to `corpus.jsonl` in `folder`, and every generation
+    config they refer to is stored once in `configs/<config_hash>.yaml`. A
+    shader can then be regenerated on any node from its entry alone, as long
+    as it runs the same SPIRVSmith version.
+    """
+
+    def __init__(self, folder: str) -> None:
+        self.folder: str = folder
+        self.entries_path: str = os.path.join(folder, "corpus.jsonl")
+        self.configs_folder: str = os.path.join(folder, "configs")
+        self.lock = threading.Lock()
+
+    def get_config_path(self, config_hash: str) -> str:
+        return os.path.join(self.configs_folder, f"{config_hash}.yaml")
+
+    def add(
+        self,
+        config: "SPIRVSmithConfig",
+        seed: int,
+        shader_id: str,
+        is_valid: bool,
+    ) -> CorpusEntry:
+        entry: CorpusEntry = CorpusEntry(
+            get_spirvsmith_version(), hash_config(config), seed, shader_id, is_valid
+        )
+        with self.lock:
+            config_path: str = self.get_config_path(entry.config_hash)
+            if not os.path.exists(config_path):
+                os.makedirs(self.configs_folder, exist_ok=True)
+                OmegaConf.save(config, config_path)
+            with open(self.entries_path, "a") as f:
+                f.write(json.dumps(asdict(entry)) + "\n")
+        return entry
+
+    def __iter__(self) -> Iterator[CorpusEntry]:
+        if not os.path.exists(self.entries_path):
+            return
+        with open(self.entries_path) as f:
+            for line in f:
+                yield CorpusEntry(**json.loads(line))
+
+    def load_config(self, config_hash: str) -> "SPIRVSmithConfig":
+        return OmegaConf.load(self.get_config_path(config_hash))
+
+    def regenerate(self, entry: CorpusEntry) -> "SPIRVShader":
+        if entry.version != get_spirvsmith_version():
+            raise ValueError(
+                f"Shader {entry.shader_id} was generated by SPIRVSmith {entry.version}, "
+                f"it cannot be regenerated by {get_spirvsmith_version()}"
+            )
+        return regenerate(self.load_config(entry.config_hash), entry.seed)
+
+
+def regenerate(config: "SPIRVSmithConfig", seed: int) -> "SPIRVShader":
+    """
+    Generates the shader of the given seed again.
+    """
+    # Imported here, the fuzzing client pulls in the server API client
+    from src.fuzzing_client import ShaderGenerator
+
+    return ShaderGenerator(config).gen_shader(seed)
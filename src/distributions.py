@@ -0,0 +1,91 @@
+from functools import lru_cache
+from itertools import accumulate
+
+import numpy as np
+
+# scipy.stats alone takes longer to import than the rest of SPIRVSmith, it is
+# only imported by the functions below that need it
+
+# Parameters of the beta distribution used by the beta_binomial policy
+BETA_BINOMIAL_MU = 0.2
+BETA_BINOMIAL_SIGMA = 0.35
+
+
+def get_beta_binomial_shape() -> tuple[float, float]:
+    n = (BETA_BINOMIAL_MU * (1 - BETA_BINOMIAL_MU)) / BETA_BINOMIAL_SIGMA**2
+    return BETA_BINOMIAL_MU * n, (1 - BETA_BINOMIAL_MU) * n
+
+
+@lru_cache(maxsize=None)
+def get_beta_binomial_support() -> tuple[float, float]:
+    from scipy.stats import beta
+
+    a, b = get_beta_binomial_shape()
+    return float(beta.ppf(0.01, a, b)), float(beta.ppf(0.99, a, b))
+
+
+def get_recency_weights(policy: str, N: int) -> list[float]:
+    """
+    Weights over the N candidate statements, most recently defined first,
+    according to the recency-bias policy.
+    """
+    match policy:
+        case "uniform":
+            return [1 / N] * N
+        case "greedy":
+            return [1] + [0] * (N - 1)
+        case "linear":
+            return [N - n + N // 2 for n in range(N)]
+        case "beta_binomial":
+            from scipy.stats import beta
+
+            a, b = get_beta_binomial_shape()
+            x = np.linspace(*get_beta_binomial_support(), N)
+            pdf = beta.pdf(x, a, b)
+            return list(pdf / pdf.sum())
+        case _:
+            raise ValueError(f"Unknown recency-bias policy: {policy}")
+
+
+@lru_cache(maxsize=1024)
+def get_recency_cum_weights(policy: str, N: int) -> tuple[float, ...]:
+    """
+    Cumulative weights for picking one of N statements with `rng.choices`.
+
+    The weights of `get_recency_weights` are reversed before accumulating, as
+    statements are stored in definition order. The result is identical to
+    passing the reversed weights to `rng.choices` directly, so the draws (and
+    hence the generated shaders) are the same for a given seed.
+    """
+    return tuple(accumulate(get_recency_weights(policy, N)[::-1]))
+
+
+def get_discretised_gaussian_weights(mu: float, sigma: float, N: int) -> np.ndarray:
+    """
+    Probability of a normal variable rounding to each integer in [0, N),
+    conditioned on landing in that range.
+
+    Equivalent to the histogram of a large number of rounded samples, without
+    drawing them: bin k collects the mass between k - 0.5 and k + 0.5.
+    """
+    from scipy.special import ndtr
+
+    edges = (np.arange(N + 1) - 0.5 - mu) / sigma
+    probs = np.diff(ndtr(edges))
+    return probs / probs.sum()
+
+
+def get_beta_binomial_weights(mu: float, sigma: float, N: int) -> np.ndarray:
+    """
+    Weights over [0, N) following a beta distribution of mean `mu` and
+    standard deviation `sigma`, sampled between its 1st and 99th percentiles.
+    """
+    from scipy.stats import beta
+
+    n = (mu * (1 - mu)) / sigma**2
+    a = mu * n
+    b = (1 - mu) * n
+
+    x = np.linspace(beta.ppf(0.01, a, b), beta.ppf(0.99, a, b), N)
+    pdf = beta.pdf(x, a, b)
+    return pdf / pdf.sum()
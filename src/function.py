@@ -8,7 +8,6 @@ from spirv_enums import SelectionControlMask
 from typing_extensions import Self
 
 from src import AbortFuzzing
-from src import COUNT
 from src import FuzzLeafMixin
 from src import FuzzResult
 from src import OpCode
@@ -21,7 +20,9 @@ if TYPE_CHECKING:
 
 from src.operators.memory.memory_access import OpVariable, Statement
 from src.patched_dataclass import dataclass
-from src.types.concrete_types import EmptyType, OpTypeBool, OpTypeFunction, Type
+from src.types.concrete_types import EmptyType
+from src.types.concrete_types import OpTypeFunction
+from src.types.concrete_types import Type
 
 
 @dataclass
@@ -37,9 +38,12 @@ class OpFunction(OpCode):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        allowed_control_masks = list(
-            set(FunctionControlMask) - {FunctionControlMask.OptNoneINTEL}
-        )
+        # Not a set difference, its order would depend on string hashing
+        allowed_control_masks = [
+            mask
+            for mask in FunctionControlMask
+            if mask != FunctionControlMask.OptNoneINTEL
+        ]
         op_function: Self = cls(
             context.current_function_type.return_type,
             context.rng.choice(allowed_control_masks),
@@ -102,9 +106,8 @@ class OpSelectionMerge(ControlFlowOperator, Untyped, VoidOp):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        global COUNT
-        old_count = COUNT
-        if context.get_depth() > context.config.limits.max_depth:
+        old_count = context.state.count
+        if context.get_depth() > context.settings.max_depth:
             raise AbortFuzzing
         exit_label = OpLabel.fuzz(context).opcode
         selection_control = SelectionControlMask.NONE
@@ -112,24 +115,21 @@ class OpSelectionMerge(ControlFlowOperator, Untyped, VoidOp):
             if_block = fuzz_block(
                 context,
                 exit_label,
-                limiter=context.config.strategy.shader_target_size / 20,
+                limiter=context.settings.shader_target_size / 20,
             )
             else_block = fuzz_block(
                 context,
                 exit_label,
-                limiter=context.config.strategy.shader_target_size / 20,
+                limiter=context.settings.shader_target_size / 20,
             )
         except GeneratorExit:
-            COUNT = old_count + 10
+            context.state.count = old_count + 10
             raise AbortFuzzing
         true_label = if_block[0]
         false_label = else_block[0]
         try:
             condition = context.rng.choice(
-                context.get_statements(
-                    lambda s: not isinstance(s, Untyped)
-                    and isinstance(s.type, OpTypeBool)
-                )
+                context.get_typed_statements(IsScalarBoolean)
             )
         except IndexError:
             raise AbortFuzzing
@@ -157,15 +157,15 @@ class OpLoopMerge(ControlFlowOperator, Untyped, VoidOp):
         loop_back_label = OpLabel.fuzz(context).opcode
         pre_loop_branch = OpBranch(loop_back_label)
         loop_back_branch = OpBranch(loop_back_label)
-        if context.get_depth() > context.config.limits.max_depth:
+        if context.get_depth() > context.settings.max_depth:
             raise AbortFuzzing
         merge_label = OpLabel.fuzz(context).opcode
         selection_control = SelectionControlMask.NONE
         block = fuzz_block(
-            context, None, limiter=context.config.strategy.shader_target_size / 20
+            context, None, limiter=context.settings.shader_target_size / 20
         )
         continue_label = block[0]
-        condition = context.get_random_operand(IsScalarBoolean)
+        condition = context.get_random_operand(IsScalarBoolean, requester=cls)
         loop_entry_branch = OpBranchConditional(
             condition=condition, true_label=continue_label, false_label=merge_label
         )
@@ -234,7 +234,7 @@ def fuzz_block(
                     instructions.append(side_effect)
             continue
         if isinstance(fuzzed_opcode.opcode, Statement) and not nested_block:
-            block_context.symbol_table.append(fuzzed_opcode.opcode)
+            block_context.add_to_symbol_table(fuzzed_opcode.opcode)
         if (
             not isinstance(fuzzed_opcode.opcode, (OpVariable, OpReturn))
             and not fuzzed_opcode.is_opcode_pre_side_effects
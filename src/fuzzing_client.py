@@ -1,25 +1,25 @@
-import copy
-import multiprocessing
 import os
-from concurrent.futures import ThreadPoolExecutor
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
 from dataclasses import dataclass
-from multiprocessing.pool import Pool
+from functools import partial
 from typing import Optional
 from typing import TYPE_CHECKING
 
-import tqdm
 from spirv_enums import AddressingModel
 from spirv_enums import Capability
 from spirv_enums import ExecutionMode
 from spirv_enums import ExecutionModel
 from spirv_enums import MemoryModel
 from spirvsmith_server_client.api.generators import register_generator
-from spirvsmith_server_client.api.shaders import submit_shader
 from spirvsmith_server_client.models import *
 
-from src import FuzzDelegator
 from src import OpCode
 from src.context import Context
+from src.corpus import Corpus
 from src.extension import OpExtInstImport
 from src.misc import OpCapability
 from src.misc import OpEntryPoint
@@ -28,10 +28,21 @@ from src.misc import OpMemoryModel
 from src.monitor import Event
 from src.monitor import Monitor
 from src.operators.memory.memory_access import OpVariable
-from src.optimiser_fuzzer import fuzz_optimiser
+from src.optimiser_fuzzer import fuzz_optimiser_on_module
+from src.pipeline import Stage
+from src.rng import get_process_rng
+from src.shader_utils import report_validation
 from src.shader_utils import SPIRVShader
+from src.shader_utils import validate_spv_bytes
+from src.submission import ApiClientTransport
+from src.submission import HTTPTransport
+from src.submission import ShaderSubmitter
+from src.tool_pool import get_tool_pool
+from src.tool_pool import ToolPool
 from src.types.concrete_types import OpTypeFunction
 from src.types.concrete_types import OpTypeVoid
+from src.utils import derive_shader_seed
+from src.utils import SubprocessResult
 
 if TYPE_CHECKING:
     from run import SPIRVSmithConfig
@@ -46,6 +57,10 @@ client = Client(base_url="http://spirvsmith.hatout.dev")
 terminate = False
 paused = False
 
+# How long the main process blocks on the workers before
+# checking again whether it has been asked to terminate.
+POLL_INTERVAL: float = 1.0
+
 
 def signal_handling(signum, frame):
     global terminate
@@ -55,70 +70,225 @@ def signal_handling(signum, frame):
 signal.signal(signal.SIGINT, signal_handling)
 
 
-def init_MP_pool():
+@dataclass
+class GeneratedShader:
+    shader_id: str
+    seed: int
+    assembly: str
+    spirv_bytes: Optional[bytes]
+    n_buffers: int
+    is_valid: bool = False
+
+
+# Every worker process owns a single generator, created once by the pool initializer.
+WORKER_GENERATOR: Optional["ShaderGenerator"] = None
+
+
+def init_generation_worker(config: "SPIRVSmithConfig") -> None:
+    global WORKER_GENERATOR
+    # Only the main process reacts to SIGINT, workers are shut down by the pool.
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+    WORKER_GENERATOR = ShaderGenerator(config)
+
+
+def generate_shader_in_worker(seed: int) -> GeneratedShader:
+    shader: SPIRVShader = WORKER_GENERATOR.gen_shader(seed)
+    return GeneratedShader(
+        shader_id=shader.id,
+        seed=seed,
+        assembly=shader.to_assembly(),
+        spirv_bytes=shader.get_spirv_bytes(),
+        n_buffers=len(shader.context.get_storage_buffers()),
+    )
 
 
 @dataclass
 class ShaderGenerator:
     config: "SPIRVSmithConfig"
     generator_info: Optional[GeneratorInfo] = None
+    submitter: Optional[ShaderSubmitter] = None
+    corpus: Optional[Corpus] = None
+    tool_pool: Optional[ToolPool] = None
 
     def start(self):
-        MP_pool: Pool = multiprocessing.Pool(4, init_MP_pool)
-        thread_pool_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=4)
-
+        # Resolved up front: a misconfigured pool fails here, not in a stage
+        self.tool_pool = get_tool_pool(self.config.misc.n_tool_workers)
         if self.config.misc.broadcast_generated_shaders:
             register_generator.sync(client=client, json_body=self.generator_info)
+            self.submitter = ShaderSubmitter(
+                (
+                    partial(HTTPTransport, self.config.misc.submission_url)
+                    if self.config.misc.submission_url
+                    else partial(ApiClientTransport, client)
+                ),
+                spool_folder=f"{self.config.misc.out_folder}/corpus/spool",
+                config=self.config,
+            )
         os.makedirs(self.config.misc.out_folder, exist_ok=True)
+        # Kept apart from the assembly files, `out_folder` only holds .spasm files
+        self.corpus = Corpus(f"{self.config.misc.out_folder}/corpus")
         max_shaders: int = (
             self.config.limits.max_shaders if self.config.limits.max_shaders else 1000
         )
+        n_workers: int = self.config.misc.n_workers or os.cpu_count() or 1
+        root_seed: int = (
+            self.config.misc.seed
+            if self.config.misc.seed is not None
+            else get_process_rng().getrandbits(64)
+        )
         print(f"SPIRVSmith will generate {max_shaders} shaders...")
+        print(f"Root seed: {root_seed}")
         print(f"Selected Generation Policy: {self.config.strategy.gp_policy}")
         print(f"Selected Recency Bias Policy: {self.config.strategy.rbp_policy}")
-        for _ in range(max_shaders):
-            if terminate:
-                MP_pool.close()
-                MP_pool.join()
-                thread_pool_executor.shutdown()
-                Monitor(self.config).info(event=Event.TERMINATED)
-                break
-            if not paused:
-                shader: SPIRVShader = self.gen_shader()
-                shader.generate_assembly_file(
-                    f"{self.config.misc.out_folder}/{shader.id}.spasm"
+        print(f"Generating with {n_workers} worker processes")
+        # Generation runs in worker processes, validation and submission on
+        # threads of the main process. Stages are connected by bounded queues
+        # so that a slow validator or server only ever holds back generation
+        # once the queues in front of it are full.
+        submission_stage: Stage[GeneratedShader] = Stage(
+            "submission",
+            self.handle_generated_shader,
+            n_threads=self.config.misc.n_submission_threads,
+            inbox_size=self.config.misc.pipeline_queue_size,
+            max_consecutive_errors=self.config.misc.max_consecutive_stage_errors,
+            config=self.config,
+        ).start()
+        validation_stage: Stage[GeneratedShader] = Stage(
+            "validation",
+            self.validate_generated_shader,
+            n_threads=self.config.misc.n_validation_threads,
+            inbox_size=self.config.misc.pipeline_queue_size,
+            downstream=submission_stage,
+            max_consecutive_errors=self.config.misc.max_consecutive_stage_errors,
+            config=self.config,
+        ).start()
+        # Keep every worker busy while it hands its result over, but never
+        # queue up more shaders than the main process can take in.
+        max_in_flight: int = 2 * n_workers
+        executor: ProcessPoolExecutor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=init_generation_worker,
+            initargs=(self.config,),
+        )
+        in_flight: set[Future[GeneratedShader]] = set()
+        n_scheduled: int = 0
+        was_paused: bool = False
+        try:
+            while n_scheduled < max_shaders or in_flight:
+                if terminate:
+                    Monitor(self.config).info(event=Event.TERMINATED)
+                    break
+                if validation_stage.has_failed():
+                    # Closing the stages below re-raises what made them fail
+                    break
+                if paused and not was_paused:
+                    Monitor(self.config).info(event=Event.PAUSED)
+                was_paused = paused
+                while (
+                    not paused
+                    and n_scheduled < max_shaders
+                    and len(in_flight) < max_in_flight
+                ):
+                    in_flight.add(
+                        executor.submit(
+                            generate_shader_in_worker,
+                            derive_shader_seed(root_seed, n_scheduled),
+                        )
+                    )
+                    n_scheduled += 1
+                if not in_flight:
+                    # Paused with no shader left to wait for
+                    time.sleep(POLL_INTERVAL)
+                    continue
+                done, in_flight = wait(
+                    in_flight, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED
                 )
-                if shader.validate():
-                    if self.config.misc.fuzz_optimiser:
-                        MP_pool.apply_async(func=fuzz_optimiser, args=(shader,))
-                    if self.config.misc.broadcast_generated_shaders:
-                        submit_shader.sync(
-                            client=client,
-                            json_body=ShaderSubmission(
-                                shader_id=shader.id,
-                                shader_assembly="\n".join(
-                                    shader.generate_assembly_lines()
-                                ),
-                                generator_info=self.generator_info,
-                                prioritize=False,
-                                n_buffers=len(shader.context.get_storage_buffers()),
-                            ),
+                for future in done:
+                    try:
+                        generated_shader: GeneratedShader = future.result()
+                    except Exception as e:
+                        # A single broken shader must not bring down the run
+                        Monitor(self.config).error(
+                            event=Event.GENERATION_FAILURE, extra={"reason": repr(e)}
                         )
+                        continue
+                    validation_stage.put(generated_shader)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            try:
+                validation_stage.close()
+            finally:
+                if self.submitter is not None:
+                    self.submitter.close()
 
-            if paused:
-                Monitor(self.config).info(event=Event.PAUSED)
+    def validate_generated_shader(
+        self, generated_shader: GeneratedShader
+    ) -> GeneratedShader:
+        if generated_shader.spirv_bytes is None:
+            return generated_shader
+        process_result: SubprocessResult = validate_spv_bytes(
+            generated_shader.spirv_bytes, self.tool_pool
+        )
+        report_validation(self.config, generated_shader.shader_id, process_result)
+        generated_shader.is_valid = process_result.exit_code == 0
+        if generated_shader.is_valid and self.config.misc.fuzz_optimiser:
+            fuzz_optimiser_on_module(
+                self.config,
+                generated_shader.shader_id,
+                generated_shader.spirv_bytes,
+                self.tool_pool,
+            )
+        return generated_shader
+
+    def handle_generated_shader(self, generated_shader: GeneratedShader) -> None:
+        self.corpus.add(
+            self.config,
+            generated_shader.seed,
+            generated_shader.shader_id,
+            generated_shader.is_valid,
+        )
+        if not generated_shader.is_valid or self.config.misc.write_valid_assembly:
+            with open(
+                f"{self.config.misc.out_folder}/{generated_shader.shader_id}.spasm", "w"
+            ) as f:
+                f.write(generated_shader.assembly)
+        if generated_shader.is_valid and self.submitter is not None:
+            self.submitter.submit(
+                ShaderSubmission(
+                    shader_id=generated_shader.shader_id,
+                    shader_assembly=generated_shader.assembly,
+                    generator_info=self.generator_info,
+                    prioritize=False,
+                    n_buffers=generated_shader.n_buffers,
+                ).to_dict()
+            )
+
+    def gen_shader(self, seed: Optional[int] = None) -> SPIRVShader:
+        shader: SPIRVShader = self.build_shader(seed).recondition()
+        if self.config.misc.normalise_ids:
+            shader.normalise_ids()
+        return shader
 
-    def gen_shader(self) -> SPIRVShader:
-        execution_model = ExecutionModel.GLCompute
-        context: Context = Context.create_global_context(execution_model, self.config)
+    def build_shader(self, seed: Optional[int] = None) -> SPIRVShader:
+        """
+        Generates a shader without reconditioning it, from `seed` if given.
+        """
+        context: Context = Context.create_global_context(
+            ExecutionModel.GLCompute, self.config, seed
+        )
+        # Opcodes created while the shader is built get their ids from it
+        with context.id_allocator.activated():
+            return self.populate_shader(context)
+
+    def populate_shader(self, context: Context) -> SPIRVShader:
+        execution_model: ExecutionModel = context.execution_model
         void_type: OpTypeVoid = OpTypeVoid()
         main_type: OpTypeFunction = OpTypeFunction(
             return_type=void_type, parameter_types=()
         )
         context.main_type = main_type
-        context.globals[void_type] = void_type.id
-        context.globals[main_type] = main_type.id
+        context.add_to_tvc(void_type)
+        context.add_to_tvc(main_type)
         # context.extension_sets["SPV_KHR_bit_instructions"] = OpExtension(
         #     "SPV_KHR_bit_instructions"
         # )
@@ -159,7 +329,7 @@ class ShaderGenerator:
                 entry_point.function, ExecutionMode.OriginUpperLeft
             )
 
-        shader: SPIRVShader = SPIRVShader(
+        return SPIRVShader(
             capabilities,
             memory_model,
             entry_point,
@@ -167,9 +337,3 @@ class ShaderGenerator:
             opcodes,
             context,
         )
-
-        shader: SPIRVShader = shader.recondition().normalise_ids()
-
-        FuzzDelegator.reset_parametrizations()
-
-        return shader
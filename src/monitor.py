@@ -1,4 +1,11 @@
+import atexit
 import logging
+import logging.handlers
+import multiprocessing.util
+import os
+import queue
+import threading
+import time
 from enum import Enum
 from typing import Optional
 from typing import TYPE_CHECKING
@@ -34,6 +41,11 @@ class Event(Enum):
     BQ_GENERATOR_REGISTRATION_FAILURE = "BQ_GENERATOR_REGISTRATION_FAILURE"
     BQ_SHADER_DATA_UPSERT_SUCCESS = "BQ_SHADER_DATA_UPSERT_SUCCESS"
     BQ_SHADER_DATA_UPSERT_FAILURE = "BQ_SHADER_DATA_UPSERT_FAILURE"
+    SUBMISSION_SUCCESS = "SUBMISSION_SUCCESS"
+    SUBMISSION_RETRY = "SUBMISSION_RETRY"
+    SUBMISSION_SPOOLED = "SUBMISSION_SPOOLED"
+    GENERATION_FAILURE = "GENERATION_FAILURE"
+    STAGE_FAILURE = "STAGE_FAILURE"
     NO_OPERAND_FOUND = "NO_OPERAND_FOUND"
     TERMINATED = "TERMINATED"
     INVALID_TYPE_AMBER_BUFFER = "INVALID_TYPE_AMBER_BUFFER"
@@ -41,8 +53,96 @@ class Event(Enum):
     DEBUG = "DEBUG"
 
 
+class LogShipper:
+    """
+    Hands log records over to the real handlers from a background thread.
+
+    Records are queued by a QueueHandler, which never blocks, and shipped in
+    batches of up to `batch_size` records or whatever arrived within
+    `flush_interval` seconds, handlers being flushed once per batch.
+    """
+
+    def __init__(
+        self,
+        handlers: list[logging.Handler],
+        batch_size: int = 64,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.handlers: list[logging.Handler] = handlers
+        self.batch_size: int = max(batch_size, 1)
+        self.flush_interval: float = flush_interval
+        self.start()
+
+    def start(self) -> None:
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.queue_handler: logging.handlers.QueueHandler = (
+            logging.handlers.QueueHandler(self.queue)
+        )
+        self.thread: threading.Thread = threading.Thread(
+            target=self.ship, name="log-shipper", daemon=True
+        )
+        self.thread.start()
+
+    def ship(self) -> None:
+        stopped: bool = False
+        while not stopped:
+            batch: list[Optional[logging.LogRecord]] = [self.queue.get()]
+            deadline: float = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                timeout: float = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is None:
+                    stopped = True
+                    break
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+            for handler in self.handlers:
+                try:
+                    handler.flush()
+                except (OSError, ValueError):
+                    # Same as logging.shutdown, the stream may be closed already
+                    pass
+
+    def stop(self) -> None:
+        # None is the sentinel, everything queued before it gets shipped
+        self.queue.put(None)
+        self.thread.join()
+
+
 class Monitor:
-    def __init__(self, config: Optional["SPIRVSmithConfig"] = None) -> None:
+    """
+    Process-wide logger, `Monitor(config)` returns the same instance every
+    time and only sets up the logging outputs again when the configuration
+    asks for different ones.
+    """
+
+    INSTANCE: Optional["Monitor"] = None
+    LOCK = threading.Lock()
+
+    def __new__(cls, config: Optional["SPIRVSmithConfig"] = None) -> "Monitor":
+        misc = config.get("misc", None) if config else None
+        upload_logs: bool = bool(misc and misc["upload_logs"])
+        with cls.LOCK:
+            if cls.INSTANCE is None or (upload_logs and not cls.INSTANCE.upload_logs):
+                if cls.INSTANCE is not None:
+                    cls.INSTANCE.shipper.stop()
+                instance: Monitor = super().__new__(cls)
+                instance.setup(
+                    upload_logs,
+                    misc.get("log_batch_size", 64) if misc else 64,
+                    misc.get("log_flush_interval", 1.0) if misc else 1.0,
+                )
+                cls.INSTANCE = instance
+            return cls.INSTANCE
+
+    def setup(self, upload_logs: bool, batch_size: int, flush_interval: float) -> None:
         outputs = [
             daiquiri.output.Stream(
                 formatter=daiquiri.formatter.ColorFormatter(
@@ -50,15 +150,31 @@ class Monitor:
                 )
             )
         ]
-        if config and (misc := config.get("misc", None)) and misc["upload_logs"]:
+        if upload_logs:
             outputs.append(daiquiri.output.Datadog())
         daiquiri.setup(
             outputs=outputs,
         )
+        # Move the outputs behind the shipper thread
+        root_logger: logging.Logger = logging.getLogger()
+        handlers: list[logging.Handler] = list(root_logger.handlers)
+        for handler in handlers:
+            root_logger.removeHandler(handler)
+        self.shipper: LogShipper = LogShipper(handlers, batch_size, flush_interval)
+        root_logger.addHandler(self.shipper.queue_handler)
 
+        self.upload_logs: bool = upload_logs
         self.logger = daiquiri.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
 
+    def restart_in_child(self) -> None:
+        # The shipper thread does not survive a fork and its queue may have
+        # been locked by another thread at that time, start over with new ones
+        root_logger: logging.Logger = logging.getLogger()
+        root_logger.removeHandler(self.shipper.queue_handler)
+        self.shipper.start()
+        root_logger.addHandler(self.shipper.queue_handler)
+
     def debug(self, event: Event, extra: dict[str, str] = None) -> None:
         if not extra:
             extra = {}
@@ -86,3 +202,24 @@ class Monitor:
         extra["version"] = LOG_VERSION
         extra["tag"] = event.value
         self.logger.error(event.value, extra=extra)
+
+
+def _restart_monitor_in_child() -> None:
+    Monitor.LOCK = threading.Lock()
+    if Monitor.INSTANCE is not None:
+        Monitor.INSTANCE.restart_in_child()
+
+
+def _flush_monitor() -> None:
+    if Monitor.INSTANCE is not None:
+        Monitor.INSTANCE.shipper.stop()
+
+
+os.register_at_fork(after_in_child=_restart_monitor_in_child)
+atexit.register(_flush_monitor)
+# Worker processes do not run atexit handlers, multiprocessing finalizers
+# have to be registered after its own fork handlers cleared them.
+multiprocessing.util.register_after_fork(
+    Monitor,
+    lambda _: multiprocessing.util.Finalize(None, _flush_monitor, exitpriority=0),
+)
@@ -0,0 +1,144 @@
+from enum import Enum
+from heapq import merge
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from src import Constant
+from src import Statement
+from src import Untyped
+from src.predicates import get_hints
+
+if TYPE_CHECKING:
+    from src import OpCode
+    from src.operators import Operand
+
+# (class of the result type, class of the base type, signedness of the base type)
+Shape = tuple[type, type, Optional[int]]
+
+
+class OperandKind(Enum):
+    STATEMENT = "STATEMENT"
+    CONSTANT = "CONSTANT"
+
+
+def get_operand_kind(opcode: "OpCode") -> Optional[OperandKind]:
+    if isinstance(opcode, Constant):
+        return OperandKind.CONSTANT
+    if isinstance(opcode, Statement) and not isinstance(opcode, Untyped):
+        return OperandKind.STATEMENT
+    return None
+
+
+def get_shape(operand: "Operand") -> Shape:
+    base_type = operand.get_base_type()
+    return (
+        operand.type.__class__,
+        base_type.__class__,
+        getattr(base_type, "signed", None),
+    )
+
+
+def shape_matches(shape: Shape, hints: dict) -> bool:
+    """
+    Whether operands of this shape can satisfy a predicate with these hints.
+    The exact `type` hint is not a property of the shape and is ignored.
+    """
+    return (
+        issubclass(shape[0], hints.get("type_class", object))
+        and issubclass(shape[1], hints.get("base_class", object))
+        and ("signed" not in hints or shape[2] == hints["signed"])
+    )
+
+
+class OperandIndex:
+    """
+    Incremental index over the opcodes of a scope.
+
+    Operands are bucketed by kind, exact result type and shape so that
+    hinted predicates (see src.predicates.Hinted) only ever get evaluated
+    against operands that can possibly satisfy them. Every lookup returns
+    opcodes in insertion order, just like filtering the scope would.
+    """
+
+    def __init__(self) -> None:
+        self.positions: dict[int, int] = {}
+        self.instances_by_class: dict[type, list["OpCode"]] = {}
+        self.matching_classes: dict[type, list[type]] = {}
+        self.operands: dict[OperandKind, list["Operand"]] = {
+            kind: [] for kind in OperandKind
+        }
+        self.operands_by_type: dict[OperandKind, dict["OpCode", list["Operand"]]] = {
+            kind: {} for kind in OperandKind
+        }
+        self.operands_by_shape: dict[OperandKind, dict[Shape, list["Operand"]]] = {
+            kind: {} for kind in OperandKind
+        }
+        self.matching_shapes: dict[OperandKind, dict[tuple, list[Shape]]] = {
+            kind: {} for kind in OperandKind
+        }
+
+    def add(self, opcode: "OpCode") -> None:
+        self.positions[id(opcode)] = len(self.positions)
+        try:
+            self.instances_by_class[opcode.__class__].append(opcode)
+        except KeyError:
+            self.instances_by_class[opcode.__class__] = [opcode]
+            self.matching_classes.clear()
+        kind: Optional[OperandKind] = get_operand_kind(opcode)
+        if kind is None:
+            return
+        self.operands[kind].append(opcode)
+        self.operands_by_type[kind].setdefault(opcode.type, []).append(opcode)
+        shape: Shape = get_shape(opcode)
+        try:
+            self.operands_by_shape[kind][shape].append(opcode)
+        except KeyError:
+            self.operands_by_shape[kind][shape] = [opcode]
+            self.matching_shapes[kind].clear()
+
+    def _merge(self, buckets: list[list["OpCode"]]) -> Iterable["OpCode"]:
+        if len(buckets) == 1:
+            return buckets[0]
+        return merge(*buckets, key=lambda opcode: self.positions[id(opcode)])
+
+    def instances(self, cls: type) -> list["OpCode"]:
+        try:
+            classes: list[type] = self.matching_classes[cls]
+        except KeyError:
+            classes = [c for c in self.instances_by_class if issubclass(c, cls)]
+            self.matching_classes[cls] = classes
+        return list(self._merge([self.instances_by_class[c] for c in classes]))
+
+    def candidates(
+        self, kind: OperandKind, predicate: Optional[Callable] = None
+    ) -> Iterable["Operand"]:
+        hints: dict = get_hints(predicate) if predicate else {}
+        if "type" in hints:
+            return self.operands_by_type[kind].get(hints["type"], [])
+        type_class = hints.get("type_class", object)
+        base_class = hints.get("base_class", object)
+        if type_class is object and base_class is object and "signed" not in hints:
+            return self.operands[kind]
+        key = (type_class, base_class, hints.get("signed"), "signed" in hints)
+        try:
+            shapes: list[Shape] = self.matching_shapes[kind][key]
+        except KeyError:
+            shapes = [
+                shape
+                for shape in self.operands_by_shape[kind]
+                if shape_matches(shape, hints)
+            ]
+            self.matching_shapes[kind][key] = shapes
+        if not shapes:
+            return []
+        return self._merge([self.operands_by_shape[kind][shape] for shape in shapes])
+
+    def find(
+        self, kind: OperandKind, predicate: Optional[Callable] = None
+    ) -> list["Operand"]:
+        candidates: Iterable["Operand"] = self.candidates(kind, predicate)
+        if not predicate:
+            return list(candidates)
+        return list(filter(predicate, candidates))
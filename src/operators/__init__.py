@@ -1,5 +1,9 @@
 from types import NoneType
+from typing import Callable
+from typing import ClassVar
 from typing import get_args
+from typing import NamedTuple
+from typing import Optional
 from typing import TYPE_CHECKING
 
 from typing_extensions import Self
@@ -8,7 +12,10 @@ from src import Constant
 from src import FuzzResult
 from src import Signed
 from src import Statement
+from src import Type
 from src.constants import OpConstantComposite
+from src.operand_index import shape_matches
+from src.predicates import get_hints
 from src.predicates import HasType
 
 if TYPE_CHECKING:
@@ -24,39 +31,88 @@ class GLSLExtensionOperator:
     ...
 
 
-class UnaryOperatorFuzzMixin:
+class OperatorSignature(NamedTuple):
+    source_type: type
+    # None when the result has the type of the operands
+    destination_type: Optional[type]
+    # None when the signedness is not constrained
+    source_signed: Optional[bool]
+    destination_signed: Optional[bool]
+    # Predicate on the first operand
+    operand_predicate: Callable[[Operand], bool]
+    # Emitted as an OpExtInst of GLSL.std.450
+    is_glsl: bool
+
+
+def read_operator_signature(cls: type) -> OperatorSignature:
+    (
+        source_type,
+        destination_type,
+        source_constraint,
+        destination_constraint,
+    ) = get_args(cls.__orig_bases__[1])
+    source_signed: Optional[bool] = None
+    if not issubclass(source_constraint, NoneType):
+        source_signed = issubclass(source_constraint, Signed)
+    destination_signed: Optional[bool] = None
+    if not issubclass(destination_constraint, NoneType):
+        destination_signed = issubclass(destination_constraint, Signed)
+    return OperatorSignature(
+        source_type,
+        None if issubclass(destination_type, NoneType) else destination_type,
+        source_signed,
+        destination_signed,
+        cls.OPERAND_SELECTION_PREDICATE(source_type, source_signed),
+        issubclass(cls, GLSLExtensionOperator),
+    )
+
+
+class OperatorFuzzMixin:
+    """
+    Fuzzes an operator from the signature given by its generic base, e.g.
+    `UnaryArithmeticOperator[OpTypeInt, None, Signed, None]`.
+
+    The signature is read once, when the operator class is created.
+    """
+
+    SIGNATURE: ClassVar[OperatorSignature]
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if "__orig_bases__" in cls.__dict__:
+            cls.SIGNATURE = read_operator_signature(cls)
+
+    @classmethod
+    def is_available(cls, operand_shapes: frozenset[tuple]) -> bool:
+        hints: dict = get_hints(cls.SIGNATURE.operand_predicate)
+        return any(shape_matches(shape, hints) for shape in operand_shapes)
+
+    @classmethod
+    def fuzz_result_type(cls, context: "Context", operand: Operand) -> Type:
+        signature: OperatorSignature = cls.SIGNATURE
+        if signature.destination_type is None:
+            return operand.type
+        inner_type = signature.destination_type.fuzz(context).opcode
+        if signature.destination_signed is not None:
+            inner_type.signed = int(signature.destination_signed)
+        if hasattr(operand, "width"):
+            inner_type.width = operand.get_base_type().width
+        inner_type = context.add_to_tvc(inner_type)
+        if isinstance(operand.type, (OpConstantComposite, OpTypeVector)):
+            inner_type = context.add_to_tvc(
+                OpTypeVector(type=inner_type, size=len(operand.type))
+            )
+        return inner_type
+
+
+class UnaryOperatorFuzzMixin(OperatorFuzzMixin):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        (
-            source_type,
-            destination_type,
-            source_constraint,
-            destination_constraint,
-        ) = get_args(cls.__orig_bases__[1])
-        source_signed: bool = None
-        if not issubclass(source_constraint, NoneType):
-            source_signed: bool = issubclass(source_constraint, Signed)
-        destination_signed = None
-        if not issubclass(destination_constraint, NoneType):
-            destination_signed = issubclass(destination_constraint, Signed)
         operand: Operand = context.get_random_operand(
-            cls.OPERAND_SELECTION_PREDICATE(source_type, source_signed)
+            cls.SIGNATURE.operand_predicate, requester=cls
         )
-        if not issubclass(destination_type, NoneType):
-            inner_type = destination_type.fuzz(context).opcode
-            if destination_signed is not None:
-                inner_type.signed = int(destination_signed)
-            context.add_to_tvc(inner_type)
-            # if isinstance(operand, OpConstantComposite):
-            #     inner_type.width = operand.type.type.width
-            if hasattr(operand, "width"):
-                inner_type.width = operand.get_base_type().width
-            if isinstance(operand.type, (OpConstantComposite, OpTypeVector)):
-                inner_type = OpTypeVector(type=inner_type, size=len(operand.type))
-                context.add_to_tvc(inner_type)
-        else:
-            inner_type = operand.type
-        if issubclass(cls, GLSLExtensionOperator):
+        inner_type: Type = cls.fuzz_result_type(context, operand)
+        if cls.SIGNATURE.is_glsl:
             return FuzzResult(
                 OpExtInst(
                     type=inner_type,
@@ -68,38 +124,17 @@ class UnaryOperatorFuzzMixin:
         return FuzzResult(cls(type=inner_type, operand1=operand), [inner_type])
 
 
-class BinaryOperatorFuzzMixin:
+class BinaryOperatorFuzzMixin(OperatorFuzzMixin):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        (
-            source_type,
-            destination_type,
-            source_constraint,
-            destination_constraint,
-        ) = get_args(cls.__orig_bases__[1])
-        source_signed = None
-        if not issubclass(source_constraint, NoneType):
-            source_signed = issubclass(source_constraint, Signed)
-        destination_signed = None
-        if not issubclass(destination_constraint, NoneType):
-            destination_signed = issubclass(destination_constraint, Signed)
         operand1: Operand = context.get_random_operand(
-            cls.OPERAND_SELECTION_PREDICATE(source_type, source_signed)
+            cls.SIGNATURE.operand_predicate, requester=cls
+        )
+        operand2: Operand = context.get_random_operand(
+            HasType(operand1.type), requester=cls
         )
-        operand2: Operand = context.get_random_operand(HasType(operand1.type))
-        if not issubclass(destination_type, NoneType):
-            inner_type = destination_type.fuzz(context).opcode
-            if destination_signed is not None:
-                inner_type.signed = int(destination_signed)
-            context.add_to_tvc(inner_type)
-            if hasattr(operand1, "width"):
-                inner_type.width = operand1.get_base_type().width
-            if isinstance(operand1.type, (OpConstantComposite, OpTypeVector)):
-                inner_type = OpTypeVector(type=inner_type, size=len(operand1.type))
-                context.add_to_tvc(inner_type)
-        else:
-            inner_type = operand1.type
-        if issubclass(cls, GLSLExtensionOperator):
+        inner_type: Type = cls.fuzz_result_type(context, operand1)
+        if cls.SIGNATURE.is_glsl:
             return FuzzResult(
                 OpExtInst(
                     type=inner_type,
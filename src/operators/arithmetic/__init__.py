@@ -7,8 +7,9 @@ from typing import TypeVar
 from src import Statement
 from src.operators import Operand
 from src.patched_dataclass import dataclass
-from src.predicates import HasValidBaseTypeAndSign
+from src.predicates import And
 from src.predicates import IsArithmeticType
+from src.predicates import IsOfBaseTypeAndSign
 
 S = TypeVar("S")
 D = TypeVar("D")
@@ -20,10 +21,8 @@ DC = TypeVar("DC")
 class ArithmeticOperator(Statement, Generic[S, D, SC, DC]):
     OPERAND_SELECTION_PREDICATE: ClassVar[
         Callable[[Operand], bool]
-    ] = lambda target_type, signed: lambda op: IsArithmeticType(
-        op
-    ) and HasValidBaseTypeAndSign(
-        op, target_type, signed
+    ] = lambda target_type, signed: And(
+        IsArithmeticType, IsOfBaseTypeAndSign(target_type, signed)
     )
 
 
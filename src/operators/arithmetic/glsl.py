@@ -314,7 +314,7 @@ class Determinant(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand = context.get_random_operand(
-            lambda x: IsMatrixType(x) and len(x.type) == len(x.type.type)
+            lambda x: IsMatrixType(x) and len(x.type) == len(x.type.type), requester=cls
         )
         result_type = operand.get_base_type()
         return FuzzResult(
@@ -353,7 +353,7 @@ class ModfStruct(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand = context.get_random_operand(
-            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat)
+            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat), requester=cls
         )
         result_type = OpTypeStruct(types=(operand.type, operand.type))
         return FuzzResult(
@@ -430,10 +430,10 @@ class FClamp(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand1 = context.get_random_operand(
-            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat)
+            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat), requester=cls
         )
-        operand2 = context.get_random_operand(HasType(operand1.type))
-        operand3 = context.get_random_operand(HasType(operand1.type))
+        operand2 = context.get_random_operand(HasType(operand1.type), requester=cls)
+        operand3 = context.get_random_operand(HasType(operand1.type), requester=cls)
         return FuzzResult(
             OpExtInst(
                 type=operand1.type,
@@ -452,10 +452,11 @@ class UClamp(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand1 = context.get_random_operand(
-            Or(And(IsVectorType, IsOfUnsignedIntegerBaseType), IsScalarSignedInteger)
+            Or(And(IsVectorType, IsOfUnsignedIntegerBaseType), IsScalarSignedInteger),
+            requester=cls,
         )
-        operand2 = context.get_random_operand(HasType(operand1.type))
-        operand3 = context.get_random_operand(HasType(operand1.type))
+        operand2 = context.get_random_operand(HasType(operand1.type), requester=cls)
+        operand3 = context.get_random_operand(HasType(operand1.type), requester=cls)
         return FuzzResult(
             OpExtInst(
                 type=operand1.type,
@@ -474,10 +475,11 @@ class SClamp(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand1 = context.get_random_operand(
-            Or(And(IsVectorType, IsOfSignedIntegerBaseType), IsScalarSignedInteger)
+            Or(And(IsVectorType, IsOfSignedIntegerBaseType), IsScalarSignedInteger),
+            requester=cls,
         )
-        operand2 = context.get_random_operand(HasType(operand1.type))
-        operand3 = context.get_random_operand(HasType(operand1.type))
+        operand2 = context.get_random_operand(HasType(operand1.type), requester=cls)
+        operand3 = context.get_random_operand(HasType(operand1.type), requester=cls)
         return FuzzResult(
             OpExtInst(
                 type=operand1.type,
@@ -496,10 +498,10 @@ class FMix(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand1 = context.get_random_operand(
-            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat)
+            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat), requester=cls
         )
-        operand2 = context.get_random_operand(HasType(operand1.type))
-        operand3 = context.get_random_operand(HasType(operand1.type))
+        operand2 = context.get_random_operand(HasType(operand1.type), requester=cls)
+        operand3 = context.get_random_operand(HasType(operand1.type), requester=cls)
         return FuzzResult(
             OpExtInst(
                 type=operand1.type,
@@ -572,7 +574,7 @@ class FrexpStruct(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand = context.get_random_operand(
-            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat)
+            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat), requester=cls
         )
         inner_type1 = operand.type
         if IsVectorType(operand):
@@ -607,9 +609,15 @@ class Length(
     UnaryArithmeticOperator[OpTypeFloat, None, None, None],
     GLSLExtensionOperator,
 ):
+    OPERAND_SELECTION_PREDICATE = lambda target_type, signed: And(
+        IsVectorType, IsOfFloatBaseType
+    )
+
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        operand = context.get_random_operand(And(IsVectorType, IsOfFloatBaseType))
+        operand = context.get_random_operand(
+            cls.SIGNATURE.operand_predicate, requester=cls
+        )
         result_type = OpTypeFloat(32)
         return FuzzResult(
             OpExtInst(
@@ -628,10 +636,16 @@ class Distance(
     BinaryArithmeticOperator[OpTypeFloat, None, None, None],
     GLSLExtensionOperator,
 ):
+    OPERAND_SELECTION_PREDICATE = lambda target_type, signed: And(
+        IsVectorType, IsOfFloatBaseType
+    )
+
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        operand1 = context.get_random_operand(And(IsVectorType, IsOfFloatBaseType))
-        operand2 = context.get_random_operand(HasType(operand1.type))
+        operand1 = context.get_random_operand(
+            cls.SIGNATURE.operand_predicate, requester=cls
+        )
+        operand2 = context.get_random_operand(HasType(operand1.type), requester=cls)
         result_type = OpTypeFloat(32)
         return FuzzResult(
             OpExtInst(
@@ -655,9 +669,9 @@ class Cross(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand1 = context.get_random_operand(
-            And(IsVectorType, IsOfFloatBaseType, HasLength(3))
+            And(IsVectorType, IsOfFloatBaseType, HasLength(3)), requester=cls
         )
-        operand2 = context.get_random_operand(HasType(operand1.type))
+        operand2 = context.get_random_operand(HasType(operand1.type), requester=cls)
         return FuzzResult(
             OpExtInst(
                 type=operand1.type,
@@ -685,10 +699,10 @@ class FaceForward(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand1 = context.get_random_operand(
-            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat)
+            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat), requester=cls
         )
-        operand2 = context.get_random_operand(HasType(operand1.type))
-        operand3 = context.get_random_operand(HasType(operand1.type))
+        operand2 = context.get_random_operand(HasType(operand1.type), requester=cls)
+        operand3 = context.get_random_operand(HasType(operand1.type), requester=cls)
         return FuzzResult(
             OpExtInst(
                 type=operand1.type,
@@ -791,10 +805,10 @@ class NClamp(
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand1 = context.get_random_operand(
-            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat)
+            Or(And(IsVectorType, IsOfFloatBaseType), IsScalarFloat), requester=cls
         )
-        operand2 = context.get_random_operand(HasType(operand1.type))
-        operand3 = context.get_random_operand(HasType(operand1.type))
+        operand2 = context.get_random_operand(HasType(operand1.type), requester=cls)
+        operand3 = context.get_random_operand(HasType(operand1.type), requester=cls)
         return FuzzResult(
             OpExtInst(
                 type=operand1.type,
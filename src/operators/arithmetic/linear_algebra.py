@@ -29,8 +29,10 @@ from src.types.concrete_types import OpTypeMatrix, OpTypeVector
 class OpVectorTimesScalar(BinaryArithmeticOperator[None, None, None, None]):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        operand1 = context.get_random_operand(And(IsVectorType, IsOfFloatBaseType))
-        operand2 = context.get_random_operand(IsScalarFloat)
+        operand1 = context.get_random_operand(
+            And(IsVectorType, IsOfFloatBaseType), requester=cls
+        )
+        operand2 = context.get_random_operand(IsScalarFloat, requester=cls)
         return FuzzResult(cls(type=operand1.type, operand1=operand1, operand2=operand2))
 
 
@@ -38,8 +40,10 @@ class OpVectorTimesScalar(BinaryArithmeticOperator[None, None, None, None]):
 class OpMatrixTimesScalar(BinaryArithmeticOperator[None, None, None, None]):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        operand1 = context.get_random_operand(And(IsMatrixType, IsOfFloatBaseType))
-        operand2 = context.get_random_operand(IsScalarFloat)
+        operand1 = context.get_random_operand(
+            And(IsMatrixType, IsOfFloatBaseType), requester=cls
+        )
+        operand2 = context.get_random_operand(IsScalarFloat, requester=cls)
         return FuzzResult(cls(type=operand1.type, operand1=operand1, operand2=operand2))
 
 
@@ -48,10 +52,13 @@ class OpVectorTimesMatrix(BinaryArithmeticOperator[None, None, None, None]):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         # We pick the matrix first here because we tend to have more vectors than matrices
-        operand2 = context.get_random_operand(And(IsMatrixType, IsOfFloatBaseType))
+        operand2 = context.get_random_operand(
+            And(IsMatrixType, IsOfFloatBaseType), requester=cls
+        )
         # The vector must have as many element as the matrix has rows
         operand1 = context.get_random_operand(
-            And(IsVectorType, IsOfFloatBaseType, HasLength(len(operand2.type.type)))
+            And(IsVectorType, IsOfFloatBaseType, HasLength(len(operand2.type.type))),
+            requester=cls,
         )
         result_type = OpTypeVector(
             type=operand1.get_base_type(), size=len(operand2.type)
@@ -65,10 +72,13 @@ class OpVectorTimesMatrix(BinaryArithmeticOperator[None, None, None, None]):
 class OpMatrixTimesVector(BinaryArithmeticOperator[None, None, None, None]):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        operand1 = context.get_random_operand(And(IsMatrixType, IsOfFloatBaseType))
+        operand1 = context.get_random_operand(
+            And(IsMatrixType, IsOfFloatBaseType), requester=cls
+        )
         # The vector must have as many elements as the matrix has columns
         operand2 = context.get_random_operand(
-            And(IsVectorType, IsOfFloatBaseType, HasLength(len(operand1.type)))
+            And(IsVectorType, IsOfFloatBaseType, HasLength(len(operand1.type))),
+            requester=cls,
         )
         result_type = OpTypeVector(
             type=operand1.get_base_type(), size=len(operand1.type.type)
@@ -82,7 +92,9 @@ class OpMatrixTimesVector(BinaryArithmeticOperator[None, None, None, None]):
 class OpMatrixTimesMatrix(BinaryArithmeticOperator[None, None, None, None]):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        operand1 = context.get_random_operand(And(IsMatrixType, IsOfFloatBaseType))
+        operand1 = context.get_random_operand(
+            And(IsMatrixType, IsOfFloatBaseType), requester=cls
+        )
         # operand2 must have the same number of columns that operand1 has
         # rows, tricky case if we got unlucky and picked for operand1
         # a matrix that could be multiplied by operand2 in the symmetric case
@@ -101,7 +113,8 @@ class OpMatrixTimesMatrix(BinaryArithmeticOperator[None, None, None, None]):
                 # <=> # columns of operand2 == # rows of operand1
                 # <=> the symmetric case
                 or HaveSameTypeLength(x, operand1.type)
-            )
+            ),
+            requester=cls,
         )
 
         # Handle the symmetric case
@@ -123,8 +136,12 @@ class OpMatrixTimesMatrix(BinaryArithmeticOperator[None, None, None, None]):
 class OpOuterProduct(BinaryArithmeticOperator[None, None, None, None]):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        operand1 = context.get_random_operand(And(IsVectorType, IsOfFloatBaseType))
-        operand2 = context.get_random_operand(And(IsVectorType, IsOfFloatBaseType))
+        operand1 = context.get_random_operand(
+            And(IsVectorType, IsOfFloatBaseType), requester=cls
+        )
+        operand2 = context.get_random_operand(
+            And(IsVectorType, IsOfFloatBaseType), requester=cls
+        )
         result_type = OpTypeMatrix(type=operand1.type, size=len(operand2.type))
         return FuzzResult(
             cls(type=result_type, operand1=operand1, operand2=operand2), [result_type]
@@ -135,13 +152,16 @@ class OpOuterProduct(BinaryArithmeticOperator[None, None, None, None]):
 class OpDot(BinaryArithmeticOperator[None, None, None, None]):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        operand1 = context.get_random_operand(And(IsVectorType, IsOfFloatBaseType))
+        operand1 = context.get_random_operand(
+            And(IsVectorType, IsOfFloatBaseType), requester=cls
+        )
         operand2 = context.get_random_operand(
             And(
                 IsVectorType,
                 HasBaseType(operand1.get_base_type()),
                 HasLength(len(operand1.type)),
-            )
+            ),
+            requester=cls,
         )
         return FuzzResult(
             cls(type=operand1.get_base_type(), operand1=operand1, operand2=operand2)
@@ -10,8 +10,9 @@ from src.operators import BinaryOperatorFuzzMixin
 from src.operators import Operand
 from src.operators import UnaryOperatorFuzzMixin
 from src.patched_dataclass import dataclass
-from src.predicates import HasValidBaseTypeAndSign
+from src.predicates import And
 from src.predicates import IsArithmeticType
+from src.predicates import IsOfBaseTypeAndSign
 from src.types.concrete_types import OpTypeInt
 
 if TYPE_CHECKING:
@@ -26,10 +27,8 @@ DC = TypeVar("DC")
 class BitwiseOperator(Statement, Generic[S, D, SC, DC]):
     OPERAND_SELECTION_PREDICATE: ClassVar[
         Callable[[Operand], bool]
-    ] = lambda target_type, signed: lambda op: IsArithmeticType(
-        op
-    ) and HasValidBaseTypeAndSign(
-        op, target_type, signed
+    ] = lambda target_type, signed: And(
+        IsArithmeticType, IsOfBaseTypeAndSign(target_type, signed)
     )
 
 
@@ -35,8 +35,8 @@ class OpVectorExtractDynamic(CompositeOperator):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        vector = context.get_random_operand(IsVectorType)
-        index = context.get_random_operand(IsScalarInteger)
+        vector = context.get_random_operand(IsVectorType, requester=cls)
+        index = context.get_random_operand(IsScalarInteger, requester=cls)
         return FuzzResult(cls(type=vector.get_base_type(), vector=vector, index=index))
 
 
@@ -48,14 +48,16 @@ class OpVectorInsertDynamic(CompositeOperator):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        vector = context.get_random_operand(IsVectorType)
-        component = context.get_random_operand(HasType(vector.get_base_type()))
+        vector = context.get_random_operand(IsVectorType, requester=cls)
+        component = context.get_random_operand(
+            HasType(vector.get_base_type()), requester=cls
+        )
         return FuzzResult(
             cls(
                 type=vector.type,
                 vector=vector,
                 component=component,
-                index=context.get_random_operand(IsScalarInteger),
+                index=context.get_random_operand(IsScalarInteger, requester=cls),
             )
         )
 
@@ -68,9 +70,9 @@ class OpVectorShuffle(CompositeOperator):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        vector1 = context.get_random_operand(IsVectorType)
+        vector1 = context.get_random_operand(IsVectorType, requester=cls)
         vector2 = context.get_random_operand(
-            And(IsVectorType, HasBaseType(vector1.get_base_type()))
+            And(IsVectorType, HasBaseType(vector1.get_base_type())), requester=cls
         )
 
         inner_type = OpTypeVector(
@@ -102,7 +104,7 @@ class OpCompositeExtract(CompositeOperator):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        composite: Operand = context.get_random_operand(IsCompositeType)
+        composite: Operand = context.get_random_operand(IsCompositeType, requester=cls)
         if IsMatrixType(composite):
             indexes = (
                 context.rng.randint(0, len(composite.type) - 1),
@@ -127,14 +129,14 @@ class OpCompositeInsert(CompositeOperator):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        composite = context.get_random_operand(IsCompositeType)
+        composite = context.get_random_operand(IsCompositeType, requester=cls)
         if IsMatrixType(composite):
             indexes = (
                 context.rng.randint(0, len(composite.type) - 1),
                 context.rng.randint(0, len(composite.type.type) - 1),
             )
             target_object = context.get_random_operand(
-                HasType(composite.get_base_type())
+                HasType(composite.get_base_type()), requester=cls
             )
         else:
             indexes = (context.rng.randint(0, len(composite.type) - 1),)
@@ -143,7 +145,9 @@ class OpCompositeInsert(CompositeOperator):
                 if IsStructType(composite)
                 else composite.get_base_type()
             )
-            target_object = context.get_random_operand(HasType(target_type))
+            target_object = context.get_random_operand(
+                HasType(target_type), requester=cls
+            )
         return FuzzResult(
             cls(
                 type=composite.type,
@@ -160,7 +164,7 @@ class OpCopyObject(CompositeOperator):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        target_object = context.get_random_operand(lambda _: True)
+        target_object = context.get_random_operand(lambda _: True, requester=cls)
         return FuzzResult(cls(type=target_object.type, object=target_object))
 
 
@@ -170,7 +174,7 @@ class OpTranspose(CompositeOperator):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        target_object = context.get_random_operand(IsMatrixType)
+        target_object = context.get_random_operand(IsMatrixType, requester=cls)
         inner_type = OpTypeMatrix(
             type=OpTypeVector(
                 type=target_object.get_base_type(), size=len(target_object.type)
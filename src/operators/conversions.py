@@ -10,8 +10,9 @@ from src import Unsigned
 from src.operators import Operand
 from src.operators import UnaryOperatorFuzzMixin
 from src.patched_dataclass import dataclass
-from src.predicates import HasValidBaseTypeAndSign
+from src.predicates import And
 from src.predicates import IsArithmeticType
+from src.predicates import IsOfBaseTypeAndSign
 from src.types.concrete_types import OpTypeFloat
 from src.types.concrete_types import OpTypeInt
 
@@ -25,10 +26,8 @@ DC = TypeVar("DC")
 class ConversionOperator(Statement, Generic[S, D, SC, DC]):
     OPERAND_SELECTION_PREDICATE: ClassVar[
         Callable[[Operand], bool]
-    ] = lambda target_type, signed: lambda op: IsArithmeticType(
-        op
-    ) and HasValidBaseTypeAndSign(
-        op, target_type, signed
+    ] = lambda target_type, signed: And(
+        IsArithmeticType, IsOfBaseTypeAndSign(target_type, signed)
     )
 
 
@@ -17,8 +17,8 @@ from src.operators import UnaryOperatorFuzzMixin
 from src.patched_dataclass import dataclass
 from src.predicates import And
 from src.predicates import HasBaseType
-from src.predicates import HasValidBaseTypeAndSign
 from src.predicates import IsArithmeticType
+from src.predicates import IsOfBaseTypeAndSign
 from src.predicates import IsOfType
 from src.predicates import IsVectorType
 from src.predicates import Or
@@ -38,12 +38,9 @@ DC = TypeVar("DC")
 class LogicalOperator(Statement, Generic[S, D, SC, DC]):
     OPERAND_SELECTION_PREDICATE: ClassVar[
         Callable[[Operand], bool]
-    ] = lambda target_type, signed: lambda op: Or(
-        IsArithmeticType, IsOfType(OpTypeBool)
-    )(
-        op
-    ) and HasValidBaseTypeAndSign(
-        op, target_type, signed
+    ] = lambda target_type, signed: And(
+        Or(IsArithmeticType, IsOfType(OpTypeBool)),
+        IsOfBaseTypeAndSign(target_type, signed),
     )
 
 
@@ -64,7 +61,7 @@ class OpAny(UnaryLogicalOperator[OpTypeBool, None, None, None]):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand1: Operand = context.get_random_operand(
-            And(IsVectorType, HasBaseType(OpTypeBool()))
+            And(IsVectorType, HasBaseType(OpTypeBool())), requester=cls
         )
         result_type: OpTypeBool = OpTypeBool()
         return FuzzResult(cls(result_type, operand1), [result_type])
@@ -74,7 +71,7 @@ class OpAll(UnaryLogicalOperator[OpTypeBool, None, None, None]):
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
         operand1: Operand = context.get_random_operand(
-            And(IsVectorType, HasBaseType(OpTypeBool()))
+            And(IsVectorType, HasBaseType(OpTypeBool())), requester=cls
         )
         result_type: OpTypeBool = OpTypeBool()
         return FuzzResult(cls(result_type, operand1), [result_type])
@@ -49,8 +49,12 @@ class OpStore(MemoryOperator, Untyped, VoidOp):
 
     @classmethod
     def fuzz(cls, context: "Context") -> FuzzResult[Self]:
-        pointer: OpTypePointer = context.get_random_operand(IsPointerType)
-        target_object: Operand = context.get_random_operand(HasType(pointer.type.type))
+        pointer: OpTypePointer = context.get_random_operand(
+            IsPointerType, requester=cls
+        )
+        target_object: Operand = context.get_random_operand(
+            HasType(pointer.type.type), requester=cls
+        )
         return FuzzResult(cls(type=EmptyType(), pointer=pointer, object=target_object))
 
 
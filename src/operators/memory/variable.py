@@ -58,22 +58,11 @@ class OpVariable(MemoryOperator):
             )
             if storage_class == target_storage_class:
                 pointer_inner_type = context.rng.choice(
-                    list(
-                        filter(
-                            lambda tvc: isinstance(tvc, (OpTypeStruct))
-                            and not isinstance(tvc, OpTypeBool),
-                            context.globals.keys(),
-                        )
-                    )
+                    context.globals_index.instances(OpTypeStruct)
                 )
             else:
                 pointer_inner_type = context.rng.choice(
-                    list(
-                        filter(
-                            lambda tvc: isinstance(tvc, (OpTypeStruct)),
-                            context.symbol_table,
-                        )
-                    )
+                    context.symbol_index.instances(OpTypeStruct)
                 )
             variable_type = OpTypePointer(
                 storage_class=storage_class, type=pointer_inner_type
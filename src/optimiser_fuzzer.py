@@ -1,14 +1,18 @@
+import random
 import signal
 import subprocess
-import tempfile
-from concurrent.futures import ThreadPoolExecutor
-from random import SystemRandom
+from concurrent.futures import Future
+from typing import Optional
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from run import SPIRVSmithConfig
     from src.fuzzing_client import SPIRVShader
 
 from src.monitor import Event, Monitor
+from src.rng import get_process_rng
+from src.tool_pool import get_tool_pool
+from src.tool_pool import ToolPool
 
 SPIRV_OPTIMISER_FLAGS = [
     "--amd-ext-to-khr",
@@ -54,42 +58,65 @@ SPIRV_OPTIMISER_FLAGS = [
 
 
 def fuzz_optimiser(shader: "SPIRVShader"):
-    with tempfile.NamedTemporaryFile(suffix=".spv") as spv_file:
-        if shader.assemble(spv_file.name, silent=True) and shader.validate(silent=True):
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                for _ in range(20):
-                    executor.submit(_fuzz_optimiser, shader, spv_file.name)
+    """
+    Runs spirv-opt with random flags on a shader that is known to be valid.
+    """
+    spirv_bytes: Optional[bytes] = shader.get_spirv_bytes(silent=True)
+    if spirv_bytes is None:
+        return
+    fuzz_optimiser_on_module(shader.context.config, shader.id, spirv_bytes)
 
 
-def _fuzz_optimiser(shader: "SPIRVShader", filename: str):
-    spirv_opt_flags: list[str] = SystemRandom().choices(
-        SPIRV_OPTIMISER_FLAGS, k=SystemRandom().randint(5, len(SPIRV_OPTIMISER_FLAGS))
-    )
-    process: subprocess.CompletedProcess = subprocess.run(
-        [
-            shader.context.config.binaries.OPTIMISER_PATH,
-            "--target-env=spv1.3",
-            *spirv_opt_flags,
-            filename,
-            "-o",
-            f"/dev/null",
-        ],
-        capture_output=True,
-    )
+def fuzz_optimiser_on_module(
+    config: "SPIRVSmithConfig",
+    shader_id: str,
+    spirv_bytes: bytes,
+    pool: Optional[ToolPool] = None,
+):
+    pool = pool or get_tool_pool(config.misc.n_tool_workers)
+    runs: list[tuple[list[str], Future[subprocess.CompletedProcess]]] = []
+    rng: random.Random = get_process_rng()
+    for _ in range(20):
+        spirv_opt_flags: list[str] = rng.choices(
+            SPIRV_OPTIMISER_FLAGS,
+            k=rng.randint(5, len(SPIRV_OPTIMISER_FLAGS)),
+        )
+        process: Future[subprocess.CompletedProcess] = pool.submit(
+            [
+                config.binaries.OPTIMISER_PATH,
+                "--target-env=spv1.3",
+                *spirv_opt_flags,
+                "-",
+                "-o",
+                f"/dev/null",
+            ],
+            spirv_bytes,
+        )
+        runs.append((spirv_opt_flags, process))
+    for spirv_opt_flags, process in runs:
+        report_optimiser_run(config, shader_id, spirv_opt_flags, process.result())
+
+
+def report_optimiser_run(
+    config: "SPIRVSmithConfig",
+    shader_id: str,
+    spirv_opt_flags: list[str],
+    process: subprocess.CompletedProcess,
+):
     if process.returncode != 0:
-        Monitor(shader.context.config).error(
+        Monitor(config).error(
             event=Event.OPTIMIZER_FAILURE,
             extra={
                 "stderr": process.stderr.decode("utf-8"),
                 "stdout": process.stdout.decode("utf-8"),
                 "is_segfault": process.returncode == -signal.SIGSEGV,
                 "run_args": " ".join(process.args),
-                "shader_id": shader.id,
+                "shader_id": shader_id,
                 "spirv-opt_flags": spirv_opt_flags,
             },
         )
     else:
-        Monitor(shader.context.config).info(
+        Monitor(config).info(
             event=Event.OPTIMIZER_SUCCESS,
-            extra={"shader_id": shader.id, "spirv-opt_flags": spirv_opt_flags},
+            extra={"shader_id": shader_id, "spirv-opt_flags": spirv_opt_flags},
         )
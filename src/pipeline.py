@@ -0,0 +1,118 @@
+import queue
+import threading
+from typing import Callable
+from typing import Generic
+from typing import Optional
+from typing import TYPE_CHECKING
+from typing import TypeVar
+
+from src.monitor import Event
+from src.monitor import Monitor
+
+if TYPE_CHECKING:
+    from run import SPIRVSmithConfig
+
+T = TypeVar("T")
+
+# Put once per thread in a stage inbox to shut the thread down
+STOP = object()
+
+
+class Stage(Generic[T]):
+    """
+    Pool of threads consuming items from a bounded inbox.
+
+    Whatever `handler` returns (unless None) is put in the inbox of the
+    `downstream` stage. A full inbox blocks whoever puts items in it, so a
+    slow stage holds back the ones before it instead of buffering without
+    limit.
+
+    Errors raised by `handler` are logged as they happen. After
+    `max_consecutive_errors` of them in a row the stage reports itself as
+    failed, so that the producer can stop feeding it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[T], Optional[object]],
+        n_threads: int = 1,
+        inbox_size: int = 64,
+        downstream: Optional["Stage"] = None,
+        max_consecutive_errors: Optional[int] = None,
+        config: Optional["SPIRVSmithConfig"] = None,
+    ) -> None:
+        self.name: str = name
+        self.handler: Callable[[T], Optional[object]] = handler
+        self.downstream: Optional[Stage] = downstream
+        self.max_consecutive_errors: Optional[int] = max_consecutive_errors
+        self.config: Optional["SPIRVSmithConfig"] = config
+        self.inbox: queue.Queue = queue.Queue(maxsize=inbox_size)
+        self.lock = threading.Lock()
+        # Only the first error is kept, it is re-raised by close()
+        self.error: Optional[Exception] = None
+        self.consecutive_errors: int = 0
+        self.failed = threading.Event()
+        self.threads: list[threading.Thread] = [
+            threading.Thread(target=self.work, name=f"{name}-{k}", daemon=True)
+            for k in range(max(n_threads, 1))
+        ]
+
+    def start(self) -> "Stage[T]":
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def put(self, item: T) -> None:
+        self.inbox.put(item)
+
+    def work(self) -> None:
+        while (item := self.inbox.get()) is not STOP:
+            try:
+                result: Optional[object] = self.handler(item)
+            except Exception as e:
+                # Keep consuming so that upstream stages never block forever
+                self.record_error(e)
+                continue
+            with self.lock:
+                self.consecutive_errors = 0
+            if result is not None and self.downstream is not None:
+                self.downstream.put(result)
+
+    def record_error(self, error: Exception) -> None:
+        Monitor(self.config).error(
+            event=Event.STAGE_FAILURE,
+            extra={"stage": self.name, "reason": repr(error)},
+        )
+        with self.lock:
+            if self.error is None:
+                self.error = error
+            self.consecutive_errors += 1
+            if (
+                self.max_consecutive_errors is not None
+                and self.consecutive_errors >= self.max_consecutive_errors
+            ):
+                self.failed.set()
+
+    def has_failed(self) -> bool:
+        """
+        Whether this stage, or one downstream of it, gave up after repeated
+        errors.
+        """
+        return self.failed.is_set() or (
+            self.downstream is not None and self.downstream.has_failed()
+        )
+
+    def close(self) -> None:
+        """
+        Waits for every queued item to go through this stage, then closes
+        the downstream stage. Re-raises the first error raised by the handler.
+        """
+        for _ in self.threads:
+            self.inbox.put(STOP)
+        for thread in self.threads:
+            thread.join()
+        if self.downstream is not None:
+            self.downstream.close()
+        if self.error is not None:
+            raise self.error
@@ -10,22 +10,68 @@ from src.types.concrete_types import OpTypePointer
 from src.types.concrete_types import OpTypeStruct
 from src.types.concrete_types import OpTypeVector
 
-And = lambda *ps: lambda x: all(p(x) for p in ps)
-Or = lambda *ps: lambda x: any(p(x) for p in ps)
+
+def Hinted(predicate, **hints):
+    """
+    Tags a predicate with necessary conditions on the shape of the operands it
+    accepts so that the operand index can narrow down candidates before
+    evaluating the predicate itself.
+
+    Supported hints are `type` (exact result type), `type_class` (class of the
+    result type), `base_class` (class of the base type) and `signed`
+    (signedness of the base type).
+    """
+    predicate.hints = hints
+    return predicate
+
+
+def get_hints(predicate) -> dict:
+    return getattr(predicate, "hints", {})
+
+
+def _and_hints(*ps) -> dict:
+    # Every conjunct must hold, so all of their hints do too.
+    # When two conjuncts constrain the same attribute, the first one wins.
+    hints = {}
+    for p in reversed(ps):
+        hints |= get_hints(p)
+    return hints
+
+
+def _or_hints(*ps) -> dict:
+    # A disjunction can only be narrowed down if all of its
+    # branches constrain the class of the result type.
+    if not ps or any(set(get_hints(p)) != {"type_class"} for p in ps):
+        return {}
+    type_classes = []
+    for p in ps:
+        type_class = get_hints(p)["type_class"]
+        type_classes += type_class if isinstance(type_class, tuple) else [type_class]
+    return {"type_class": tuple(type_classes)}
+
+
+And = lambda *ps: Hinted(lambda x: all(p(x) for p in ps), **_and_hints(*ps))
+Or = lambda *ps: Hinted(lambda x: any(p(x) for p in ps), **_or_hints(*ps))
 Not = lambda p: lambda x: not p(x)
 
-HasType = lambda t: lambda x: x.type == t
-HasBaseType = lambda t: lambda x: x.get_base_type() == t
+HasType = lambda t: Hinted(lambda x: x.type == t, type=t)
+HasBaseType = lambda t: Hinted(
+    lambda x: x.get_base_type() == t,
+    base_class=t.__class__,
+    **({"signed": t.signed} if hasattr(t, "signed") else {}),
+)
 HasLength = lambda n: lambda x: len(x.type) == n
-IsOfType = lambda t: lambda x: isinstance(x.type, t)
-IsOfBaseType = lambda t: lambda x: isinstance(x.get_base_type(), t)
+IsOfType = lambda t: Hinted(lambda x: isinstance(x.type, t), type_class=t)
+IsOfBaseType = lambda t: Hinted(
+    lambda x: isinstance(x.get_base_type(), t), base_class=t
+)
 
 IsTyped = lambda x: not isinstance(x, Untyped)
 
 IsSigned = lambda x: x.signed == 1
 
-IsBaseTypeSigned = lambda x: IsSigned(x.get_base_type())
-IsBaseTypeUnsigned = lambda x: Not(IsSigned)(x.get_base_type())
+IsBaseTypeSigned = Hinted(lambda x: IsSigned(x.get_base_type()), signed=1)
+IsBaseTypeUnsigned = Hinted(lambda x: Not(IsSigned)(x.get_base_type()), signed=0)
 
 IsOfFloatBaseType = IsOfBaseType(OpTypeFloat)
 IsOfUnsignedIntegerBaseType = And(IsOfBaseType(OpTypeInt), IsBaseTypeUnsigned)
@@ -54,6 +100,11 @@ HasValidBaseTypeAndSign = lambda x, target_type, signed: HasValidBaseType(
     x, target_type
 ) and HasValidSign(x, signed)
 HasValidType = lambda x, target_type: isinstance(x.type, target_type)
+IsOfBaseTypeAndSign = lambda target_type, signed: Hinted(
+    lambda x: HasValidBaseTypeAndSign(x, target_type, signed),
+    base_class=target_type,
+    **({"signed": signed} if signed is not None else {}),
+)
 HasValidTypeAndSign = lambda x, target_type, signed: HasValidType(
     x, target_type
 ) and HasValidSign(x, signed)
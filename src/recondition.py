@@ -1,8 +1,8 @@
 from abc import ABC
 from dataclasses import dataclass
 from dataclasses import field
-from inspect import isclass
 from typing import Generic
+from typing import Optional
 from typing import TypeAlias
 from typing import TypeVar
 
@@ -10,6 +10,7 @@ from spirv_enums import StorageClass
 
 from src import OpCode
 from src.context import Context
+from src.context import GenerationSettings
 from src.extension import OpExtInst
 from src.extension import OpExtInstImport
 from src.function import OpBranch
@@ -108,7 +109,7 @@ class UndefOpCode(DangerousPattern[UndefOpCodeVulnerableOpCode]):
         context: Context,
         opcode: UndefOpCodeVulnerableOpCode,
     ) -> ReconditioningEffects:
-        if not isclass(opcode):
+        if isinstance(opcode, OpCode):
             fuzzed_opcode = None
             for attr in opcode.members():
                 if attr.startswith("type") or attr.endswith("type"):
@@ -526,70 +527,113 @@ class InfiniteLoop(DangerousPattern[InfiniteLoopVulnerableOpCode]):
 #         return {OpBitFieldInsert, OpBitFieldSExtract, OpBitFieldUExtract}
 
 
+class ExtInstOperands:
+    """
+    Stands in for an OpExtInst when it is handed to a DangerousPattern, so
+    that extended instructions can be reconditioned like regular opcodes
+    through operand1, operand2...
+    """
+
+    def __init__(self, opcode: OpExtInst) -> None:
+        self.opcode: OpExtInst = opcode
+        self.__name__: str = opcode.instruction.__name__
+        for k, operand in enumerate(opcode.operands):
+            setattr(self, f"operand{k + 1}", operand)
+
+    def commit(self) -> None:
+        self.opcode.operands = tuple(
+            getattr(self, f"operand{k + 1}") for k in range(len(self.opcode.operands))
+        )
+
+
+# Parsed shaders have no configuration, the operands of the opcodes added by
+# reconditioning are then always picked among the constants
+PARSED_SHADER_SETTINGS = GenerationSettings(
+    shader_target_size=0,
+    max_depth=0,
+    p_mutation=0,
+    p_picking_statement_operand=0,
+    rbp_policy="uniform",
+    no_operand_log_interval=0,
+)
+
+# Dangerous patterns affecting each opcode class, see get_dangerous_patterns
+DANGEROUS_PATTERNS: dict[type[OpCode], tuple[type[DangerousPattern], ...]] = {}
+
+
+def get_dangerous_patterns(
+    opcode_class: type[OpCode],
+) -> tuple[type[DangerousPattern], ...]:
+    try:
+        return DANGEROUS_PATTERNS[opcode_class]
+    except KeyError:
+        dangerous_patterns: tuple[type[DangerousPattern], ...] = tuple(
+            dangerous_pattern
+            for dangerous_pattern in DangerousPattern.__subclasses__()
+            if any(
+                issubclass(opcode_class, affected_opcode)
+                for affected_opcode in dangerous_pattern.get_affected_opcodes()
+            )
+        )
+        DANGEROUS_PATTERNS[opcode_class] = dangerous_patterns
+        return dangerous_patterns
+
+
 def recondition_opcodes(context: Context, spirv_opcodes: list[OpCode]):
-    if not context.config:
-        context.config = {"strategy": {"p_picking_statement_operand": 0}}
-    dangerous_patterns = DangerousPattern.__subclasses__()
-    i = 0
-    j = len(spirv_opcodes)
-    reconditioning_side_effects = []
+    if context.settings is None:
+        context.settings = PARSED_SHADER_SETTINGS
     if "GLSL.std.450" not in context.extension_sets:
         context.extension_sets["GLSL.std.450"] = OpExtInstImport("GLSL.std.450")
-    while i < j:
-        opcode = spirv_opcodes[i]
-        for dangerous_pattern in dangerous_patterns:
-            if isinstance(opcode, OpExtInst):
-                opcode_class = opcode.instruction
-                for k in range(len((opcode.operands))):
-                    setattr(opcode.instruction, f"operand{k + 1}", opcode.operands[k])
-            else:
-                opcode_class = opcode.__class__
-            if any(
-                [
-                    issubclass(opcode_class, affected_opcode)
-                    for affected_opcode in dangerous_pattern.get_affected_opcodes()
-                ]
-            ):
-                reconditioning_side_effects: ReconditioningEffects = (
-                    dangerous_pattern.recondition(
-                        context,
-                        opcode.instruction if isinstance(opcode, OpExtInst) else opcode,
-                    )
-                )
-                spirv_opcodes = (
-                    spirv_opcodes[: i - reconditioning_side_effects.immediate_offset]
-                    + reconditioning_side_effects.immediate_effects
-                    + spirv_opcodes[
-                        i - reconditioning_side_effects.immediate_offset : i + 1
-                    ]
-                    + reconditioning_side_effects.post_effects
-                    + spirv_opcodes[
-                        i + reconditioning_side_effects.overwrite_length + 1 :
-                    ]
+    reconditioned_opcodes: list[OpCode] = []
+    # Variables have to be declared at the start of the first block, later
+    # batches end up in front of earlier ones
+    variable_effects: list[OpVariable] = []
+    first_label_index: Optional[int] = None
+    i: int = 0
+    while i < len(spirv_opcodes):
+        opcode: OpCode = spirv_opcodes[i]
+        i += 1
+        if isinstance(opcode, OpExtInst):
+            opcode_class: type[OpCode] = opcode.instruction
+            reconditioned: OpCode | ExtInstOperands = ExtInstOperands(opcode)
+        else:
+            opcode_class = opcode.__class__
+            reconditioned = opcode
+        post_effects: list[OpCode] = []
+        for dangerous_pattern in get_dangerous_patterns(opcode_class):
+            reconditioning_side_effects: ReconditioningEffects = (
+                dangerous_pattern.recondition(context, reconditioned)
+            )
+            if reconditioning_side_effects.immediate_effects:
+                insertion_index: int = (
+                    len(reconditioned_opcodes)
+                    - reconditioning_side_effects.immediate_offset
                 )
-                if reconditioning_side_effects.variable_effects:
-                    insertion_index: int = spirv_opcodes.index(OpLabel()) + 1
-                    spirv_opcodes = (
-                        spirv_opcodes[:insertion_index]
-                        + reconditioning_side_effects.variable_effects
-                        + spirv_opcodes[insertion_index:]
+                reconditioned_opcodes[
+                    insertion_index:insertion_index
+                ] = reconditioning_side_effects.immediate_effects
+                if (
+                    first_label_index is not None
+                    and insertion_index <= first_label_index
+                ):
+                    first_label_index += len(
+                        reconditioning_side_effects.immediate_effects
                     )
-                i += len(reconditioning_side_effects)
-                # Reset the OpExtInst and update operands
-                if isinstance(opcode, OpExtInst):
-                    opcode.operands = tuple(
-                        list(
-                            filter(
-                                None,
-                                [
-                                    getattr(opcode.instruction, "operand1", None),
-                                    getattr(opcode.instruction, "operand2", None),
-                                    getattr(opcode.instruction, "operand3", None),
-                                ],
-                            )
-                        )
-                    )
-                    opcode.instruction = opcode_class
-        i += 1
-        j = len(spirv_opcodes)
-    return spirv_opcodes
+            post_effects += reconditioning_side_effects.post_effects
+            if reconditioning_side_effects.variable_effects:
+                variable_effects[:0] = reconditioning_side_effects.variable_effects
+            # The overwritten opcodes are dropped without being looked at
+            i += reconditioning_side_effects.overwrite_length
+        if isinstance(reconditioned, ExtInstOperands):
+            reconditioned.commit()
+        if first_label_index is None and isinstance(opcode, OpLabel):
+            first_label_index = len(reconditioned_opcodes)
+        reconditioned_opcodes.append(opcode)
+        reconditioned_opcodes += post_effects
+    if variable_effects:
+        if first_label_index is None:
+            raise ValueError("No OpLabel to declare reconditioning variables after")
+        reconditioned_opcodes[
+            first_label_index + 1 : first_label_index + 1
+        ] = variable_effects
+    return reconditioned_opcodes
@@ -0,0 +1,105 @@
+"""
+Random number generators used by SPIRVSmith.
+
+Every generator is a `random.Random`, so `choice`, `choices`, `randint`,
+`uniform`... behave the same whatever the source:
+
+    mt19937  Mersenne Twister of the standard library, the default
+    pcg64    NumPy's PCG64, drawn in blocks of 64-bit words
+    system   os.urandom, cryptographically secure but one syscall per draw
+
+The Mersenne Twister stays the default: it draws in C, while PCG64 words are
+served from Python and every draw from it is slower.
+
+The system source cannot be seeded, shaders generated from it cannot be
+generated again from their seed.
+"""
+import os
+import random
+from typing import Optional
+
+import numpy as np
+
+RNG_SOURCES: tuple[str, ...] = ("mt19937", "pcg64", "system")
+DEFAULT_RNG_SOURCE: str = "mt19937"
+
+RECIP_BPF: float = 2.0**-53
+
+
+class PCG64Random(random.Random):
+    """
+    random.Random drawing from NumPy's PCG64.
+
+    Words are generated BLOCK_SIZE at a time and served from a buffer, all
+    the other methods of random.Random are derived from `random` and
+    `getrandbits`.
+    """
+
+    BLOCK_SIZE: int = 4096
+
+    def seed(self, a: Optional[int] = None, version: int = 2) -> None:
+        # Called by random.Random.__init__. random.Random.seed is not called, it
+        # would only seed the unused Mersenne Twister, but the gaussian it keeps
+        # from the previous seed must be dropped all the same
+        self.bit_generator = np.random.PCG64(a)
+        self.words: list[int] = []
+        self.gauss_next: Optional[float] = None
+
+    def next_word(self) -> int:
+        try:
+            return self.words.pop()
+        except IndexError:
+            self.words = self.bit_generator.random_raw(self.BLOCK_SIZE).tolist()
+            return self.words.pop()
+
+    def random(self) -> float:
+        return (self.next_word() >> 11) * RECIP_BPF
+
+    def getrandbits(self, k: int) -> int:
+        if k <= 64:
+            return self.next_word() >> (64 - k)
+        bits: int = 0
+        for _ in range((k + 63) // 64):
+            bits = (bits << 64) | self.next_word()
+        return bits >> (-k % 64)
+
+    def getstate(self) -> tuple:
+        return self.bit_generator.state, tuple(self.words), self.gauss_next
+
+    def setstate(self, state: tuple) -> None:
+        bit_generator_state, words, self.gauss_next = state
+        self.bit_generator.state = bit_generator_state
+        self.words = list(words)
+
+
+def create_rng(
+    seed: Optional[int] = None, source: str = DEFAULT_RNG_SOURCE
+) -> random.Random:
+    """
+    Generator of the given source, seeded from the OS when `seed` is None.
+    """
+    match source:
+        case "mt19937":
+            return random.Random(seed)
+        case "pcg64":
+            return PCG64Random(seed)
+        case "system":
+            return random.SystemRandom()
+        case _:
+            raise ValueError(f"Unknown random source: {source}")
+
+
+# Unseeded generator for the draws that need not be reproducible
+PROCESS_RNG: random.Random = create_rng()
+
+
+def get_process_rng() -> random.Random:
+    return PROCESS_RNG
+
+
+def _reseed_process_rng() -> None:
+    # A forked child would otherwise draw the same numbers as its parent
+    PROCESS_RNG.seed()
+
+
+os.register_at_fork(after_in_child=_reseed_process_rng)
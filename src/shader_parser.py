@@ -93,10 +93,17 @@ def resolve_operands(
 
 
 def parse_spirv_assembly_lines(lines: list[str]) -> SPIRVShader:
-    capabilities: list[OpCapability] = []
     global_context: Context = Context.create_global_context(
         ExecutionModel.GLCompute, None
     )
+    # Only known if the shader header records it
+    global_context.seed = None
+    with global_context.id_allocator.activated():
+        return parse_into_context(global_context, lines)
+
+
+def parse_into_context(global_context: Context, lines: list[str]) -> SPIRVShader:
+    capabilities: list[OpCapability] = []
     current_context = global_context
     deferred_lines: list[list[str]] = []
     deferred_indices: list[tuple[int, list[str]]] = []
@@ -105,6 +112,9 @@ def parse_spirv_assembly_lines(lines: list[str]) -> SPIRVShader:
     current_opcode: Optional[OpCode] = None
     for line in (line.split(" ") for line in lines):
         match line:
+            case [";", "Seed:", *_, seed]:
+                global_context.seed = int(seed, 16)
+                continue
             case [";", *_]:
                 continue
             case ["OpCapability", capability]:
@@ -133,7 +143,8 @@ def parse_spirv_assembly_lines(lines: list[str]) -> SPIRVShader:
                     opcode_class, operands, opcode_lookup_table
                 )
                 current_opcode = opcode_class(*resolved_operands)
-                current_opcode.id = opcode_id.replace("%", "")
+                current_opcode.id = int(opcode_id.replace("%", ""))
+                global_context.id_allocator.observe(current_opcode.id)
                 opcode_lookup_table[opcode_id] = current_opcode
             case [opcode_name, *operands]:
                 opcode_class: type[OpCode] = CLASSES[opcode_name]
@@ -160,7 +171,7 @@ def parse_spirv_assembly_lines(lines: list[str]) -> SPIRVShader:
             }:
                 current_context.extension_sets[current_opcode.name] = current_opcode
             else:
-                current_context.symbol_table.append(current_opcode)
+                current_context.add_to_symbol_table(current_opcode)
                 if current_opcode.__class__.__name__ == "OpFunction":
                     current_context = current_context.make_child_context(current_opcode)
                     current_context.current_function_type = current_opcode.function_type
@@ -1,14 +1,20 @@
+import io
 import random
 import subprocess
-import tempfile
+from concurrent.futures import Future
 from dataclasses import field
 from enum import Enum
+from typing import Iterator
+from typing import Optional
+from typing import TextIO
+from typing import TYPE_CHECKING
 
 from shortuuid import uuid
 from spirv_enums import Decoration
 from typing_extensions import Self
 
 from src import OpCode
+from src import VoidOp
 from src.annotations import OpDecorate
 from src.context import Context
 from src.misc import OpCapability
@@ -20,12 +26,20 @@ from src.monitor import Monitor
 from src.operators.memory.variable import OpVariable
 from src.patched_dataclass import dataclass
 from src.recondition import recondition_opcodes
+from src.spirv_binary import encode_shader
+from src.spirv_binary import SPIRVEncodingError
+from src.tool_pool import get_tool_pool
+from src.tool_pool import to_subprocess_result
+from src.tool_pool import ToolPool
 from src.types.concrete_types import OpTypeFloat
 from src.types.concrete_types import OpTypeInt
 from src.utils import get_spirvsmith_version
 from src.utils import SubprocessResult
 from src.utils import TARGET_SPIRV_VERSION
 
+if TYPE_CHECKING:
+    from run import SPIRVSmithConfig
+
 
 @dataclass
 class SPIRVShader:
@@ -37,36 +51,52 @@ class SPIRVShader:
     opcodes: list[OpCode]
     context: Context
 
+    def iter_instructions(self: Self) -> Iterator[OpCode]:
+        yield from self.capabilities
+        yield from self.context.extension_sets.values()
+        yield self.memory_model
+        yield self.entry_point
+        yield self.execution_mode
+        yield from self.context.get_global_context().annotations.keys()
+        yield from self.context.globals.keys()
+        yield from self.opcodes
+
+    def iter_assembly(self: Self) -> Iterator[str]:
+        yield "; Magic:     0x07230203 (SPIR-V)"
+        yield f"; Version:   0x00010300 (Version: {get_spirvsmith_version()[1:]})"
+        yield "; Generator: 0x00220001 (SPIRVSmith)"
+        yield f"; Bound:     {self.get_bound()}"
+        yield "; Schema:    0"
+        if self.context.seed is not None:
+            yield f"; Seed:      {self.context.seed:#018x}"
+        for opcode in self.iter_instructions():
+            yield opcode.to_spasm(self.context)
+
+    def write_assembly(self: Self, fileobj: TextIO) -> None:
+        lines: Iterator[str] = self.iter_assembly()
+        # Lines are separated, not terminated, by newlines
+        fileobj.write(next(lines))
+        for line in lines:
+            fileobj.write("\n")
+            fileobj.write(line)
+
+    def to_assembly(self: Self) -> str:
+        buffer = io.StringIO()
+        self.write_assembly(buffer)
+        return buffer.getvalue()
+
     def generate_assembly_lines(self: Self) -> list[str]:
-        assembly_lines: list[str] = [
-            "; Magic:     0x07230203 (SPIR-V)",
-            f"; Version:   0x00010300 (Version: {get_spirvsmith_version()[1:]})",
-            "; Generator: 0x00220001 (SPIRVSmith)",
-            f"; Bound:     {len(self.opcodes) + len(self.context.globals) - 1}",
-            "; Schema:    0",
-        ]
-        assembly_lines += [
-            capability.to_spasm(self.context) for capability in self.capabilities
-        ]
-        assembly_lines += [
-            ext.to_spasm(self.context) for ext in self.context.extension_sets.values()
-        ]
-        assembly_lines.append(self.memory_model.to_spasm(self.context))
-        assembly_lines.append(self.entry_point.to_spasm(self.context))
-        assembly_lines.append(self.execution_mode.to_spasm(self.context))
-        assembly_lines += [
-            annotation.to_spasm(self.context)
-            for annotation in self.context.get_global_context().annotations.keys()
-        ]
-        assembly_lines += [
-            tvc.to_spasm(self.context) for tvc, _ in self.context.globals.items()
-        ]
-        assembly_lines += [opcode.to_spasm(self.context) for opcode in self.opcodes]
-        return assembly_lines
+        return list(self.iter_assembly())
+
+    def get_bound(self: Self) -> int:
+        ids: list[int] = [ext.id for ext in self.context.extension_sets.values()]
+        ids += self.context.globals.values()
+        ids += [opcode.id for opcode in self.opcodes if not isinstance(opcode, VoidOp)]
+        return max(ids, default=0) + 1
 
     def generate_assembly_file(self, outfile_path: str) -> None:
         with open(outfile_path, "w") as f:
-            f.write("\n".join(self.generate_assembly_lines()))
+            self.write_assembly(f)
 
     def normalise_ids(self: Self) -> Self:
         def id_generator(i=1):
@@ -76,28 +106,56 @@ class SPIRVShader:
 
         id_gen = id_generator()
         for ext in self.context.extension_sets.values():
-            ext.id = str(next(id_gen))
+            ext.id = next(id_gen)
         new_tvc = {}
         for tvc in self.context.globals.keys():
-            tvc.id = str(next(id_gen))
+            tvc.id = next(id_gen)
             new_tvc[tvc] = tvc.id
         self.context.globals = new_tvc
         for opcode in self.opcodes:
-            opcode.id = str(next(id_gen))
+            opcode.id = next(id_gen)
+        self.context.id_allocator.next_id = next(id_gen)
 
         return self
 
     def recondition(self: Self) -> Self:
-        self.opcodes = recondition_opcodes(self.context, self.opcodes)
+        with self.context.id_allocator.activated():
+            self.opcodes = recondition_opcodes(self.context, self.opcodes)
         return self
 
-    def assemble(self: Self, outfile_path: str, silent: bool = False) -> bool:
-        with tempfile.NamedTemporaryFile(suffix=".spasm") as spasm_file:
-            self.generate_assembly_file(spasm_file.name)
-            process_result: SubprocessResult = assemble_spasm_file(
-                spasm_file.name, outfile_path
+    def to_spirv_bytes(self: Self) -> bytes:
+        return encode_shader(self)
+
+    def get_spirv_bytes(self: Self, silent: bool = False) -> Optional[bytes]:
+        try:
+            spirv_bytes: bytes = self.to_spirv_bytes()
+        except SPIRVEncodingError:
+            # Let spirv-as deal with whatever the encoder does not support
+            return self.assemble_with_spirv_as(silent)
+        if not silent:
+            Monitor(self.context.config).info(
+                event=Event.ASSEMBLER_SUCCESS, extra={"shader_id": self.id}
             )
-            if process_result.exit_code != 0 and not silent:
+        return spirv_bytes
+
+    def assemble(self: Self, outfile_path: str, silent: bool = False) -> bool:
+        spirv_bytes: Optional[bytes] = self.get_spirv_bytes(silent)
+        if spirv_bytes is None:
+            return False
+        with open(outfile_path, "wb") as f:
+            f.write(spirv_bytes)
+        return True
+
+    def assemble_with_spirv_as(self: Self, silent: bool = False) -> Optional[bytes]:
+        process: subprocess.CompletedProcess = get_tool_pool(
+            self.context.config.misc.n_tool_workers
+        ).run(
+            ["spirv-as", "--target-env", TARGET_SPIRV_VERSION, "-", "-o", "-"],
+            self.to_assembly().encode("utf-8"),
+        )
+        if process.returncode != 0:
+            if not silent:
+                process_result: SubprocessResult = to_subprocess_result(process)
                 Monitor(self.context.config).error(
                     event=Event.ASSEMBLER_FAILURE,
                     extra={
@@ -106,34 +164,60 @@ class SPIRVShader:
                         "shader_id": self.id,
                     },
                 )
-                return False
-            elif not silent:
-                Monitor(self.context.config).info(
-                    event=Event.ASSEMBLER_SUCCESS, extra={"shader_id": self.id}
-                )
-                return True
+            return None
+        if not silent:
+            Monitor(self.context.config).info(
+                event=Event.ASSEMBLER_SUCCESS, extra={"shader_id": self.id}
+            )
+        return process.stdout
 
     def validate(self: Self, silent: bool = False) -> bool:
-        with tempfile.NamedTemporaryFile(suffix=".spv") as spv_file:
-            if not self.assemble(spv_file.name, silent):
-                return False
-            process_result: SubprocessResult = validate_spv_file(spv_file.name)
-            if process_result.exit_code != 0 and not silent:
-                Monitor(self.context.config).error(
-                    event=Event.VALIDATOR_FAILURE,
-                    extra={
-                        "stderr": process_result.stderr,
-                        "executed_command": process_result.executed_command,
-                        "shader_id": self.id,
-                    },
-                )
-                return False
-            elif not silent:
-                Monitor(self.context.config).info(
-                    event=Event.VALIDATOR_SUCCESS,
-                    extra={"shader_id": self.id},
-                )
-                return True
+        return validate_shaders([self], silent)[0]
+
+
+def validate_shaders(shaders: list[SPIRVShader], silent: bool = False) -> list[bool]:
+    """
+    Validates a batch of shaders on the tool pool, results are returned in
+    the same order as the shaders.
+    """
+    if not shaders:
+        return []
+    pool: ToolPool = get_tool_pool(shaders[0].context.config.misc.n_tool_workers)
+    pending: list[Optional[Future[subprocess.CompletedProcess]]] = []
+    for shader in shaders:
+        spirv_bytes: Optional[bytes] = shader.get_spirv_bytes(silent)
+        pending.append(
+            None if spirv_bytes is None else pool.submit(validator_args(), spirv_bytes)
+        )
+    results: list[bool] = []
+    for shader, future in zip(shaders, pending):
+        if future is None:
+            results.append(False)
+            continue
+        process_result: SubprocessResult = to_subprocess_result(future.result())
+        if not silent:
+            report_validation(shader.context.config, shader.id, process_result)
+        results.append(process_result.exit_code == 0)
+    return results
+
+
+def report_validation(
+    config: "SPIRVSmithConfig", shader_id: str, process_result: SubprocessResult
+) -> None:
+    if process_result.exit_code != 0:
+        Monitor(config).error(
+            event=Event.VALIDATOR_FAILURE,
+            extra={
+                "stderr": process_result.stderr,
+                "executed_command": process_result.executed_command,
+                "shader_id": shader_id,
+            },
+        )
+    else:
+        Monitor(config).info(
+            event=Event.VALIDATOR_SUCCESS,
+            extra={"shader_id": shader_id},
+        )
 
 
 # class CrossLanguage(Enum):
@@ -165,44 +249,49 @@ class SPIRVShader:
 #     return process.returncode == 0
 
 
-def assemble_spasm_file(infile_path: str, outfile_path: str) -> SubprocessResult:
-    process: subprocess.CompletedProcess = subprocess.run(
-        [
-            "spirv-as",
-            "--target-env",
-            TARGET_SPIRV_VERSION,
-            infile_path,
-            "-o",
-            outfile_path,
-        ],
-        capture_output=True,
-    )
-    return SubprocessResult(
-        process.returncode,
-        process.stdout.decode("utf-8"),
-        process.stderr.decode("utf-8"),
-        " ".join(process.args),
+def assemble_spasm_file(
+    infile_path: str, outfile_path: str, pool: Optional[ToolPool] = None
+) -> SubprocessResult:
+    pool = pool or get_tool_pool()
+    return to_subprocess_result(
+        pool.run(
+            [
+                "spirv-as",
+                "--target-env",
+                TARGET_SPIRV_VERSION,
+                infile_path,
+                "-o",
+                outfile_path,
+            ]
+        )
     )
 
 
-def disassemble_spv_file(spv_path: str, outfile_path: str, silent: bool = False):
-    process: subprocess.CompletedProcess = subprocess.run(
-        [
-            "spirv-dis",
-            "--no-indent",
-            "--raw-id",
-            "-o",
-            outfile_path,
-            spv_path,
-        ],
-        capture_output=True,
+def disassemble_spv_file(
+    spv_path: str,
+    outfile_path: str,
+    silent: bool = False,
+    pool: Optional[ToolPool] = None,
+):
+    pool = pool or get_tool_pool()
+    process_result: SubprocessResult = to_subprocess_result(
+        pool.run(
+            [
+                "spirv-dis",
+                "--no-indent",
+                "--raw-id",
+                "-o",
+                outfile_path,
+                spv_path,
+            ]
+        )
     )
-    if process.returncode != 0 and not silent:
+    if process_result.exit_code != 0 and not silent:
         Monitor().error(
             event=Event.DISASSEMBLER_FAILURE,
             extra={
-                "stderr": process.stderr.decode("utf-8"),
-                "run_args": " ".join(process.args),
+                "stderr": process_result.stderr,
+                "run_args": process_result.executed_command,
                 "shader_id": spv_path.split("/")[-1].split(".spv")[0],
             },
         )
@@ -212,83 +301,27 @@ def disassemble_spv_file(spv_path: str, outfile_path: str, silent: bool = False)
             extra={"shader_id": spv_path.split("/")[-1].split(".spv")[0]},
         )
 
-    return process.returncode == 0
+    return process_result.exit_code == 0
 
 
 def validate_spv_file(
-    filename: str,
+    filename: str, pool: Optional[ToolPool] = None
 ) -> SubprocessResult:
-    process: subprocess.CompletedProcess = subprocess.run(
-        [
-            "spirv-val",
-            "--target-env",
-            TARGET_SPIRV_VERSION,
-            filename,
-        ],
-        capture_output=True,
-    )
-    return SubprocessResult(
-        process.returncode,
-        process.stdout.decode("utf-8"),
-        process.stderr.decode("utf-8"),
-        " ".join(process.args),
+    pool = pool or get_tool_pool()
+    return to_subprocess_result(
+        pool.run(["spirv-val", "--target-env", TARGET_SPIRV_VERSION, filename])
     )
 
 
-def optimise_spv_file(shader: SPIRVShader, filename: str) -> bool:
-    process: subprocess.CompletedProcess = subprocess.run(
-        [
-            shader.context.config.binaries.OPTIMISER_PATH,
-            f"--target-env={TARGET_SPIRV_VERSION}",
-            filename,
-            "-o",
-            f"out/{shader.id}/spv_opt/shader.spv",
-        ],
-        capture_output=True,
-    )
-    if process.returncode != 0:
-        Monitor(shader.context.config).error(
-            event=Event.OPTIMIZER_FAILURE,
-            extra={
-                "stderr": process.stderr.decode("utf-8"),
-                "run_args": " ".join(process.args),
-                "shader_id": shader.id,
-            },
-        )
-    else:
-        Monitor(shader.context.config).info(
-            event=Event.OPTIMIZER_SUCCESS, extra={"shader_id": shader.id}
-        )
-
-    return process.returncode == 0
-
+def validator_args() -> list[str]:
+    return ["spirv-val", "--target-env", TARGET_SPIRV_VERSION, "-"]
 
-def reduce_spv_file(shader: SPIRVShader, filename: str) -> bool:
-    process: subprocess.CompletedProcess = subprocess.run(
-        [
-            shader.context.config.binaries.OPTIMISER_PATH,
-            f"--target-env={TARGET_SPIRV_VERSION}",
-            filename,
-            "-o",
-            f"out/{shader.id}/spv_opt/shader.spv",
-        ],
-        capture_output=True,
-    )
-    if process.returncode != 0:
-        Monitor(shader.context.config).error(
-            event=Event.OPTIMIZER_FAILURE,
-            extra={
-                "stderr": process.stderr.decode("utf-8"),
-                "run_args": " ".join(process.args),
-                "shader_id": shader.id,
-            },
-        )
-    else:
-        Monitor(shader.context.config).info(
-            event=Event.OPTIMIZER_SUCCESS, extra={"shader_id": shader.id}
-        )
 
-    return process.returncode == 0
+def validate_spv_bytes(
+    spirv_bytes: bytes, pool: Optional[ToolPool] = None
+) -> SubprocessResult:
+    pool = pool or get_tool_pool()
+    return to_subprocess_result(pool.run(validator_args(), spirv_bytes))
 
 
 class AmberBufferType(Enum):
@@ -345,7 +378,7 @@ def create_amber_file(shader: SPIRVShader, filename: str) -> None:
             ),
         )
     )
-    random.seed(len(shader.opcodes))
+    rng = random.Random(len(shader.opcodes))
     for i, interface in enumerate(shader_interfaces):
         amber_struct_members = []
         for j, member in enumerate(interface.type.type.types):
@@ -355,7 +388,7 @@ def create_amber_file(shader: SPIRVShader, filename: str) -> None:
                         AmberStructMember(
                             f"var{j}",
                             AmberBufferType.INT32,
-                            random.randint(-64, 64),
+                            rng.randint(-64, 64),
                         )
                     )
                 case OpTypeInt():
@@ -363,7 +396,7 @@ def create_amber_file(shader: SPIRVShader, filename: str) -> None:
                         AmberStructMember(
                             f"var{j}",
                             AmberBufferType.UINT32,
-                            random.randint(0, 128),
+                            rng.randint(0, 128),
                         )
                     )
                 case OpTypeFloat():
@@ -371,7 +404,7 @@ def create_amber_file(shader: SPIRVShader, filename: str) -> None:
                         AmberStructMember(
                             f"var{j}",
                             AmberBufferType.FLOAT,
-                            random.uniform(-64, 64),
+                            rng.uniform(-64, 64),
                         )
                     )
                 case _:
@@ -400,12 +433,8 @@ def create_amber_file(shader: SPIRVShader, filename: str) -> None:
         fw.write(
             f"SHADER compute {'shader'} SPIRV-ASM TARGET_ENV {TARGET_SPIRV_VERSION}\n"
         )
-        with tempfile.NamedTemporaryFile(suffix=".spasm") as fr:
-            shader.generate_assembly_file(fr.name)
-            lines = fr.readlines()
-            for line in lines:
-                fw.write(line.decode("utf-8"))
-            fw.write("\nEND\n")
+        shader.write_assembly(fw)
+        fw.write("\nEND\n")
         for struct in struct_declarations:
             fw.write(f"{struct.to_amberscript()}\n")
         for buffer in buffers:
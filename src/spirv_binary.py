@@ -0,0 +1,474 @@
+import inspect
+import struct
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from src import Constant
+from src import OpCode
+from src import Type
+from src import VoidOp
+from src.constants import OpConstant
+from src.extension import OpExtInstImport
+from src.function import OpLabel
+from src.types.concrete_types import OpTypeFloat
+from src.types.concrete_types import OpTypeInt
+
+if TYPE_CHECKING:
+    from src.context import Context
+    from src.shader_utils import SPIRVShader
+
+MAGIC_NUMBER = 0x07230203
+# SPIR-V 1.3, see TARGET_SPIRV_VERSION
+VERSION = 0x00010300
+GENERATOR = 0x00220001
+SCHEMA = 0
+
+OPCODES: dict[str, int] = {
+    "OpNop": 0,
+    "OpUndef": 1,
+    "OpExtension": 10,
+    "OpExtInstImport": 11,
+    "OpExtInst": 12,
+    "OpMemoryModel": 14,
+    "OpEntryPoint": 15,
+    "OpExecutionMode": 16,
+    "OpCapability": 17,
+    "OpTypeVoid": 19,
+    "OpTypeBool": 20,
+    "OpTypeInt": 21,
+    "OpTypeFloat": 22,
+    "OpTypeVector": 23,
+    "OpTypeMatrix": 24,
+    "OpTypeArray": 28,
+    "OpTypeStruct": 30,
+    "OpTypePointer": 32,
+    "OpTypeFunction": 33,
+    "OpConstantTrue": 41,
+    "OpConstantFalse": 42,
+    "OpConstant": 43,
+    "OpConstantComposite": 44,
+    "OpFunction": 54,
+    "OpFunctionParameter": 55,
+    "OpFunctionEnd": 56,
+    "OpFunctionCall": 57,
+    "OpVariable": 59,
+    "OpLoad": 61,
+    "OpStore": 62,
+    "OpAccessChain": 65,
+    "OpInBoundsAccessChain": 66,
+    "OpDecorate": 71,
+    "OpMemberDecorate": 72,
+    "OpVectorExtractDynamic": 77,
+    "OpVectorInsertDynamic": 78,
+    "OpVectorShuffle": 79,
+    "OpCompositeExtract": 81,
+    "OpCompositeInsert": 82,
+    "OpCopyObject": 83,
+    "OpTranspose": 84,
+    "OpConvertFToU": 109,
+    "OpConvertFToS": 110,
+    "OpConvertSToF": 111,
+    "OpConvertUToF": 112,
+    "OpSNegate": 126,
+    "OpFNegate": 127,
+    "OpIAdd": 128,
+    "OpFAdd": 129,
+    "OpISub": 130,
+    "OpFSub": 131,
+    "OpIMul": 132,
+    "OpFMul": 133,
+    "OpUDiv": 134,
+    "OpSDiv": 135,
+    "OpFDiv": 136,
+    "OpUMod": 137,
+    "OpSRem": 138,
+    "OpSMod": 139,
+    "OpFRem": 140,
+    "OpFMod": 141,
+    "OpVectorTimesScalar": 142,
+    "OpMatrixTimesScalar": 143,
+    "OpVectorTimesMatrix": 144,
+    "OpMatrixTimesVector": 145,
+    "OpMatrixTimesMatrix": 146,
+    "OpOuterProduct": 147,
+    "OpDot": 148,
+    "OpAny": 154,
+    "OpAll": 155,
+    "OpIsNan": 156,
+    "OpIsInf": 157,
+    "OpLogicalEqual": 164,
+    "OpLogicalNotEqual": 165,
+    "OpLogicalOr": 166,
+    "OpLogicalAnd": 167,
+    "OpLogicalNot": 168,
+    "OpIEqual": 170,
+    "OpINotEqual": 171,
+    "OpUGreaterThan": 172,
+    "OpSGreaterThan": 173,
+    "OpUGreaterThanEqual": 174,
+    "OpSGreaterThanEqual": 175,
+    "OpULessThan": 176,
+    "OpSLessThan": 177,
+    "OpULessThanEqual": 178,
+    "OpSLessThanEqual": 179,
+    "OpFOrdEqual": 180,
+    "OpFUnordEqual": 181,
+    "OpFOrdNotEqual": 182,
+    "OpFUnordNotEqual": 183,
+    "OpFOrdLessThan": 184,
+    "OpFUnordLessThan": 185,
+    "OpFOrdGreaterThan": 186,
+    "OpFUnordGreaterThan": 187,
+    "OpFOrdLessThanEqual": 188,
+    "OpFUnordLessThanEqual": 189,
+    "OpFOrdGreaterThanEqual": 190,
+    "OpFUnordGreaterThanEqual": 191,
+    "OpShiftRightLogical": 194,
+    "OpShiftRightArithmetic": 195,
+    "OpShiftLeftLogical": 196,
+    "OpBitwiseOr": 197,
+    "OpBitwiseXor": 198,
+    "OpBitwiseAnd": 199,
+    "OpNot": 200,
+    "OpBitCount": 205,
+    "OpLoopMerge": 246,
+    "OpSelectionMerge": 247,
+    "OpLabel": 248,
+    "OpBranch": 249,
+    "OpBranchConditional": 250,
+    "OpReturn": 253,
+    "OpSizeOf": 321,
+}
+
+GLSL_STD_450: dict[str, int] = {
+    "Round": 1,
+    "RoundEven": 2,
+    "Trunc": 3,
+    "FAbs": 4,
+    "SAbs": 5,
+    "FSign": 6,
+    "SSign": 7,
+    "Floor": 8,
+    "Ceil": 9,
+    "Fract": 10,
+    "Radians": 11,
+    "Degrees": 12,
+    "Sin": 13,
+    "Cos": 14,
+    "Tan": 15,
+    "Asin": 16,
+    "Acos": 17,
+    "Atan": 18,
+    "Sinh": 19,
+    "Cosh": 20,
+    "Tanh": 21,
+    "Asinh": 22,
+    "Acosh": 23,
+    "Atanh": 24,
+    "Atan2": 25,
+    "Pow": 26,
+    "Exp": 27,
+    "Log": 28,
+    "Exp2": 29,
+    "Log2": 30,
+    "Sqrt": 31,
+    "InverseSqrt": 32,
+    "Determinant": 33,
+    "MatrixInverse": 34,
+    "Modf": 35,
+    "ModfStruct": 36,
+    "FMin": 37,
+    "UMin": 38,
+    "SMin": 39,
+    "FMax": 40,
+    "UMax": 41,
+    "SMax": 42,
+    "FClamp": 43,
+    "UClamp": 44,
+    "SClamp": 45,
+    "FMix": 46,
+    "IMix": 47,
+    "Step": 48,
+    "SmoothStep": 49,
+    "Fma": 50,
+    "Frexp": 51,
+    "FrexpStruct": 52,
+    "Ldexp": 53,
+    "Length": 66,
+    "Distance": 67,
+    "Cross": 68,
+    "Normalize": 69,
+    "FaceForward": 70,
+    "Reflect": 71,
+    "Refract": 72,
+    "FindILsb": 73,
+    "FindSMsb": 74,
+    "FindUMsb": 75,
+    "NMin": 79,
+    "NMax": 80,
+    "NClamp": 81,
+}
+
+# Enumerants are looked up by the name of their enum and their assembly spelling
+ENUMS: dict[str, dict[str, int]] = {
+    "AddressingModel": {
+        "Logical": 0,
+        "Physical32": 1,
+        "Physical64": 2,
+        "PhysicalStorageBuffer64": 5348,
+    },
+    "MemoryModel": {
+        "Simple": 0,
+        "GLSL450": 1,
+        "OpenCL": 2,
+        "Vulkan": 3,
+    },
+    "ExecutionModel": {
+        "Vertex": 0,
+        "TessellationControl": 1,
+        "TessellationEvaluation": 2,
+        "Geometry": 3,
+        "Fragment": 4,
+        "GLCompute": 5,
+        "Kernel": 6,
+    },
+    "ExecutionMode": {
+        "Invocations": 0,
+        "SpacingEqual": 1,
+        "SpacingFractionalEven": 2,
+        "SpacingFractionalOdd": 3,
+        "VertexOrderCw": 4,
+        "VertexOrderCcw": 5,
+        "PixelCenterInteger": 6,
+        "OriginUpperLeft": 7,
+        "OriginLowerLeft": 8,
+        "EarlyFragmentTests": 9,
+        "PointMode": 10,
+        "Xfb": 11,
+        "DepthReplacing": 12,
+        "DepthGreater": 14,
+        "DepthLess": 15,
+        "DepthUnchanged": 16,
+        "LocalSize": 17,
+        "LocalSizeHint": 18,
+    },
+    "StorageClass": {
+        "UniformConstant": 0,
+        "Input": 1,
+        "Uniform": 2,
+        "Output": 3,
+        "Workgroup": 4,
+        "CrossWorkgroup": 5,
+        "Private": 6,
+        "Function": 7,
+        "Generic": 8,
+        "PushConstant": 9,
+        "AtomicCounter": 10,
+        "Image": 11,
+        "StorageBuffer": 12,
+    },
+    "Decoration": {
+        "RelaxedPrecision": 0,
+        "SpecId": 1,
+        "Block": 2,
+        "BufferBlock": 3,
+        "RowMajor": 4,
+        "ColMajor": 5,
+        "ArrayStride": 6,
+        "MatrixStride": 7,
+        "GLSLShared": 8,
+        "GLSLPacked": 9,
+        "CPacked": 10,
+        "BuiltIn": 11,
+        "NoPerspective": 13,
+        "Flat": 14,
+        "Patch": 15,
+        "Centroid": 16,
+        "Sample": 17,
+        "Invariant": 18,
+        "Restrict": 19,
+        "Aliased": 20,
+        "Volatile": 21,
+        "Constant": 22,
+        "Coherent": 23,
+        "NonWritable": 24,
+        "NonReadable": 25,
+        "Uniform": 26,
+        "Location": 30,
+        "Component": 31,
+        "Index": 32,
+        "Binding": 33,
+        "DescriptorSet": 34,
+        "Offset": 35,
+        "NoContraction": 42,
+        "Alignment": 44,
+    },
+    "Capability": {
+        "Matrix": 0,
+        "Shader": 1,
+        "Geometry": 2,
+        "Tessellation": 3,
+        "Addresses": 4,
+        "Linkage": 5,
+        "Kernel": 6,
+        "Vector16": 7,
+        "Float16Buffer": 8,
+        "Float16": 9,
+        "Float64": 10,
+        "Int64": 11,
+        "Int64Atomics": 12,
+        "Int16": 22,
+        "GenericPointer": 38,
+        "Int8": 39,
+        "VariablePointersStorageBuffer": 4441,
+        "VariablePointers": 4442,
+    },
+    "FunctionControlMask": {
+        "None": 0,
+        "NONE": 0,
+        "Inline": 0x1,
+        "DontInline": 0x2,
+        "Pure": 0x4,
+        "Const": 0x8,
+        "OptNoneINTEL": 0x10000,
+    },
+    "SelectionControlMask": {
+        "None": 0,
+        "NONE": 0,
+        "Flatten": 0x1,
+        "DontFlatten": 0x2,
+    },
+    "LoopControlMask": {
+        "None": 0,
+        "NONE": 0,
+        "Unroll": 0x1,
+        "DontUnroll": 0x2,
+    },
+}
+
+
+class SPIRVEncodingError(Exception):
+    ...
+
+
+def encode_string(string: str) -> list[int]:
+    # Nul-terminated UTF-8, padded to a word boundary
+    encoded: bytes = string.encode("utf-8") + b"\0"
+    encoded += b"\0" * (-len(encoded) % 4)
+    return list(struct.unpack(f"<{len(encoded) // 4}I", encoded))
+
+
+def encode_integer(value: int, width: int = 32, signed: bool = True) -> list[int]:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise SPIRVEncodingError(f"Cannot encode {value!r} as an integer literal")
+    lower_bound: int = -(1 << (width - 1)) if signed else 0
+    if not lower_bound <= value < (1 << width):
+        raise SPIRVEncodingError(f"{value} does not fit in {width} bits")
+    # Narrower literals are sign-extended to a full word, wider ones are
+    # stored low-order word first
+    width = max(width, 32)
+    value &= (1 << width) - 1
+    return [(value >> shift) & 0xFFFFFFFF for shift in range(0, width, 32)]
+
+
+def encode_float(value: float, width: int = 32) -> list[int]:
+    try:
+        match width:
+            case 16:
+                return [struct.unpack("<H", struct.pack("<e", value))[0]]
+            case 32:
+                return [struct.unpack("<I", struct.pack("<f", value))[0]]
+            case 64:
+                return list(struct.unpack("<2I", struct.pack("<d", value)))
+    except (OverflowError, struct.error) as e:
+        raise SPIRVEncodingError(str(e))
+    raise SPIRVEncodingError(f"Unsupported float width: {width}")
+
+
+def encode_constant_value(constant: OpConstant) -> list[int]:
+    match constant.type:
+        case OpTypeFloat():
+            return encode_float(float(constant.value), constant.type.width)
+        case OpTypeInt():
+            return encode_integer(
+                constant.value, constant.type.width, bool(constant.type.signed)
+            )
+    raise SPIRVEncodingError(f"Unsupported constant type: {constant.type}")
+
+
+def encode_enum(attr: Enum) -> int:
+    try:
+        values: dict[str, int] = ENUMS[attr.__class__.__name__]
+        mask: int = 0
+        for name in str(attr).split("|"):
+            mask |= values[name]
+        return mask
+    except KeyError:
+        raise SPIRVEncodingError(f"Unknown enumerant: {attr.__class__.__name__}.{attr}")
+
+
+def encode_attribute(attr, context: "Context") -> list[int]:
+    # Mirrors OpCode.resolve_attribute_spasm
+    if (
+        attr.__class__.__name__ == "Context"
+        or attr is None
+        or attr.__class__.__name__ == "EmptyType"
+    ):
+        return []
+    elif inspect.isclass(attr) and issubclass(attr, OpCode):
+        try:
+            return [GLSL_STD_450[attr.__name__]]
+        except KeyError:
+            raise SPIRVEncodingError(f"Unknown extended instruction: {attr.__name__}")
+    elif isinstance(attr, OpCode):
+        if isinstance(attr, (Type, Constant)):
+            return [context.globals[attr]]
+        return [attr.id]
+    elif isinstance(attr, Enum):
+        return [encode_enum(attr)]
+    elif isinstance(attr, str):
+        return encode_string(attr)
+    return encode_integer(attr)
+
+
+def encode_opcode(opcode: OpCode, context: "Context") -> list[int]:
+    try:
+        opcode_number: int = OPCODES[opcode.__class__.__name__]
+    except KeyError:
+        raise SPIRVEncodingError(f"Unknown opcode: {opcode.__class__.__name__}")
+    operands: list[int] = []
+    for attr_name in opcode.members():
+        attr = getattr(opcode, attr_name)
+        if isinstance(opcode, OpConstant) and attr_name == "value":
+            operands += encode_constant_value(opcode)
+        elif isinstance(attr, (tuple, list)):
+            for _attr in attr:
+                operands += encode_attribute(_attr, context)
+        else:
+            operands += encode_attribute(attr, context)
+    # The assembly puts the result id first, the binary form puts it after
+    # the result type of the instructions that have one
+    if isinstance(opcode, VoidOp):
+        words: list[int] = operands
+    elif isinstance(opcode, (Type, OpLabel, OpExtInstImport)):
+        words = [opcode.id, *operands]
+    elif operands:
+        words = [operands[0], opcode.id, *operands[1:]]
+    else:
+        raise SPIRVEncodingError(f"{opcode.__class__.__name__} has no result type")
+    return [(len(words) + 1) << 16 | opcode_number, *words]
+
+
+def encode_shader(shader: "SPIRVShader") -> bytes:
+    """
+    Encodes a shader in the SPIR-V binary format, instruction for instruction
+    in the same order as SPIRVShader.iter_assembly.
+
+    Raises a SPIRVEncodingError if the shader contains something that the
+    encoder does not know about, in which case the assembly can still be
+    assembled with spirv-as.
+    """
+    words: list[int] = [MAGIC_NUMBER, VERSION, GENERATOR, shader.get_bound(), SCHEMA]
+    for opcode in shader.iter_instructions():
+        words += encode_opcode(opcode, shader.context)
+    return struct.pack(f"<{len(words)}I", *words)
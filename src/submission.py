@@ -0,0 +1,291 @@
+import gzip
+import http.client
+import itertools
+import json
+import os
+import threading
+import time
+from enum import Enum
+from typing import Callable
+from typing import Optional
+from typing import Protocol
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from src.monitor import Event
+from src.monitor import Monitor
+
+if TYPE_CHECKING:
+    from run import SPIRVSmithConfig
+    from spirvsmith_server_client import Client
+
+# Statuses worth retrying, anything else in the 4xx range means the shader
+# itself is at fault and will never be accepted.
+RETRYABLE_STATUSES: set[int] = {408, 425, 429, 500, 502, 503, 504}
+
+
+class SubmissionError(Exception):
+    def __init__(
+        self,
+        reason: str,
+        retryable: bool = True,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(reason)
+        self.retryable: bool = retryable
+        self.retry_after: Optional[float] = retry_after
+
+
+def check_status(status: int, retry_after: Optional[str]) -> None:
+    if status < 300:
+        return
+    if status in RETRYABLE_STATUSES:
+        raise SubmissionError(
+            f"HTTP {status}",
+            retry_after=(
+                float(retry_after) if retry_after and retry_after.isdigit() else None
+            ),
+        )
+    raise SubmissionError(f"HTTP {status}", retryable=False)
+
+
+class Transport(Protocol):
+    def post(self, submission: dict) -> None:
+        """
+        Submits a single shader, raises SubmissionError if it was not accepted.
+        """
+
+    def close(self) -> None:
+        ...
+
+
+class HTTPTransport:
+    """
+    Posts each shader as JSON to `url` over one keep-alive connection.
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0) -> None:
+        split_url = urlsplit(url)
+        self.connection_class: type[http.client.HTTPConnection] = (
+            http.client.HTTPSConnection
+            if split_url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self.netloc: str = split_url.netloc
+        self.path: str = split_url.path or "/"
+        self.timeout: float = timeout
+        self.connection: Optional[http.client.HTTPConnection] = None
+
+    def post(self, submission: dict) -> None:
+        if self.connection is None:
+            self.connection = self.connection_class(self.netloc, timeout=self.timeout)
+        try:
+            self.connection.request(
+                "POST",
+                self.path,
+                body=json.dumps(submission).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+            )
+            response: http.client.HTTPResponse = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException) as e:
+            # The server may have dropped the keep-alive connection
+            self.close()
+            raise SubmissionError(repr(e))
+        check_status(response.status, response.getheader("Retry-After"))
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class ApiClientTransport:
+    """
+    Posts each shader through the submit endpoint of the server API client.
+
+    The generated client opens a new connection for every call, use
+    HTTPTransport on the endpoint URL to keep one alive.
+    """
+
+    def __init__(self, client: "Client") -> None:
+        # Imported here, only needed when broadcasting shaders
+        import httpx
+        from spirvsmith_server_client.api.shaders import submit_shader
+        from spirvsmith_server_client.models import ShaderSubmission
+
+        self.client: "Client" = client
+        self.errors: tuple[type[Exception], ...] = (httpx.HTTPError, OSError)
+        self.submit_shader = submit_shader
+        self.submission_class: type[ShaderSubmission] = ShaderSubmission
+
+    def post(self, submission: dict) -> None:
+        try:
+            response = self.submit_shader.sync_detailed(
+                client=self.client,
+                json_body=self.submission_class.from_dict(submission),
+            )
+        except self.errors as e:
+            raise SubmissionError(repr(e))
+        check_status(response.status_code, response.headers.get("Retry-After"))
+
+    def close(self) -> None:
+        pass
+
+
+class Delivery(Enum):
+    DELIVERED = "DELIVERED"
+    # The server will never accept the shader
+    REJECTED = "REJECTED"
+    # The server could not be reached, the shader may be accepted later
+    FAILED = "FAILED"
+
+
+class ShaderSubmitter:
+    """
+    Submits shaders to the server, one post per shader.
+
+    Every thread calling `submit` gets its own transport from
+    `create_transport`, so each keeps its connection alive and no thread
+    waits on another one's network I/O.
+
+    Failed posts are retried with exponential backoff, which blocks the
+    calling thread and so pushes back on whoever produces the shaders. Once
+    a shader could not be delivered, the server is considered unavailable
+    for as long as a full round of retries would last: shaders are spooled
+    to `spool_folder` right away meanwhile. Spooled shaders are sent again
+    after the next successful post. Shaders the server rejects are kept
+    there, in `.rejected` files, for inspection.
+    """
+
+    def __init__(
+        self,
+        create_transport: Callable[[], Transport],
+        spool_folder: str,
+        max_retries: int = 4,
+        backoff: float = 0.5,
+        config: Optional["SPIRVSmithConfig"] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.create_transport: Callable[[], Transport] = create_transport
+        self.spool_folder: str = spool_folder
+        self.max_retries: int = max_retries
+        self.backoff: float = backoff
+        self.config: Optional["SPIRVSmithConfig"] = config
+        self.sleep: Callable[[float], None] = sleep
+        self.local = threading.local()
+        self.transports: list[Transport] = []
+        self.transports_lock = threading.Lock()
+        # Held by whichever thread resubmits the spool, the others skip it
+        self.spool_lock = threading.Lock()
+        self.spool_counter = itertools.count()
+        self.unavailable_until: float = 0.0
+
+    def get_transport(self) -> Transport:
+        transport: Optional[Transport] = getattr(self.local, "transport", None)
+        if transport is None:
+            transport = self.local.transport = self.create_transport()
+            with self.transports_lock:
+                self.transports.append(transport)
+        return transport
+
+    def submit(self, submission: dict) -> None:
+        if time.monotonic() < self.unavailable_until:
+            self._report_spooled([submission], self._spool([submission]))
+            return
+        match self._post_with_retries(submission):
+            case Delivery.DELIVERED:
+                Monitor(self.config).info(
+                    event=Event.SUBMISSION_SUCCESS,
+                    extra={"shader_id": submission.get("shader_id")},
+                )
+                self._resubmit_spooled()
+            case Delivery.REJECTED:
+                self._report_spooled(
+                    [submission], self._spool([submission], ".rejected")
+                )
+            case Delivery.FAILED:
+                # Retrying would only last as long again, spool until then
+                self.unavailable_until = (
+                    time.monotonic() + self.backoff * 2**self.max_retries
+                )
+                self._report_spooled([submission], self._spool([submission]))
+
+    def close(self) -> None:
+        with self.transports_lock:
+            for transport in self.transports:
+                transport.close()
+            self.transports = []
+
+    def _report_spooled(self, submissions: list[dict], spool_path: str) -> None:
+        Monitor(self.config).error(
+            event=Event.SUBMISSION_SPOOLED,
+            extra={"n_shaders": len(submissions), "spool_path": spool_path},
+        )
+
+    def _post_with_retries(self, submission: dict) -> Delivery:
+        transport: Transport = self.get_transport()
+        for attempt in range(self.max_retries + 1):
+            try:
+                transport.post(submission)
+                return Delivery.DELIVERED
+            except SubmissionError as e:
+                if not e.retryable:
+                    return Delivery.REJECTED
+                if attempt == self.max_retries:
+                    return Delivery.FAILED
+                delay: float = self.backoff * 2**attempt
+                if e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+                Monitor(self.config).warning(
+                    event=Event.SUBMISSION_RETRY,
+                    extra={"reason": str(e), "attempt": attempt + 1, "delay": delay},
+                )
+                self.sleep(delay)
+        return Delivery.FAILED
+
+    def _spool(self, submissions: list[dict], suffix: str = "") -> str:
+        os.makedirs(self.spool_folder, exist_ok=True)
+        spool_path: str = os.path.join(
+            self.spool_folder,
+            f"{time.time_ns()}-{next(self.spool_counter)}.json.gz{suffix}",
+        )
+        with open(f"{spool_path}.tmp", "wb") as f:
+            f.write(gzip.compress(json.dumps(submissions).encode("utf-8")))
+        os.replace(f"{spool_path}.tmp", spool_path)
+        return spool_path
+
+    def _resubmit_spooled(self) -> None:
+        if not os.path.isdir(self.spool_folder):
+            return
+        if not self.spool_lock.acquire(blocking=False):
+            return
+        try:
+            self._drain_spool()
+        finally:
+            self.spool_lock.release()
+
+    def _drain_spool(self) -> None:
+        transport: Transport = self.get_transport()
+        for filename in sorted(os.listdir(self.spool_folder)):
+            if not filename.endswith(".json.gz"):
+                continue
+            spool_path: str = os.path.join(self.spool_folder, filename)
+            with open(spool_path, "rb") as f:
+                submissions: list[dict] = json.loads(gzip.decompress(f.read()))
+            rejected: list[dict] = []
+            for i, submission in enumerate(submissions):
+                try:
+                    transport.post(submission)
+                except SubmissionError as e:
+                    if e.retryable:
+                        # Still unavailable, try again after the next successful post
+                        self._spool(submissions[i:])
+                        os.remove(spool_path)
+                        if rejected:
+                            self._spool(rejected, ".rejected")
+                        return
+                    rejected.append(submission)
+            os.remove(spool_path)
+            if rejected:
+                self._spool(rejected, ".rejected")
@@ -0,0 +1,92 @@
+import os
+import subprocess
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from src.utils import SubprocessResult
+
+
+def run_tool(
+    args: list[str], input: Optional[bytes] = None
+) -> subprocess.CompletedProcess:
+    """
+    Runs a SPIRV-Tools binary, piping `input` to its stdin.
+
+    The binaries read their module from stdin when given "-" as input file
+    and write to stdout when given "-o -", so no temporary file is needed.
+    """
+    return subprocess.run(args, input=input, capture_output=True)
+
+
+def to_subprocess_result(process: subprocess.CompletedProcess) -> SubprocessResult:
+    return SubprocessResult(
+        process.returncode,
+        process.stdout.decode("utf-8", errors="replace"),
+        process.stderr.decode("utf-8", errors="replace"),
+        " ".join(process.args),
+    )
+
+
+class ToolPool:
+    """
+    Bounded pool of threads running SPIRV-Tools binaries.
+
+    The tools have no server mode, so every job still spawns a process, but
+    modules go through pipes instead of temporary files and the waiting
+    happens off the calling thread. Submitting a batch keeps `size` tool
+    processes busy at all times.
+    """
+
+    def __init__(self, size: Optional[int] = None) -> None:
+        self.size: int = size or os.cpu_count() or 1
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=self.size, thread_name_prefix="spirv-tools"
+        )
+
+    def submit(
+        self, args: list[str], input: Optional[bytes] = None
+    ) -> Future[subprocess.CompletedProcess]:
+        return self.executor.submit(run_tool, args, input)
+
+    def run(
+        self, args: list[str], input: Optional[bytes] = None
+    ) -> subprocess.CompletedProcess:
+        return self.submit(args, input).result()
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+TOOL_POOL: Optional[ToolPool] = None
+TOOL_POOL_LOCK = threading.Lock()
+
+
+def get_tool_pool(size: Optional[int] = None) -> ToolPool:
+    """
+    Process-wide tool pool, created with `size` workers on first use.
+
+    Later calls share that pool: a `size` of None accepts it whatever its
+    size, any other size must match it.
+    """
+    global TOOL_POOL
+    with TOOL_POOL_LOCK:
+        if TOOL_POOL is None:
+            TOOL_POOL = ToolPool(size)
+        elif size is not None and size != TOOL_POOL.size:
+            raise ValueError(
+                f"Tool pool already running with {TOOL_POOL.size} workers, "
+                f"cannot resize it to {size}"
+            )
+        return TOOL_POOL
+
+
+def _reset_tool_pool() -> None:
+    # Threads do not survive a fork, the child builds its own pool on demand
+    global TOOL_POOL, TOOL_POOL_LOCK
+    TOOL_POOL = None
+    TOOL_POOL_LOCK = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_tool_pool)
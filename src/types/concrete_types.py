@@ -1,4 +1,3 @@
-import random
 from dataclasses import field
 from typing import NoReturn
 from typing import TYPE_CHECKING
@@ -52,8 +51,8 @@ class OpTypeInt(ScalarType):
     signed: int
 
     @classmethod
-    def fuzz(cls, _: "Context") -> FuzzResult[Self]:
-        return FuzzResult(cls(width=2**5, signed=int(bool(random.getrandbits(1)))))
+    def fuzz(cls, context: "Context") -> FuzzResult[Self]:
+        return FuzzResult(cls(width=2**5, signed=context.rng.getrandbits(1)))
 
     def get_base_type(self):
         return self
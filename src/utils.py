@@ -1,14 +1,22 @@
+import hashlib
+import importlib
+import json
 import os
 import random
+import tempfile
+from collections.abc import Mapping
 from dataclasses import dataclass
+from functools import lru_cache
+from inspect import isclass
+from typing import Iterator
+from typing import Optional
 from typing import TYPE_CHECKING
 
-import git
-
 if TYPE_CHECKING:
     from run import SPIRVSmithConfig
 
 from src import OpCode
+from src.rng import get_process_rng
 
 # Lowest common denominator to allow testing with MoltenVK
 TARGET_VULKAN_VERSION = "1.1"
@@ -23,39 +31,165 @@ class SubprocessResult:
     executed_command: str
 
 
-def get_spirvsmith_version() -> str:
+def derive_shader_seed(root_seed: int, index: int) -> int:
+    """
+    64-bit seed of the index-th shader of a run started from `root_seed`.
+    """
+    digest: bytes = hashlib.blake2b(
+        f"{root_seed}:{index}".encode(), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "little")
+
+
+# Every module defining concrete opcodes, imported to build the opcode registry
+OPCODE_MODULES: tuple[str, ...] = (
+    "src.operators.arithmetic.scalar_arithmetic",
+    "src.operators.arithmetic.linear_algebra",
+    "src.operators.bitwise",
+    "src.operators.composite",
+    "src.operators.conversions",
+    "src.operators.logic",
+    "src.operators.memory.memory_access",
+    "src.operators.memory.variable",
+    "src.operators.arithmetic.glsl",
+    "src.annotations",
+    "src.constants",
+    "src.extension",
+    "src.function",
+    "src.misc",
+)
+
+SOURCE_FOLDER: str = os.path.dirname(os.path.abspath(__file__))
+CACHE_FOLDER: str = os.path.join(SOURCE_FOLDER, "__pycache__")
+
+
+def find_subclasses(cls: type[OpCode], classes: dict[str, type[OpCode]]) -> None:
+    for subclass in cls.__subclasses__():
+        classes[subclass.__name__] = subclass
+        find_subclasses(subclass, classes)
+
+
+@lru_cache(maxsize=None)
+def get_source_hash() -> str:
+    """
+    Hash of every source file of the package, changes whenever an opcode
+    could have been added, removed or moved.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(SOURCE_FOLDER):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for file in sorted(f for f in files if f.endswith(".py")):
+            path: str = os.path.join(root, file)
+            digest.update(os.path.relpath(path, SOURCE_FOLDER).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def write_cache_file(cache_folder: str, cache_path: str, content: str) -> None:
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=cache_folder, delete=False) as f:
+            f.write(content)
+        os.replace(f.name, cache_path)
+    except OSError:
+        # Read-only checkout, the cache is rebuilt in every process
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_spirvsmith_version(cache_folder: str = CACHE_FOLDER) -> str:
+    """
+    Name of the latest tag of the repository.
+
+    Looking it up through git is slow, so it is cached on disk next to the
+    opcode registry, keyed by the same hash of the sources.
+    """
     if os.getenv("CI"):
         return "CI"
+    cache_path: str = os.path.join(cache_folder, f"version-{get_source_hash()}.txt")
+    try:
+        with open(cache_path) as f:
+            return f.read()
+    except OSError:
+        pass
+    # Imported here, GitPython is only needed when the cache is missing
+    import git
+
     repo: git.Repo = git.Repo(os.getcwd())
     tags: list[git.TagReference] = sorted(
         filter(None, repo.tags), key=lambda t: t.commit.committed_datetime
     )
-    return tags[-1].name
+    version: str = tags[-1].name
+    write_cache_file(cache_folder, cache_path, version)
+    return version
 
 
-def find_subclasses(cls: type[OpCode]) -> None:
-    for subclass in cls.__subclasses__():
-        CLASSES[subclass.__name__] = subclass
-        find_subclasses(subclass)
+class OpcodeRegistry(Mapping[str, type[OpCode]]):
+    """
+    Opcode classes by name, loaded on demand.
+
+    Finding every opcode means importing every module defining one. The name
+    of the module defining each opcode is instead cached on disk, keyed by
+    the hash of the sources, so that a lookup only imports the module it
+    needs. The cache is rebuilt from the subclasses of OpCode whenever the
+    sources change.
+    """
+
+    def __init__(self, cache_folder: str = CACHE_FOLDER):
+        self.cache_folder: str = cache_folder
+        self.modules: Optional[dict[str, str]] = None
+        self.classes: dict[str, type[OpCode]] = {}
+
+    def get_cache_path(self) -> str:
+        return os.path.join(
+            self.cache_folder, f"opcode_registry-{get_source_hash()}.json"
+        )
+
+    def build(self) -> dict[str, str]:
+        for module in OPCODE_MODULES:
+            importlib.import_module(module)
+        classes: dict[str, type[OpCode]] = {}
+        find_subclasses(OpCode, classes)
+        self.classes = classes
+        return {name: cls.__module__ for name, cls in classes.items()}
+
+    def load(self) -> dict[str, str]:
+        if self.modules is not None:
+            return self.modules
+        cache_path: str = self.get_cache_path()
+        try:
+            with open(cache_path) as f:
+                self.modules = json.load(f)
+        except (OSError, ValueError):
+            self.modules = self.build()
+            write_cache_file(self.cache_folder, cache_path, json.dumps(self.modules))
+        return self.modules
+
+    def __getitem__(self, name: str) -> type[OpCode]:
+        try:
+            return self.classes[name]
+        except KeyError:
+            pass
+        module: str = self.load()[name]
+        cls: Optional[type[OpCode]] = getattr(
+            importlib.import_module(module), name, None
+        )
+        if not (isclass(cls) and issubclass(cls, OpCode)):
+            # Not reachable from its module, the cache cannot resolve it
+            self.modules = self.build()
+            cls = self.classes[name]
+        self.classes[name] = cls
+        return cls
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.load())
 
+    def __len__(self) -> int:
+        return len(self.load())
 
-import src.operators.arithmetic.scalar_arithmetic
-import src.operators.arithmetic.linear_algebra
-import src.operators.bitwise
-import src.operators.composite
-import src.operators.conversions
-import src.operators.logic
-import src.operators.memory.memory_access
-import src.operators.memory.variable
-import src.operators.arithmetic.glsl
-import src.annotations
-import src.constants
-import src.extension
-import src.function
-import src.misc
 
-CLASSES: dict[str, type[OpCode]] = {}
-find_subclasses(OpCode)
+CLASSES: OpcodeRegistry = OpcodeRegistry()
 
 
 def mutate_config(config: "SPIRVSmithConfig") -> None:
@@ -71,7 +205,8 @@ def mutate_config(config: "SPIRVSmithConfig") -> None:
             "p_picking_statement_operand",
         }
     ]
-    mutation_target: str = random.SystemRandom().choice(mutable_fields)
-    config.strategy[mutation_target] = random.SystemRandom().randint(
+    rng: random.Random = get_process_rng()
+    mutation_target: str = rng.choice(mutable_fields)
+    config.strategy[mutation_target] = rng.randint(
         *config.strategy.mutations_config[mutation_target].values()
     )
@@ -1,6 +1,8 @@
 import logging
+import unittest
 from typing import TYPE_CHECKING
 
+from src import ID_ALLOCATOR
 from src import Type
 from src.constants import OpConstant
 from src.constants import OpConstantComposite
@@ -13,6 +15,12 @@ from src.types.concrete_types import OpTypeVector
 logging.disable(logging.CRITICAL)
 
 
+def activate_id_allocator(test: unittest.TestCase, context: "Context") -> None:
+    # Opcodes created by the test get their ids from the shader of `context`
+    token = ID_ALLOCATOR.set(context.id_allocator)
+    test.addCleanup(ID_ALLOCATOR.reset, token)
+
+
 def create_vector_const(
     context: "Context", inner_type: Type, size: int = 4, value: int = 42
 ) -> OpConstant:
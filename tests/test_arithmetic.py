@@ -5,16 +5,22 @@ from omegaconf import OmegaConf
 from spirv_enums import ExecutionModel
 
 from run import SPIRVSmithConfig
-from src import FuzzDelegator
 from src.constants import OpConstant
 from src.context import Context
 from src.monitor import Monitor
+from src.operators.arithmetic.glsl import SMin
 from src.operators.arithmetic.linear_algebra import OpMatrixTimesMatrix
 from src.operators.arithmetic.linear_algebra import OpMatrixTimesVector
 from src.operators.arithmetic.linear_algebra import OpOuterProduct
 from src.operators.arithmetic.linear_algebra import OpVectorTimesMatrix
 from src.operators.arithmetic.linear_algebra import OpVectorTimesScalar
+from src.operators.arithmetic.scalar_arithmetic import OpSDiv
+from src.operators.conversions import OpConvertFToS
+from src.operators.conversions import OpConvertFToU
 from src.types.concrete_types import OpTypeFloat
+from src.types.concrete_types import OpTypeInt
+from src.types.concrete_types import OpTypeVector
+from tests import activate_id_allocator
 from tests import create_vector_const
 
 N = 1000
@@ -29,12 +35,12 @@ monitor = Monitor(config)
 
 class TestArithmetic(unittest.TestCase):
     def setUp(self):
-        FuzzDelegator.reset_parametrizations()
         config.limits = copy.deepcopy(init_limits)
         config.strategy = copy.deepcopy(init_strategy)
         self.context: Context = Context.create_global_context(
             ExecutionModel.GLCompute, config
         )
+        activate_id_allocator(self, self.context)
 
     def test_vector_times_scalar_preserves_type(self):
         const: OpConstant = create_vector_const(self.context, OpTypeFloat)
@@ -62,7 +68,7 @@ class TestArithmetic(unittest.TestCase):
 
         # Here we get either: mat2x2, mat2x4, mat4x2, mat4x4
         outer_product: OpOuterProduct = OpOuterProduct.fuzz(self.context).opcode
-        self.context.symbol_table.append(outer_product)
+        self.context.add_to_symbol_table(outer_product)
 
         # This should always find operands
         vector_times_matrix: OpVectorTimesMatrix = OpVectorTimesMatrix.fuzz(
@@ -78,7 +84,7 @@ class TestArithmetic(unittest.TestCase):
 
         # Here we get either: mat2x2, mat2x4, mat4x2, mat4x4
         outer_product: OpOuterProduct = OpOuterProduct.fuzz(self.context).opcode
-        self.context.symbol_table.append(outer_product)
+        self.context.add_to_symbol_table(outer_product)
 
         # This should always find operands
         matrix_times_vector: OpMatrixTimesVector = OpMatrixTimesVector.fuzz(
@@ -94,14 +100,14 @@ class TestArithmetic(unittest.TestCase):
 
         # Here we get either: mat2x2, mat2x4, mat4x2, mat4x4
         outer_product1: OpOuterProduct = OpOuterProduct.fuzz(self.context).opcode
-        self.context.symbol_table.append(outer_product1)
+        self.context.add_to_symbol_table(outer_product1)
 
         # We do this to avoid having two outer products that
         # return a mat2x4/mat4x2 which will fail the test
         outer_product2 = copy.deepcopy(outer_product1)
         while outer_product2.type == outer_product1.type:
             outer_product2: OpOuterProduct = OpOuterProduct.fuzz(self.context).opcode
-        self.context.symbol_table.append(outer_product2)
+        self.context.add_to_symbol_table(outer_product2)
 
         # This should always find operands
         matrix_times_matrix: OpMatrixTimesMatrix = OpMatrixTimesMatrix.fuzz(
@@ -122,3 +128,28 @@ class TestArithmetic(unittest.TestCase):
         self.assertEqual(
             len(matrix_times_matrix.type), len(matrix_times_matrix.operand2.type)
         )
+
+    def test_signatures_are_read_from_generic_bases(self):
+        self.assertEqual(OpSDiv.SIGNATURE.source_type, OpTypeInt)
+        self.assertIsNone(OpSDiv.SIGNATURE.destination_type)
+        self.assertTrue(OpSDiv.SIGNATURE.source_signed)
+        self.assertEqual(OpConvertFToU.SIGNATURE.destination_type, OpTypeInt)
+        self.assertFalse(OpConvertFToU.SIGNATURE.destination_signed)
+        self.assertTrue(SMin.SIGNATURE.is_glsl)
+        self.assertFalse(OpSDiv.SIGNATURE.is_glsl)
+
+    def test_conversion_result_type_follows_signature(self):
+        create_vector_const(self.context, OpTypeFloat)
+
+        conversion: OpConvertFToS = OpConvertFToS.fuzz(self.context).opcode
+
+        self.assertIsInstance(conversion.get_base_type(), OpTypeInt)
+        self.assertEqual(conversion.get_base_type().signed, 1)
+        # The operand may be the float vector or its scalar constituent
+        operand_type = conversion.operand1.type
+        self.assertEqual(
+            isinstance(conversion.type, OpTypeVector),
+            isinstance(operand_type, OpTypeVector),
+        )
+        if isinstance(operand_type, OpTypeVector):
+            self.assertEqual(conversion.type.size, operand_type.size)
@@ -0,0 +1,36 @@
+import unittest
+
+from benchmarks.bench_generation import compare
+
+
+def create_results(shaders_per_sec: float, recondition_s: float) -> dict:
+    return {
+        "tiers": {
+            "500": {
+                "shaders_per_sec": shaders_per_sec,
+                "stages": {"recondition": {"median_s": recondition_s}},
+            }
+        }
+    }
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_changes_within_tolerance_are_not_regressions(self):
+        self.assertEqual(
+            compare(create_results(9, 0.011), create_results(10, 0.01), 0.2), []
+        )
+
+    def test_slower_stages_are_regressions(self):
+        regressions = compare(create_results(10, 0.02), create_results(10, 0.01), 0.2)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("recondition", regressions[0])
+
+    def test_lower_throughput_is_a_regression(self):
+        regressions = compare(create_results(5, 0.01), create_results(10, 0.01), 0.2)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("shaders/sec", regressions[0])
+
+    def test_tiers_missing_from_baseline_are_skipped(self):
+        self.assertEqual(compare(create_results(5, 0.02), {"tiers": {}}, 0.2), [])
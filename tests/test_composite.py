@@ -5,7 +5,6 @@ from omegaconf import OmegaConf
 from spirv_enums import ExecutionModel
 
 from run import SPIRVSmithConfig
-from src import FuzzDelegator
 from src.constants import OpConstant
 from src.constants import OpConstantComposite
 from src.context import Context
@@ -18,6 +17,7 @@ from src.operators.composite import OpVectorExtractDynamic
 from src.operators.composite import OpVectorInsertDynamic
 from src.types.concrete_types import OpTypeFloat
 from src.types.concrete_types import OpTypeInt
+from tests import activate_id_allocator
 from tests import create_vector_const
 
 N = 1000
@@ -33,12 +33,12 @@ monitor = Monitor(config)
 
 class TestComposite(unittest.TestCase):
     def setUp(self):
-        FuzzDelegator.reset_parametrizations()
         config.limits = copy.deepcopy(init_limits)
         config.strategy = copy.deepcopy(init_strategy)
         self.context: Context = Context.create_global_context(
             ExecutionModel.GLCompute, config
         )
+        activate_id_allocator(self, self.context)
 
     def test_vector_dynamic_extract_has_correct_type(self):
         index_const: OpConstant = self.context.create_on_demand_numerical_constant(
@@ -86,7 +86,7 @@ class TestComposite(unittest.TestCase):
         create_vector_const(self.context, OpTypeFloat, size=2)
 
         outer_product: OpOuterProduct = OpOuterProduct.fuzz(self.context).opcode
-        self.context.symbol_table.append(outer_product)
+        self.context.add_to_symbol_table(outer_product)
 
         transpose: OpTranspose = OpTranspose.fuzz(self.context).opcode
 
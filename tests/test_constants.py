@@ -5,7 +5,6 @@ from omegaconf import OmegaConf
 from spirv_enums import ExecutionModel
 
 from run import SPIRVSmithConfig
-from src import FuzzDelegator
 from src.constants import OpConstant
 from src.constants import OpConstantFalse
 from src.constants import OpConstantTrue
@@ -13,6 +12,7 @@ from src.context import Context
 from src.monitor import Monitor
 from src.types.concrete_types import OpTypeBool
 from src.types.concrete_types import OpTypeInt
+from tests import activate_id_allocator
 
 N = 5000
 
@@ -27,12 +27,12 @@ monitor = Monitor(config)
 
 class TestConstants(unittest.TestCase):
     def setUp(self):
-        FuzzDelegator.reset_parametrizations()
         config.limits = copy.deepcopy(init_limits)
         config.strategy = copy.deepcopy(init_strategy)
         self.context: Context = Context.create_global_context(
             ExecutionModel.GLCompute, config
         )
+        activate_id_allocator(self, self.context)
 
     def test_fuzzing_bool_constants(self):
         bool_constant1 = OpConstantTrue.fuzz(self.context)
@@ -1,16 +1,25 @@
 import copy
 import unittest
+from dataclasses import FrozenInstanceError
 
 from omegaconf import OmegaConf
 from spirv_enums import ExecutionModel
+from spirv_enums import StorageClass
 
 from run import SPIRVSmithConfig
-from src import FuzzDelegator
+from src import AbortFuzzing
+from src import Statement
 from src import Type
+from src import get_availability_mask
+from src import get_delegation_node
+from src import ID_ALLOCATOR
 from src.context import Context
 from src.monitor import Monitor
+from src.operators.arithmetic import UnaryArithmeticOperator
 from src.operators.arithmetic.scalar_arithmetic import OpISub
+from src.predicates import HasType
 from src.predicates import IsArithmeticType
+from src.predicates import IsScalarFloat
 from src.types.abstract_types import MiscType
 from src.types.abstract_types import ScalarType
 from src.types.concrete_types import OpTypeBool
@@ -18,6 +27,8 @@ from src.types.concrete_types import OpTypeFloat
 from src.types.concrete_types import OpTypeFunction
 from src.types.concrete_types import OpTypeInt
 from src.types.concrete_types import OpTypeVector
+from tests import activate_id_allocator
+from tests import create_vector_const
 
 N = 500
 
@@ -32,12 +43,12 @@ monitor = Monitor(config)
 
 class TestContext(unittest.TestCase):
     def setUp(self):
-        FuzzDelegator.reset_parametrizations()
         config.limits = copy.deepcopy(init_limits)
         config.strategy = copy.deepcopy(init_strategy)
         self.context: Context = Context.create_global_context(
             ExecutionModel.GLCompute, config
         )
+        activate_id_allocator(self, self.context)
 
     def test_context_registers_all_constants(self):
         self.context.create_on_demand_numerical_constant(OpTypeInt, value=0)
@@ -80,6 +91,41 @@ class TestContext(unittest.TestCase):
 
         self.assertEqual(len(self.context.globals), 1)
 
+    def test_structurally_identical_types_are_interned(self):
+        int_type = self.context.add_to_tvc(OpTypeInt(32, 1))
+        vector_type = self.context.add_to_tvc(OpTypeVector(OpTypeInt(32, 1), 4))
+
+        self.assertIs(self.context.add_to_tvc(OpTypeInt(32, 1)), int_type)
+        self.assertIs(vector_type.type, int_type)
+        self.assertIs(
+            self.context.add_to_tvc(OpTypeVector(OpTypeInt(32, 1), 4)), vector_type
+        )
+
+    def test_cached_hash_follows_member_updates(self):
+        int_type = OpTypeInt(32, 1)
+        signed_hash = hash(int_type)
+        int_type.signed = 0
+
+        self.assertNotEqual(hash(int_type), signed_hash)
+        self.assertEqual(hash(int_type), hash(OpTypeInt(32, 0)))
+
+    def test_opcodes_get_sequential_ids_from_their_shader(self):
+        first_type = OpTypeBool()
+        second_type = OpTypeBool()
+
+        self.assertEqual(second_type.id, first_type.id + 1)
+        self.assertEqual(self.context.id_allocator.next_id, second_type.id + 1)
+
+    def test_id_allocator_does_not_outlive_its_shader(self):
+        other_context: Context = Context.create_global_context(
+            ExecutionModel.GLCompute, config
+        )
+        with other_context.id_allocator.activated():
+            bool_type = OpTypeBool()
+
+        self.assertEqual(other_context.id_allocator.next_id, bool_type.id + 1)
+        self.assertIs(ID_ALLOCATOR.get(), self.context.id_allocator)
+
     def test_context_finds_all_arithmetic_operands(self):
         constant1 = self.context.create_on_demand_numerical_constant(OpTypeInt, 0)
         constant2 = self.context.create_on_demand_numerical_constant(OpTypeInt, 1)
@@ -103,6 +149,28 @@ class TestContext(unittest.TestCase):
         self.assertAlmostEqual(counter[constant1], N, delta=N // 10)
         self.assertAlmostEqual(counter[constant2], N, delta=N // 10)
 
+    def test_indexed_lookups_match_filtering_the_scope(self):
+        int_constant = self.context.create_on_demand_numerical_constant(
+            OpTypeInt, value=0, width=32, signed=1
+        )
+        self.context.create_on_demand_numerical_constant(OpTypeFloat, value=0.0)
+
+        outer_statement = OpISub.fuzz(self.context).opcode
+        self.context.add_to_symbol_table(outer_statement)
+        child_context = self.context.make_child_context(None)
+        inner_statement = OpISub.fuzz(child_context).opcode
+        child_context.add_to_symbol_table(inner_statement)
+
+        self.assertEqual(
+            self.context.get_constants(HasType(int_constant.type)), [int_constant]
+        )
+        self.assertEqual(len(self.context.get_constants(IsScalarFloat)), 1)
+        self.assertEqual(
+            child_context.get_typed_statements(HasType(int_constant.type)),
+            [inner_statement, outer_statement],
+        )
+        self.assertEqual(child_context.get_typed_statements(IsScalarFloat), [])
+
     def test_depth_is_correct(self):
         context = self.context
         for _ in range(5):
@@ -110,6 +178,39 @@ class TestContext(unittest.TestCase):
 
         self.assertEqual(context.get_depth(), 6)
 
+    def test_nested_contexts_share_the_global_context(self):
+        context = self.context
+        for _ in range(5):
+            context = context.make_child_context(None)
+
+        self.assertIs(context.get_global_context(), self.context)
+        self.assertIs(context.parent_context.parent_context.root, self.context)
+
+    def test_local_variables_are_visible_innermost_first(self):
+        int_type = self.context.create_on_demand_numerical_constant(OpTypeInt).type
+        outer_variable = self.context.create_on_demand_variable(
+            StorageClass.Function, int_type
+        )
+        self.context.add_to_symbol_table(outer_variable)
+        child_context = self.context.make_child_context(None)
+        inner_variable = child_context.create_on_demand_variable(
+            StorageClass.Function, int_type
+        )
+        child_context.add_to_symbol_table(inner_variable)
+        # Scopes stay live, opcodes added to an ancestor later are visible
+        late_variable = self.context.create_on_demand_variable(
+            StorageClass.Function, int_type
+        )
+        self.context.add_to_symbol_table(late_variable)
+
+        self.assertEqual(
+            child_context.get_local_variables(),
+            [inner_variable, outer_variable, late_variable],
+        )
+        self.assertEqual(
+            self.context.get_local_variables(), [outer_variable, late_variable]
+        )
+
     def test_numerical_types_distributed_correctly(self):
         self.context.config.limits.n_types = N
         self.context.config.strategy.type_exclusion_set = [
@@ -144,5 +245,131 @@ class TestContext(unittest.TestCase):
 
         self.context.gen_types()
 
-        self.assertEqual(MiscType.get_parametrization()[OpTypeFunction.__name__], 0)
+        self.assertEqual(
+            MiscType.get_parametrization(self.context)[OpTypeFunction.__name__], 0
+        )
         self.assertEqual(len(self.context.get_function_types()), 5)
+
+    def test_parametrizations_are_scoped_to_a_single_generation(self):
+        other_context: Context = Context.create_global_context(
+            ExecutionModel.GLCompute, config
+        )
+
+        MiscType.set_zero_probability(OpTypeFunction, self.context)
+
+        self.assertEqual(
+            MiscType.get_parametrization(self.context)[OpTypeFunction.__name__], 0
+        )
+        self.assertFalse(MiscType.is_parametrized(other_context))
+        self.assertIs(self.context.make_child_context().state, self.context.state)
+
+    def test_delegation_tree_is_sorted_and_deduplicated(self):
+        names = get_delegation_node(Statement).names
+
+        self.assertEqual(list(names), sorted(set(names)))
+        self.assertEqual(
+            [
+                subclass.__name__
+                for subclass in get_delegation_node(Statement).subclasses
+            ],
+            list(names),
+        )
+
+    def test_glsl_operators_are_disabled_without_extension(self):
+        self.context.config.strategy.enable_ext_glsl_std_450 = False
+
+        UnaryArithmeticOperator.parametrize(self.context)
+        parametrization = UnaryArithmeticOperator.get_parametrization(self.context)
+
+        self.assertEqual(parametrization["FAbs"], 0)
+        self.assertNotEqual(parametrization["OpSNegate"], 0)
+
+    def test_statements_without_operands_in_scope_are_masked(self):
+        self.context.create_on_demand_numerical_constant(OpTypeFloat, value=0.0)
+        node = get_delegation_node(UnaryArithmeticOperator)
+
+        mask = dict(
+            zip(
+                node.names,
+                get_availability_mask(
+                    UnaryArithmeticOperator, self.context.get_operand_shapes()
+                ),
+            )
+        )
+        self.assertFalse(mask["OpSNegate"])
+        self.assertTrue(mask["OpFNegate"])
+
+        self.context.create_on_demand_numerical_constant(
+            OpTypeInt, value=0, width=32, signed=1
+        )
+        mask = dict(
+            zip(
+                node.names,
+                get_availability_mask(
+                    UnaryArithmeticOperator, self.context.get_operand_shapes()
+                ),
+            )
+        )
+        self.assertTrue(mask["OpSNegate"])
+
+    def test_vector_only_statements_are_masked_without_vectors(self):
+        self.context.create_on_demand_numerical_constant(OpTypeFloat, value=0.0)
+        node = get_delegation_node(UnaryArithmeticOperator)
+
+        mask = dict(
+            zip(
+                node.names,
+                get_availability_mask(
+                    UnaryArithmeticOperator, self.context.get_operand_shapes()
+                ),
+            )
+        )
+        self.assertTrue(mask["FAbs"])
+        self.assertFalse(mask["Length"])
+
+        create_vector_const(self.context, OpTypeFloat)
+        mask = dict(
+            zip(
+                node.names,
+                get_availability_mask(
+                    UnaryArithmeticOperator, self.context.get_operand_shapes()
+                ),
+            )
+        )
+        self.assertTrue(mask["Length"])
+
+    def test_masked_statements_are_never_picked(self):
+        self.context.config.strategy.enable_ext_glsl_std_450 = False
+        self.context.create_on_demand_numerical_constant(OpTypeFloat, value=0.0)
+
+        for _ in range(N):
+            opcode = UnaryArithmeticOperator.fuzz(self.context).opcode
+            self.assertIsInstance(opcode.type, OpTypeFloat)
+
+    def test_fuzzing_without_available_operands_aborts(self):
+        self.context.config.strategy.enable_ext_glsl_std_450 = False
+
+        with self.assertRaises(AbortFuzzing):
+            UnaryArithmeticOperator.fuzz(self.context)
+
+    def test_operand_misses_are_counted_per_shader(self):
+        other_context: Context = Context.create_global_context(
+            ExecutionModel.GLCompute, config
+        )
+
+        for _ in range(2):
+            with self.assertRaises(AbortFuzzing):
+                OpISub.fuzz(self.context)
+
+        self.assertEqual(self.context.state.no_operand_found_counts["OpISub"], 2)
+        self.assertEqual(other_context.state.no_operand_found_counts["OpISub"], 0)
+
+    def test_settings_are_snapshotted_once_per_shader(self):
+        settings = self.context.settings
+
+        self.assertEqual(
+            settings.shader_target_size, config.strategy.shader_target_size
+        )
+        self.assertIs(self.context.make_child_context().settings, settings)
+        with self.assertRaises(FrozenInstanceError):
+            settings.max_depth = 0
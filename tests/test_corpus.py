@@ -0,0 +1,54 @@
+import copy
+import tempfile
+import unittest
+
+from omegaconf import OmegaConf
+
+from run import SPIRVSmithConfig
+from src.corpus import Corpus
+from src.corpus import hash_config
+from src.fuzzing_client import ShaderGenerator
+from src.monitor import Monitor
+
+config: SPIRVSmithConfig = OmegaConf.structured(SPIRVSmithConfig())
+init_strategy = copy.deepcopy(config.strategy)
+init_limits = copy.deepcopy(config.limits)
+
+config.misc.broadcast_generated_shaders = False
+config.misc.upload_logs = False
+monitor = Monitor(config)
+
+
+class TestCorpus(unittest.TestCase):
+    def setUp(self):
+        config.limits = copy.deepcopy(init_limits)
+        config.strategy = copy.deepcopy(init_strategy)
+        config.strategy.shader_target_size = 500
+        corpus_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(corpus_folder.cleanup)
+        self.corpus = Corpus(corpus_folder.name)
+
+    def test_entries_are_read_back(self):
+        self.corpus.add(config, 1, "a", True)
+        self.corpus.add(config, 2, "b", False)
+
+        self.assertEqual([entry.seed for entry in self.corpus], [1, 2])
+        self.assertEqual([entry.is_valid for entry in self.corpus], [True, False])
+
+    def test_entry_regenerates_shader(self):
+        shader = ShaderGenerator(config).gen_shader(seed=1234)
+        entry = self.corpus.add(config, 1234, shader.id, True)
+
+        self.assertEqual(
+            self.corpus.regenerate(entry).to_assembly(), shader.to_assembly()
+        )
+
+    def test_config_hash_ignores_misc_settings(self):
+        other_config = copy.deepcopy(config)
+        other_config.misc.n_workers = 3
+
+        self.assertEqual(hash_config(config), hash_config(other_config))
+
+        other_config.strategy.shader_target_size = 1000
+
+        self.assertNotEqual(hash_config(config), hash_config(other_config))
@@ -0,0 +1,42 @@
+import unittest
+from itertools import accumulate
+
+from src.distributions import get_discretised_gaussian_weights
+from src.distributions import get_recency_cum_weights
+from src.distributions import get_recency_weights
+
+POLICIES = ["uniform", "greedy", "linear", "beta_binomial"]
+
+
+class TestDistributions(unittest.TestCase):
+    def test_cum_weights_match_reversed_weights(self):
+        for policy in POLICIES:
+            for N in (1, 2, 17):
+                weights = get_recency_weights(policy, N)
+                self.assertEqual(len(weights), N)
+                self.assertEqual(
+                    get_recency_cum_weights(policy, N),
+                    tuple(accumulate(weights[::-1])),
+                )
+
+    def test_most_recent_statement_is_favoured(self):
+        for policy in ["greedy", "linear", "beta_binomial"]:
+            cum_weights = get_recency_cum_weights(policy, 10)
+            self.assertGreater(cum_weights[-1] - cum_weights[-2], cum_weights[0])
+
+    def test_cum_weights_are_cached(self):
+        self.assertIs(
+            get_recency_cum_weights("beta_binomial", 42),
+            get_recency_cum_weights("beta_binomial", 42),
+        )
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_recency_cum_weights("unknown", 3)
+
+    def test_discretised_gaussian_weights(self):
+        weights = get_discretised_gaussian_weights(mu=7.3, sigma=2.0, N=20)
+
+        self.assertEqual(len(weights), 20)
+        self.assertAlmostEqual(weights.sum(), 1.0)
+        self.assertEqual(weights.argmax(), 7)
@@ -6,10 +6,10 @@ from spirv_enums import ExecutionModel
 from spirv_enums import StorageClass
 
 from run import SPIRVSmithConfig
-from src import FuzzDelegator
 from src.context import Context
 from src.monitor import Monitor
 from src.operators.memory.memory_access import OpLoad
+from tests import activate_id_allocator
 
 config: SPIRVSmithConfig = OmegaConf.structured(SPIRVSmithConfig())
 init_strategy = copy.deepcopy(config.strategy)
@@ -22,12 +22,12 @@ monitor = Monitor(config)
 
 class TestMemory(unittest.TestCase):
     def setUp(self):
-        FuzzDelegator.reset_parametrizations()
         config.limits = copy.deepcopy(init_limits)
         config.strategy = copy.deepcopy(init_strategy)
         self.context: Context = Context.create_global_context(
             ExecutionModel.GLCompute, config
         )
+        activate_id_allocator(self, self.context)
 
     def test_opload_finds_global_variable(self):
         self.context.config.limits.n_types = 100
@@ -0,0 +1,45 @@
+import logging
+import unittest
+
+from omegaconf import OmegaConf
+
+from run import SPIRVSmithConfig
+from src.monitor import Event
+from src.monitor import LogShipper
+from src.monitor import Monitor
+
+config: SPIRVSmithConfig = OmegaConf.structured(SPIRVSmithConfig())
+config.misc.upload_logs = False
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+        self.n_flushes: int = 0
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def flush(self):
+        self.n_flushes += 1
+
+
+class TestMonitor(unittest.TestCase):
+    def test_monitor_is_shared(self):
+        self.assertIs(Monitor(config), Monitor(config))
+        self.assertIs(Monitor(), Monitor(config))
+
+    def test_records_are_shipped_in_batches(self):
+        handler = RecordingHandler()
+        shipper = LogShipper([handler], batch_size=10, flush_interval=60)
+        for k in range(25):
+            shipper.queue_handler.handle(
+                logging.makeLogRecord(
+                    {"msg": Event.DEBUG.value, "levelno": logging.INFO, "k": k}
+                )
+            )
+        shipper.stop()
+
+        self.assertEqual([record.k for record in handler.records], list(range(25)))
+        self.assertEqual(handler.n_flushes, 3)
@@ -4,11 +4,11 @@ import unittest
 from omegaconf import OmegaConf
 
 from run import SPIRVSmithConfig
-from src import FuzzDelegator
 from src.fuzzing_client import ShaderGenerator
 from src.monitor import Monitor
 from src.shader_parser import parse_spirv_assembly_lines
 from src.shader_utils import SPIRVShader
+from src.utils import derive_shader_seed
 
 config: SPIRVSmithConfig = OmegaConf.structured(SPIRVSmithConfig())
 init_strategy = copy.deepcopy(config.strategy)
@@ -21,7 +21,6 @@ monitor = Monitor(config)
 
 class TestParser(unittest.TestCase):
     def setUp(self):
-        FuzzDelegator.reset_parametrizations()
         config.limits = copy.deepcopy(init_limits)
         config.strategy = copy.deepcopy(init_strategy)
         config.strategy.shader_target_size = 500
@@ -36,6 +35,11 @@ class TestParser(unittest.TestCase):
             set(self.parsed_shader.context.globals.keys()),
         )
 
+    def test_parser_reserves_parsed_ids(self):
+        next_id = self.parsed_shader.context.id_allocator.next_id
+
+        self.assertGreaterEqual(next_id, self.shader.get_bound())
+
     def test_parser_fully_reconstructs_opcodes(self):
         self.assertListEqual(self.shader.opcodes, self.parsed_shader.opcodes)
 
@@ -68,3 +72,32 @@ class TestParser(unittest.TestCase):
             self.shader.recondition().normalise_ids().generate_assembly_lines(),
             self.parsed_shader.recondition().normalise_ids().generate_assembly_lines(),
         )
+
+    def test_streamed_assembly_matches_assembly_lines(self):
+        self.assertEqual(
+            self.shader.to_assembly(), "\n".join(self.shader.generate_assembly_lines())
+        )
+
+    def test_parser_reads_seed(self):
+        self.assertIsNotNone(self.shader.context.seed)
+        self.assertEqual(self.parsed_shader.context.seed, self.shader.context.seed)
+
+
+class TestSeededGeneration(unittest.TestCase):
+    def setUp(self):
+        config.limits = copy.deepcopy(init_limits)
+        config.strategy = copy.deepcopy(init_strategy)
+        config.strategy.shader_target_size = 500
+
+    def test_same_seed_generates_same_shader(self):
+        self.assertEqual(
+            ShaderGenerator(config, None).gen_shader(seed=42).to_assembly(),
+            ShaderGenerator(config, None).gen_shader(seed=42).to_assembly(),
+        )
+
+    def test_shader_seeds_are_derived_from_root_seed(self):
+        seeds = [derive_shader_seed(7, index) for index in range(100)]
+
+        self.assertEqual(seeds, [derive_shader_seed(7, index) for index in range(100)])
+        self.assertEqual(len(set(seeds)), 100)
+        self.assertTrue(all(0 <= seed < 2**64 for seed in seeds))
@@ -0,0 +1,72 @@
+import threading
+import unittest
+
+from src.pipeline import Stage
+
+
+class TestPipeline(unittest.TestCase):
+    def test_items_go_through_every_stage(self):
+        results = []
+        lock = threading.Lock()
+
+        def collect(item):
+            with lock:
+                results.append(item)
+
+        last = Stage("collect", collect, n_threads=2, inbox_size=2).start()
+        first = Stage(
+            "double", lambda x: 2 * x, n_threads=3, inbox_size=2, downstream=last
+        ).start()
+        for k in range(50):
+            first.put(k)
+        first.close()
+
+        self.assertEqual(sorted(results), [2 * k for k in range(50)])
+
+    def test_full_inbox_blocks_producer(self):
+        release = threading.Event()
+        stage = Stage("blocked", lambda _: release.wait(), inbox_size=1).start()
+        # One item is being handled, one fills the inbox
+        stage.put(0)
+        stage.put(1)
+        producer = threading.Thread(target=stage.put, args=(2,))
+        producer.start()
+        producer.join(timeout=0.1)
+
+        self.assertTrue(producer.is_alive())
+        release.set()
+        producer.join()
+        stage.close()
+
+    def test_handler_errors_are_raised_on_close(self):
+        def fail(item):
+            if item == 3:
+                raise ValueError(item)
+
+        stage = Stage("failing", fail).start()
+        for k in range(5):
+            stage.put(k)
+
+        with self.assertRaises(ValueError):
+            stage.close()
+
+    def test_stage_fails_after_consecutive_errors(self):
+        def fail_on_odd(item):
+            if item % 2:
+                raise ValueError(item)
+
+        last = Stage("failing", fail_on_odd, max_consecutive_errors=2).start()
+        first = Stage("forward", lambda x: x, downstream=last).start()
+        for k in [1, 2, 3]:
+            first.put(k)
+        with self.assertRaises(ValueError):
+            first.close()
+        self.assertFalse(first.has_failed())
+
+        last = Stage("failing", fail_on_odd, max_consecutive_errors=2).start()
+        first = Stage("forward", lambda x: x, downstream=last).start()
+        for k in [1, 3]:
+            first.put(k)
+        with self.assertRaises(ValueError):
+            first.close()
+        self.assertTrue(first.has_failed())
@@ -3,22 +3,31 @@ import unittest
 
 from omegaconf import OmegaConf
 from spirv_enums import ExecutionModel
+from spirv_enums import SelectionControlMask
 
 from run import SPIRVSmithConfig
-from src import FuzzDelegator
 from src.constants import OpConstant
 from src.constants import OpConstantComposite
+from src.constants import OpConstantTrue
 from src.context import Context
+from src.function import OpBranch
+from src.function import OpBranchConditional
+from src.function import OpLabel
+from src.function import OpLoopMerge
 from src.misc import OpUndef
 from src.monitor import Monitor
 from src.operators.arithmetic.scalar_arithmetic import OpIAdd
 from src.operators.arithmetic.scalar_arithmetic import OpSMod
 from src.operators.arithmetic.scalar_arithmetic import OpUDiv
 from src.operators.composite import OpVectorExtractDynamic
+from src.operators.memory.memory_access import OpStore
+from src.operators.memory.variable import OpVariable
 from src.recondition import recondition_opcodes
 from src.types.concrete_types import EmptyType
+from src.types.concrete_types import OpTypeBool
 from src.types.concrete_types import OpTypeInt
 from src.types.concrete_types import OpTypeVector
+from tests import activate_id_allocator
 
 config: SPIRVSmithConfig = OmegaConf.structured(SPIRVSmithConfig())
 init_strategy = copy.deepcopy(config.strategy)
@@ -31,12 +40,12 @@ monitor = Monitor(config)
 
 class TestRecondition(unittest.TestCase):
     def setUp(self):
-        FuzzDelegator.reset_parametrizations()
         config.limits = copy.deepcopy(init_limits)
         config.strategy = copy.deepcopy(init_strategy)
         self.context: Context = Context.create_global_context(
             ExecutionModel.GLCompute, config
         )
+        activate_id_allocator(self, self.context)
 
     def test_vector_access_is_reconditioned(self):
         int_type = OpTypeInt(32, 1)
@@ -138,3 +147,47 @@ class TestRecondition(unittest.TestCase):
         self.assertEqual(len(reconditioned), len(opcodes) + 1)
         self.assertTrue(isinstance(reconditioned[reconditioned.index(div) - 1], OpIAdd))
         self.assertTrue(div.operand1 == const_one or div.operand1 == const_zero)
+
+    def test_infinite_loop_is_reconditioned(self):
+        condition = self.context.add_to_tvc(OpConstantTrue(OpTypeBool()))
+        entry_label = OpLabel()
+        loop_back_label = OpLabel()
+        continue_label = OpLabel()
+        merge_label = OpLabel()
+        pre_loop_branch = OpBranch(loop_back_label)
+        op_loop = OpLoopMerge(
+            type=EmptyType(),
+            merge_label=merge_label,
+            continue_label=continue_label,
+            selection_control=SelectionControlMask.NONE,
+        )
+        loop_entry_branch = OpBranchConditional(condition, continue_label, merge_label)
+        loop_back_branch = OpBranch(loop_back_label)
+
+        opcodes = [
+            entry_label,
+            pre_loop_branch,
+            loop_back_label,
+            op_loop,
+            loop_entry_branch,
+            continue_label,
+            loop_back_branch,
+            merge_label,
+        ]
+
+        reconditioned = recondition_opcodes(self.context, opcodes)
+
+        # One variable, one initial store and eight opcodes replacing the
+        # loop entry branch
+        self.assertEqual(len(reconditioned), len(opcodes) + 1 + 1 + 7)
+        self.assertNotIn(loop_entry_branch, reconditioned)
+        # The variable is declared right after the first label
+        self.assertIs(reconditioned[0], entry_label)
+        self.assertIsInstance(reconditioned[1], OpVariable)
+        # The counter is initialised before branching into the loop header
+        self.assertIsInstance(reconditioned[2], OpStore)
+        self.assertIs(reconditioned[3], pre_loop_branch)
+        self.assertIs(reconditioned[5], op_loop)
+        self.assertIsInstance(reconditioned[6], OpBranch)
+        self.assertIsInstance(reconditioned[-4], OpBranchConditional)
+        self.assertIs(reconditioned[-3], continue_label)
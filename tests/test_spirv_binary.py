@@ -0,0 +1,89 @@
+import copy
+import shutil
+import struct
+import subprocess
+import tempfile
+import unittest
+
+from omegaconf import OmegaConf
+
+from run import SPIRVSmithConfig
+from src.fuzzing_client import ShaderGenerator
+from src.monitor import Monitor
+from src.shader_utils import SPIRVShader
+from src.spirv_binary import encode_integer
+from src.spirv_binary import encode_string
+from src.spirv_binary import MAGIC_NUMBER
+from src.utils import TARGET_SPIRV_VERSION
+
+config: SPIRVSmithConfig = OmegaConf.structured(SPIRVSmithConfig())
+init_strategy = copy.deepcopy(config.strategy)
+init_limits = copy.deepcopy(config.limits)
+
+config.misc.broadcast_generated_shaders = False
+config.misc.upload_logs = False
+monitor = Monitor(config)
+
+
+def to_words(spirv_bytes: bytes) -> tuple[int, ...]:
+    return struct.unpack(f"<{len(spirv_bytes) // 4}I", spirv_bytes)
+
+
+class TestSPIRVBinary(unittest.TestCase):
+    def setUp(self):
+        config.limits = copy.deepcopy(init_limits)
+        config.strategy = copy.deepcopy(init_strategy)
+        config.strategy.shader_target_size = 500
+        self.shader: SPIRVShader = ShaderGenerator(config, None).gen_shader()
+        self.words: tuple[int, ...] = to_words(self.shader.to_spirv_bytes())
+
+    def test_header_is_correct(self):
+        self.assertEqual(self.words[0], MAGIC_NUMBER)
+        self.assertEqual(self.words[3], self.shader.get_bound())
+
+    def test_one_instruction_per_assembly_line(self):
+        n_instructions, i = 0, 5
+        while i < len(self.words):
+            i += self.words[i] >> 16
+            n_instructions += 1
+
+        self.assertEqual(i, len(self.words))
+        self.assertEqual(
+            n_instructions,
+            len(
+                [
+                    line
+                    for line in self.shader.generate_assembly_lines()
+                    if not line.startswith(";")
+                ]
+            ),
+        )
+
+    @unittest.skipUnless(shutil.which("spirv-as"), "spirv-as is not installed")
+    def test_encoding_matches_spirv_as(self):
+        with tempfile.NamedTemporaryFile(
+            suffix=".spasm"
+        ) as spasm_file, tempfile.NamedTemporaryFile(suffix=".spv") as spv_file:
+            self.shader.generate_assembly_file(spasm_file.name)
+            subprocess.run(
+                [
+                    "spirv-as",
+                    "--target-env",
+                    TARGET_SPIRV_VERSION,
+                    "--preserve-numeric-ids",
+                    spasm_file.name,
+                    "-o",
+                    spv_file.name,
+                ],
+                check=True,
+            )
+            assembled_words = to_words(spv_file.read())
+
+        # Everything but the generator magic number must match
+        self.assertEqual(self.words[:2], assembled_words[:2])
+        self.assertEqual(self.words[3:], assembled_words[3:])
+
+    def test_literals_are_encoded_correctly(self):
+        self.assertEqual(encode_string("main"), [0x6E69616D, 0])
+        self.assertEqual(encode_integer(-1), [0xFFFFFFFF])
+        self.assertEqual(encode_integer(1 << 32, width=64), [0, 1])
@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.utils import get_source_hash
+from src.utils import OpcodeRegistry
+
+ROOT_FOLDER: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Cumulative time `import config` may take, well above what it takes with the
+# caches filled but below what importing every opcode module costs
+IMPORT_TIME_BUDGET_S: float = 1.0
+
+
+def run_python(statement: str, *args: str, **kwargs) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args, "-c", statement],
+        cwd=ROOT_FOLDER,
+        capture_output=True,
+        text=True,
+        check=True,
+        **kwargs,
+    )
+
+
+def get_loaded_modules(statement: str, **kwargs) -> set[str]:
+    process = run_python(
+        f"import sys; {statement}; print('\\n'.join(sys.modules))", **kwargs
+    )
+    return set(process.stdout.splitlines())
+
+
+def get_import_time(module: str) -> float:
+    # Lines read "import time: <self us> | <cumulative us> | <module>"
+    process = run_python(f"import {module}", "-X", "importtime")
+    for line in process.stderr.splitlines():
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1e6
+    raise ValueError(f"{module} was not imported")
+
+
+class TestStartup(unittest.TestCase):
+    def test_config_does_not_import_opcodes(self):
+        modules: set[str] = get_loaded_modules("import config")
+        self.assertFalse({m for m in modules if m.startswith("src.operators")})
+        self.assertNotIn("scipy.stats", modules)
+
+    def test_lookup_only_imports_defining_module(self):
+        with tempfile.TemporaryDirectory() as cache_folder:
+            lookup: str = (
+                "from src.utils import OpcodeRegistry; "
+                f"OpcodeRegistry({cache_folder!r})['OpIAdd']"
+            )
+            # Fills the on-disk registry cache
+            get_loaded_modules(lookup)
+            modules: set[str] = get_loaded_modules(lookup)
+        self.assertIn("src.operators.arithmetic.scalar_arithmetic", modules)
+        self.assertNotIn("src.operators.logic", modules)
+
+    def test_version_is_read_from_cache(self):
+        with tempfile.TemporaryDirectory() as cache_folder:
+            with open(
+                os.path.join(cache_folder, f"version-{get_source_hash()}.txt"), "w"
+            ) as f:
+                f.write("v1.2.3")
+            env: dict[str, str] = {k: v for k, v in os.environ.items() if k != "CI"}
+            modules: set[str] = get_loaded_modules(
+                "from src.utils import get_spirvsmith_version; "
+                f"assert get_spirvsmith_version({cache_folder!r}) == 'v1.2.3'",
+                env=env,
+            )
+        self.assertNotIn("git", modules)
+
+    def test_config_import_is_within_budget(self):
+        # Fills the on-disk caches
+        run_python("import config")
+        self.assertLess(get_import_time("config"), IMPORT_TIME_BUDGET_S)
+
+
+class TestOpcodeRegistry(unittest.TestCase):
+    def create_cache_folder(self) -> str:
+        cache_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_folder.cleanup)
+        return cache_folder.name
+
+    def test_registry_is_cached_on_disk(self):
+        cache_folder: str = self.create_cache_folder()
+        registry = OpcodeRegistry(cache_folder)
+        self.assertEqual(registry["OpIAdd"].__name__, "OpIAdd")
+        self.assertEqual(len(os.listdir(cache_folder)), 1)
+
+        registry = OpcodeRegistry(cache_folder)
+        registry.build = lambda: self.fail("Registry rebuilt despite the cache")
+        self.assertEqual(registry["OpIAdd"].__name__, "OpIAdd")
+        self.assertIn("OpLogicalAnd", registry)
+
+    def test_unknown_names_are_missing(self):
+        registry = OpcodeRegistry(self.create_cache_folder())
+        with self.assertRaises(KeyError):
+            registry["Function"]
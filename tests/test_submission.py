@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from src.submission import HTTPTransport
+from src.submission import ShaderSubmitter
+
+
+class StandInServer(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.shaders: list[dict] = []
+        self.statuses: list[int] = []
+        self.connections: set[tuple] = set()
+        self.release = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/shaders"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.connections.add(self.client_address)
+        if json.loads(body)["shader_id"] == "slow":
+            self.server.release.wait()
+        status = self.server.statuses.pop(0) if self.server.statuses else 200
+        if status == 200:
+            self.server.shaders.append(json.loads(body))
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSubmission(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        spool_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(spool_folder.cleanup)
+        self.spool_folder = spool_folder.name
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def create_submitter(self, url=None, **kwargs) -> ShaderSubmitter:
+        self.delays: list[float] = []
+        return ShaderSubmitter(
+            lambda: HTTPTransport(url or self.server.url),
+            spool_folder=self.spool_folder,
+            sleep=self.delays.append,
+            **kwargs,
+        )
+
+    def get_shader_ids(self) -> list[str]:
+        return [shader["shader_id"] for shader in self.server.shaders]
+
+    def test_shaders_are_submitted_over_one_connection(self):
+        submitter = self.create_submitter()
+        for k in range(7):
+            submitter.submit({"shader_id": str(k)})
+        submitter.close()
+
+        self.assertEqual(self.get_shader_ids(), [str(k) for k in range(7)])
+        self.assertEqual(len(self.server.connections), 1)
+
+    def test_slow_submission_does_not_hold_back_other_threads(self):
+        submitter = self.create_submitter()
+        slow = threading.Thread(target=submitter.submit, args=({"shader_id": "slow"},))
+        slow.start()
+        fast = threading.Thread(target=submitter.submit, args=({"shader_id": "fast"},))
+        fast.start()
+        fast.join(timeout=5.0)
+
+        self.assertFalse(fast.is_alive())
+        self.assertEqual(self.get_shader_ids(), ["fast"])
+        self.server.release.set()
+        slow.join()
+        submitter.close()
+        self.assertEqual(len(self.server.connections), 2)
+
+    def test_unavailable_server_is_retried(self):
+        self.server.statuses = [503, 503]
+        submitter = self.create_submitter()
+        submitter.submit({"shader_id": "0"})
+        submitter.close()
+
+        self.assertEqual(self.get_shader_ids(), ["0"])
+        self.assertEqual(len(self.delays), 2)
+        self.assertEqual(os.listdir(self.spool_folder), [])
+
+    def test_rejected_shaders_are_kept_aside(self):
+        self.server.statuses = [422]
+        submitter = self.create_submitter()
+        submitter.submit({"shader_id": "0"})
+        submitter.submit({"shader_id": "1"})
+        submitter.close()
+
+        self.assertEqual(self.get_shader_ids(), ["1"])
+        self.assertTrue(os.listdir(self.spool_folder)[0].endswith(".rejected"))
+
+    def test_undelivered_shaders_are_spooled_then_resubmitted(self):
+        # Nothing listens on port 9 (discard) on the test machine
+        submitter = self.create_submitter(
+            url="http://127.0.0.1:9/shaders", max_retries=1
+        )
+        submitter.submit({"shader_id": "0"})
+        # The server is known to be down, the shader is spooled without retries
+        submitter.submit({"shader_id": "1"})
+        submitter.close()
+        self.assertEqual(len(self.delays), 1)
+        self.assertEqual(len(os.listdir(self.spool_folder)), 2)
+
+        submitter = self.create_submitter()
+        submitter.submit({"shader_id": "2"})
+        submitter.close()
+
+        self.assertEqual(os.listdir(self.spool_folder), [])
+        self.assertEqual(self.get_shader_ids(), ["2", "0", "1"])
@@ -0,0 +1,45 @@
+import sys
+import unittest
+
+from src.tool_pool import _reset_tool_pool
+from src.tool_pool import get_tool_pool
+from src.tool_pool import to_subprocess_result
+from src.tool_pool import ToolPool
+
+
+class TestToolPool(unittest.TestCase):
+    def setUp(self):
+        self.pool: ToolPool = ToolPool(size=2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_input_is_piped_to_stdin(self):
+        process = self.pool.run(
+            [sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read())"],
+            b"\x03\x02\x23\x07",
+        )
+
+        self.assertEqual(process.returncode, 0)
+        self.assertEqual(process.stdout, b"\x03\x02\x23\x07")
+
+    def test_results_keep_submission_order(self):
+        futures = [
+            self.pool.submit([sys.executable, "-c", f"import sys; sys.exit({k})"])
+            for k in range(6)
+        ]
+
+        self.assertEqual(
+            [to_subprocess_result(future.result()).exit_code for future in futures],
+            list(range(6)),
+        )
+
+    def test_global_pool_is_shared(self):
+        _reset_tool_pool()
+        self.addCleanup(_reset_tool_pool)
+        pool: ToolPool = get_tool_pool(3)
+
+        self.assertIs(get_tool_pool(), pool)
+        self.assertIs(get_tool_pool(3), pool)
+        with self.assertRaises(ValueError):
+            get_tool_pool(4)
@@ -5,7 +5,6 @@ from omegaconf import OmegaConf
 from spirv_enums import ExecutionModel
 
 from run import SPIRVSmithConfig
-from src import FuzzDelegator
 from src.constants import OpConstant
 from src.constants import OpConstantComposite
 from src.context import Context
@@ -14,6 +13,7 @@ from src.predicates import HaveSameBaseType
 from src.predicates import HaveSameType
 from src.types.concrete_types import OpTypeFloat
 from src.types.concrete_types import OpTypeInt
+from tests import activate_id_allocator
 from tests import create_vector_const
 
 N = 1000
@@ -29,12 +29,12 @@ monitor = Monitor(config)
 
 class TestTypes(unittest.TestCase):
     def setUp(self):
-        FuzzDelegator.reset_parametrizations()
         config.limits = copy.deepcopy(init_limits)
         config.strategy = copy.deepcopy(init_strategy)
         self.context: Context = Context.create_global_context(
             ExecutionModel.GLCompute, config
         )
+        activate_id_allocator(self, self.context)
 
     def test_ints_same_width_and_signedness_are_equal(self):
         const1: OpConstant = self.context.create_on_demand_numerical_constant(